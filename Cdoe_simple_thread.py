@@ -1,29 +1,144 @@
+import os
+import weakref
 import threading
+import multiprocessing
 
-# Global variable (The "Kitchen")
-counter = 0
-
-def increase():
-    global counter
-    for _ in range(1000000):
-        # This looks like one step, but the CPU sees 3 steps:
-        # 1. Read counter
-        # 2. Add 1
-        # 3. Write counter
-        counter += 1
-
-# 1. Create two threads (People in the house)
-t1 = threading.Thread(target=increase)
-t2 = threading.Thread(target=increase)
-
-# 2. Start them at the same time
-print("Starting threads...")
-t1.start()
-t2.start()
-
-# 3. Wait for them to finish
-t1.join()
-t2.join()
-
-print(f"Expected Value: 2000000")
-print(f"Actual Value:   {counter}")
+# ==========================================
+# COUNTERS THAT DON'T LOSE UPDATES
+# ==========================================
+# `counter += 1` is read / add / write; two threads interleaving between
+# the read and the write lose increments (the demo below). Three fixes,
+# cheapest-to-read first:
+#
+#   LockedCounter  : one lock around the update; always correct, but every
+#                    increment from every thread fights for the same lock
+#   ShardedCounter : each thread owns a cell and is its only writer, so no
+#                    lock on the hot path; value sums the cells on read
+#   ProcessCounter : shared memory for multiprocessing workers (fork or spawn);
+#                    one cache-line-padded slot per incrementing thread of any
+#                    process, handed out from a locked shared Value on that
+#                    thread's first incr(), summed on read (a lock-free
+#                    RawArray - a locked multiprocessing.Value pays an
+#                    inter-process semaphore per increment)
+
+class LockedCounter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def incr(self, n=1):
+        with self._lock: self._value += n
+
+    @property
+    def value(self): return self._value
+
+
+class ShardedCounter:
+    def __init__(self):
+        self._local = threading.local()
+        self._cells = []  # one [count] per thread that ever incremented; kept after the thread exits
+        self._lock = threading.Lock()  # only taken the first time a thread increments
+
+    def _cell(self):
+        cell = [0]
+        with self._lock: self._cells.append(cell)
+        self._local.cell = cell
+        return cell
+
+    def incr(self, n=1):
+        try: cell = self._local.cell
+        except AttributeError: cell = self._cell()
+        cell[0] += n  # this thread is the cell's only writer
+
+    @property
+    def value(self):
+        with self._lock: cells = list(self._cells)
+        return sum(c[0] for c in cells)
+
+
+_process_counters = weakref.WeakSet()
+
+
+def _forget_slots():
+    # A forked child inherits the forking thread's claimed slot; make it claim its own
+    for counter in list(_process_counters): counter._local = threading.local()
+
+
+if hasattr(os, "register_at_fork"): os.register_at_fork(after_in_child=_forget_slots)
+
+
+class ProcessCounter:
+    STRIDE = 8  # int64s per slot = 64 bytes, so two processes never write the same cache line
+
+    def __init__(self, slots=64, ctx=None):
+        ctx = ctx or multiprocessing.get_context()
+        self.slots = slots  # most threads (across all processes) that may ever increment; 4 KB of shared memory at 64
+        self._array = ctx.RawArray("q", self.slots * self.STRIDE)
+        self._next = ctx.Value("i", 0)  # next free slot; locked, but only touched once per process
+        self._local = threading.local()  # .index: this thread's slot, claimed on its first incr()
+        _process_counters.add(self)
+
+    def __getstate__(self):
+        # Sent to a spawned child: the copy must claim its own slots, not reuse ours
+        return {k: v for k, v in self.__dict__.items() if k != "_local"}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        _process_counters.add(self)
+
+    def _claim(self):
+        with self._next.get_lock():
+            slot = self._next.value
+            if slot >= self.slots: raise RuntimeError(f"ProcessCounter: all {self.slots} slots taken")
+            self._next.value += 1
+        self._local.index = slot * self.STRIDE
+        return self._local.index
+
+    def incr(self, n=1):
+        try: index = self._local.index
+        except AttributeError: index = self._claim()
+        self._array[index] += n  # this thread is the slot's only writer
+
+    @property
+    def value(self):
+        return sum(self._array[i * self.STRIDE] for i in range(self.slots))
+
+
+if __name__ == "__main__":
+    # Global variable (The "Kitchen")
+    counter = 0
+
+    def increase():
+        global counter
+        for _ in range(1000000):
+            # This looks like one step, but the CPU sees 3 steps:
+            # 1. Read counter
+            # 2. Add 1
+            # 3. Write counter
+            counter += 1
+
+    # 1. Create two threads (People in the house)
+    t1 = threading.Thread(target=increase)
+    t2 = threading.Thread(target=increase)
+
+    # 2. Start them at the same time
+    print("Starting threads...")
+    t1.start()
+    t2.start()
+
+    # 3. Wait for them to finish
+    t1.join()
+    t2.join()
+
+    print(f"Expected Value: 2000000")
+    print(f"Actual Value:   {counter}")
+
+    # The same race with counters that can't lose updates
+    for fixed in (LockedCounter(), ShardedCounter()):
+        def increase_fixed():
+            for _ in range(1000000): fixed.incr()
+        threads = [threading.Thread(target=increase_fixed) for _ in range(2)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        print(f"{type(fixed).__name__ + ':':<15} {fixed.value}")
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import subprocess
+
+import psutil
+
+from v18_bandwidth import measure, throughput
+
+# Built-in speed test on loopback: how fast the probe server can feed N
+# streams with sendfile() vs. the obvious sendall(bytes[a:b]) loop, and how
+# much server CPU each costs per GB. On loopback the link is free, so any
+# difference is the server itself.
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVER = os.path.join(HERE, "simple_TCP_server_in_python.py")
+DURATION = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+STREAMS = [1, 2, 4]
+
+
+def start_server(port, copy):
+    proc = subprocess.Popen([sys.executable, SERVER, "--port", str(port)] + (["--copy"] if copy else []),
+                            stdout=subprocess.PIPE, text=True)
+    proc.stdout.readline()  # "listening on ..."
+    return proc
+
+
+def server_cpu(proc):
+    t = psutil.Process(proc.pid).cpu_times()
+    return t.user + t.system
+
+
+if __name__ == "__main__":
+    print(f"{DURATION:g}s per test, loopback\n")
+    print(f"{'server':<10} {'streams':>7} {'download':>14} {'server CPU / GB':>16}")
+    for port, copy in ((9991, False), (9992, True)):
+        proc = start_server(port, copy)
+        try:
+            for streams in STREAMS:
+                cpu0 = server_cpu(proc)
+                mbps = throughput("127.0.0.1", port, "download", DURATION, streams)
+                cpu = server_cpu(proc) - cpu0
+                gb = mbps * DURATION / 8 / 1000
+                print(f"{'copy' if copy else 'sendfile':<10} {streams:>7} {mbps:>9.0f} Mbps {cpu / gb * 1000:>12.0f} ms")
+            if not copy:
+                res = measure(f"127.0.0.1:{port}", duration=DURATION, streams=4)
+                print(f"\nmeasure(): RTT p50 {res['rtt_ms']['p50'] * 1000:.0f} us / p95 {res['rtt_ms']['p95'] * 1000:.0f} us, "
+                      f"down {res['download_mbps']:.0f} Mbps, up {res['upload_mbps']:.0f} Mbps\n")
+        finally:
+            proc.kill()
+            proc.wait()
@@ -0,0 +1,74 @@
+import sys
+import time
+import random
+import tracemalloc
+
+from cache_test import LRUCache
+
+# cache_test.LRUCache vs. the plain dict it replaced: get/set throughput,
+# traced memory per entry, and what happens to memory when more distinct
+# keys arrive than the cache may hold.
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+VALUE = "User_Data_{}"
+
+
+def per_op(fn, ops):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) / ops * 1e9
+
+
+def fill(store, keys):
+    setter = store.__setitem__ if isinstance(store, dict) else store.set
+    for k in keys: setter(k, VALUE.format(k))
+    return store
+
+
+def lookups(store, keys):
+    getter = store.get
+    for k in keys: getter(k)
+
+
+def traced(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return store, after - before
+
+
+if __name__ == "__main__":
+    rng = random.Random(1)
+    keys = list(range(N))
+    shuffled = keys[:]
+    rng.shuffle(shuffled)
+    values = sum(sys.getsizeof(VALUE.format(k)) for k in keys) / N
+    print(f"{N:,} keys, values ~{values:.0f} B each\n")
+    print(f"{'store':<30} {'set ns/op':>10} {'get ns/op':>10} {'bytes/entry':>12} {'(over value)':>13}")
+    contenders = [
+        ("dict (unbounded)", lambda: {}),
+        ("LRUCache(max_entries)", lambda: LRUCache(max_entries=N)),
+        ("LRUCache(+ttl)", lambda: LRUCache(max_entries=N, ttl=300)),
+        ("LRUCache(+max_bytes)", lambda: LRUCache(max_entries=N, max_bytes=1 << 40)),
+    ]
+    for label, make in contenders:
+        store = make()
+        set_ns = per_op(lambda: fill(store, keys), N)
+        get_ns = per_op(lambda: lookups(store, shuffled), N)
+        _, mem = traced(lambda: fill(make(), keys))
+        print(f"{label:<30} {set_ns:>10.0f} {get_ns:>10.0f} {mem / N:>12.0f} {mem / N - values:>13.0f}")
+
+    # 10x more distinct keys than a 10%-sized cache: the dict keeps all of them
+    print(f"\n{N * 10:,} distinct keys through a {N // 10:,}-entry cache:")
+    _, dict_mem = traced(lambda: fill({}, range(N * 10)))
+    cache, lru_mem = traced(lambda: fill(LRUCache(max_entries=N // 10), range(N * 10)))
+    print(f"  dict      {dict_mem / 1024**2:8.1f} MB, {N * 10:,} entries")
+    print(f"  LRUCache  {lru_mem / 1024**2:8.1f} MB, {len(cache):,} entries, {cache.evictions:,} evictions")
+
+    # Hit rate under a skewed (Zipf-like) workload with the cache at 10% of the key space
+    cache = LRUCache(max_entries=N // 10)
+    weights = [1 / (i + 1) for i in range(N)]
+    for k in rng.choices(keys, weights, k=N * 2):
+        if cache.get(k) is None: cache.set(k, VALUE.format(k))
+    print(f"\nZipf-like traffic, cache at 10% of keys: {cache.stats()}")
@@ -0,0 +1,101 @@
+import sys
+import time
+import threading
+import multiprocessing
+
+from Cdoe_simple_thread import LockedCounter, ShardedCounter, ProcessCounter
+
+# Increments/sec and correctness for each counter with 1..N threads or
+# processes all hammering the same counter. "lost" is expected minus what
+# the counter read afterwards - anything but 0 is a broken counter.
+PER_WORKER = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+CTX = multiprocessing.get_context("fork")
+
+counter = 0
+
+
+class NaiveGlobal:
+    """The original `counter += 1` on a module global."""
+    def incr(self, n=1):
+        global counter
+        counter += n
+
+    @property
+    def value(self): return counter
+
+
+class NaiveRead:
+    """Same race with the read and the write a call apart, which is where CPython can switch threads."""
+    def __init__(self): self._value = 0
+    def _add(self, value, n): return value + n
+    def incr(self, n=1): self._value = self._add(self._value, n)
+
+    @property
+    def value(self): return self._value
+
+
+class LockedValue:
+    """multiprocessing.Value('q') behind its own inter-process lock."""
+    def __init__(self): self._v = CTX.Value("q", 0)
+    def incr(self, n=1):
+        with self._v.get_lock(): self._v.value += n
+
+    @property
+    def value(self): return self._v.value
+
+
+class RawValue:
+    """Shared memory with no lock at all: processes race like the global does."""
+    def __init__(self): self._v = CTX.RawValue("q", 0)
+    def incr(self, n=1): self._v.value += n
+
+    @property
+    def value(self): return self._v.value
+
+
+def hammer(c, start):
+    start.wait()
+    incr = c.incr
+    for _ in range(PER_WORKER): incr()
+
+
+def run(make, workers, processes):
+    global counter
+    counter = 0
+    c = make()
+    start = (CTX if processes else threading).Event()
+    spawn = CTX.Process if processes else threading.Thread
+    workers_ = [spawn(target=hammer, args=(c, start)) for _ in range(workers)]
+    for w in workers_: w.start()
+    began = time.perf_counter()
+    start.set()
+    for w in workers_: w.join()
+    took = time.perf_counter() - began
+    expected = workers * PER_WORKER
+    return expected / took, expected - c.value
+
+
+def table(title, variants, counts, processes):
+    print(f"{title}\n{'':<26}" + "".join(f"{n:>4} x: incr/s   lost  " for n in counts))
+    for label, make in variants:
+        row = []
+        for n in counts:
+            rate, lost = run(make, n, processes)
+            row.append(f"{rate / 1e6:>11.2f}M {lost:>7}  ")
+        print(f"{label:<26}" + "".join(row))
+    print()
+
+
+if __name__ == "__main__":
+    print(f"{PER_WORKER:,} increments per worker, {multiprocessing.cpu_count()} CPU(s)\n")
+    table("Threads", [
+        ("global counter += 1", NaiveGlobal),
+        ("read, call, write", NaiveRead),
+        ("LockedCounter", LockedCounter),
+        ("ShardedCounter", ShardedCounter),
+    ], (1, 2, 4, 8), processes=False)
+    table("Processes (fork)", [
+        ("RawValue, no lock", RawValue),
+        ("Value + get_lock()", LockedValue),
+        ("ProcessCounter", ProcessCounter),
+    ], (1, 2, 4), processes=True)
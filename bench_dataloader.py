@@ -0,0 +1,134 @@
+import sys
+import time
+import asyncio
+import threading
+
+from cache_test import LRUCache, BatchLoader, DataLoader
+
+# Rendering a page of PAGE users (with repeats, some already cached) against
+# a backend that costs one round trip per query plus a little per id:
+# one-by-one lookups vs. the batching loaders, then how max_wait trades
+# added latency for batch size when requests trickle in.
+PAGE = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+ROUND_TRIP = 0.010
+PER_KEY = 0.0001
+
+
+class Backend:
+    def __init__(self):
+        self.calls = self.keys = 0
+        self._lock = threading.Lock()
+
+    def _count(self, n):
+        with self._lock:
+            self.calls += 1
+            self.keys += n
+
+    def one(self, user_id):
+        self._count(1)
+        time.sleep(ROUND_TRIP + PER_KEY)
+        return f"User_Data_{user_id}"
+
+    def bulk(self, user_ids):
+        self._count(len(user_ids))
+        time.sleep(ROUND_TRIP + PER_KEY * len(user_ids))
+        return {u: f"User_Data_{u}" for u in user_ids}
+
+    async def one_async(self, user_id):
+        self._count(1)
+        await asyncio.sleep(ROUND_TRIP + PER_KEY)
+        return f"User_Data_{user_id}"
+
+    async def bulk_async(self, user_ids):
+        self._count(len(user_ids))
+        await asyncio.sleep(ROUND_TRIP + PER_KEY * len(user_ids))
+        return {u: f"User_Data_{u}" for u in user_ids}
+
+
+def page_ids():
+    # PAGE slots, ~70% distinct, the first 20 ids already in the cache
+    return [i % int(PAGE * 0.7) for i in range(PAGE)]
+
+
+def warm_cache():
+    cache = LRUCache()
+    for i in range(20): cache.set(i, f"User_Data_{i}")
+    return cache
+
+
+def sequential(backend):
+    cache = warm_cache()
+    for user_id in page_ids():
+        if cache.get(user_id) is None: cache.set(user_id, backend.one(user_id))
+
+
+async def concurrent_one_by_one(backend):
+    cache = warm_cache()
+    async def get(user_id):
+        value = cache.get(user_id)
+        if value is None:
+            value = await backend.one_async(user_id)
+            cache.set(user_id, value)
+        return value
+    await asyncio.gather(*(get(u) for u in page_ids()))
+
+
+async def dataloader(backend, max_batch=100):
+    loader = DataLoader(backend.bulk_async, max_batch=max_batch, cache=warm_cache())
+    await loader.load_many(page_ids())
+
+
+def batchloader(backend):
+    loader = BatchLoader(backend.bulk, max_batch=100, max_wait=0.002, cache=warm_cache())
+    loader.load_many(page_ids())
+
+
+def timed(fn):
+    backend = Backend()
+    start = time.perf_counter()
+    fn(backend)
+    return time.perf_counter() - start, backend
+
+
+async def trickle(max_wait, requests=400, gap=0.0002):
+    """Requests arriving one every `gap` seconds (or as fast as the loop's timers go); latency and batch sizes."""
+    backend = Backend()
+    loader = DataLoader(backend.bulk_async, max_batch=100, max_wait=max_wait)
+    latencies = []
+
+    async def request(user_id):
+        start = time.perf_counter()
+        await loader.load(user_id)
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    began = time.perf_counter()
+    for i in range(requests):
+        tasks.append(asyncio.ensure_future(request(i)))
+        await asyncio.sleep(gap)
+    arrival = (time.perf_counter() - began) / requests
+    await asyncio.gather(*tasks)
+    latencies.sort()
+    return backend, arrival, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+if __name__ == "__main__":
+    print(f"Page of {PAGE} users ({int(PAGE * 0.7)} distinct, 20 cached); backend {ROUND_TRIP * 1000:.0f} ms/query + {PER_KEY * 1e6:.0f} us/id\n")
+    print(f"{'':<36} {'page time':>10} {'queries':>8} {'ids fetched':>12}")
+    rows = [
+        ("one by one, sequential", sequential),
+        ("one by one, concurrent (asyncio)", lambda b: asyncio.run(concurrent_one_by_one(b))),
+        ("BatchLoader (threads, 2 ms window)", batchloader),
+        ("DataLoader (one tick)", lambda b: asyncio.run(dataloader(b))),
+        ("DataLoader (one tick, max_batch 25)", lambda b: asyncio.run(dataloader(b, 25))),
+    ]
+    for label, fn in rows:
+        took, backend = timed(fn)
+        print(f"{label:<36} {took * 1000:>8.1f}ms {backend.calls:>8} {backend.keys:>12}")
+
+    print("\nRequests trickling in one at a time (400 distinct ids), DataLoader max_wait sweep:")
+    print(f"{'max_wait':>9} {'arrival gap':>12} {'queries':>8} {'avg batch':>10} {'p50':>9} {'p99':>9}")
+    for max_wait in (0.0, 0.001, 0.005, 0.02):
+        backend, arrival, p50, p99 = asyncio.run(trickle(max_wait))
+        print(f"{max_wait * 1000:>7.0f}ms {arrival * 1000:>10.2f}ms {backend.calls:>8} {backend.keys / backend.calls:>10.1f} "
+              f"{p50 * 1000:>7.1f}ms {p99 * 1000:>7.1f}ms")
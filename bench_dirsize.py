@@ -0,0 +1,65 @@
+import os
+import time
+import shutil
+import tempfile
+
+from v18_dirsize import dir_size, DirSizeCache
+
+# Synthetic %TEMP%: DIRS folders x FILES_PER_DIR small files, nested 3 deep.
+DIRS = 400
+FILES_PER_DIR = 125
+FILE_BYTES = 4096
+LIMIT = 100 * 1024 * 1024  # early-stop threshold for the bounded run
+
+
+def build_tree(root):
+    payload = b"x" * FILE_BYTES
+    for d in range(DIRS):
+        path = os.path.join(root, f"a{d % 10}", f"b{d % 40}", f"c{d}")
+        os.makedirs(path, exist_ok=True)
+        for f in range(FILES_PER_DIR):
+            with open(os.path.join(path, f"f{f}.tmp"), "wb") as fh: fh.write(payload)
+
+
+def old_walk(root):
+    # The original check_software code
+    return sum(os.path.getsize(os.path.join(dp, f)) for dp, dn, filenames in os.walk(root) for f in filenames)
+
+
+def timed(label, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<38} {best * 1000:9.1f} ms   {out}")
+    return best
+
+
+if __name__ == "__main__":
+    root = tempfile.mkdtemp(prefix="dirsize_bench_")
+    try:
+        print(f"Building {DIRS * FILES_PER_DIR:,} files in {root} ...")
+        build_tree(root)
+        total = DIRS * FILES_PER_DIR * FILE_BYTES
+        print(f"Tree size: {total / 1024**2:.0f} MB\n")
+
+        base = timed("os.walk + getsize (old)", lambda: old_walk(root))
+        timed("scandir, 1 worker", lambda: dir_size(root, workers=1).bytes)
+        timed("scandir, 8 workers", lambda: dir_size(root, workers=8).bytes)
+        timed(f"scandir, 8 workers, stop at {LIMIT // 1024**2} MB", lambda: dir_size(root, limit=LIMIT).bytes)
+
+        cache_file = os.path.join(tempfile.gettempdir(), "dirsize_bench_cache.json")
+        cache = DirSizeCache(cache_file)
+        dir_size(root, cache=cache)  # prime
+        cache.save()
+        timed("incremental rescan (nothing changed)", lambda: dir_size(root, cache=DirSizeCache(cache_file)).cached_dirs)
+
+        # Touch 1% of directories and rescan
+        for d in range(0, DIRS, 100):
+            path = os.path.join(root, f"a{d % 10}", f"b{d % 40}", f"c{d}")
+            with open(os.path.join(path, "new.tmp"), "wb") as fh: fh.write(b"y" * FILE_BYTES)
+        timed("incremental rescan (1% dirs changed)", lambda: dir_size(root, cache=DirSizeCache(cache_file)).bytes, repeat=1)
+        os.remove(cache_file)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,73 @@
+import sys
+import time
+import random
+
+from v18_eventlog import FileEventSource, EventBookmarks, RULES, scan
+
+# v18_eventlog against a busy System log: the old "newest 200 events" read,
+# a full scan of the 30-day window, and the bookmarked incremental scan after
+# a day's worth of new events.
+EVENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+PER_DAY = 2_000
+DAY = 86400
+NOISE = [(7036, "Service Control Manager"), (10016, "DistributedCOM"), (1014, "Microsoft-Windows-DNS-Client"),
+         (6013, "EventLog"), (16, "Microsoft-Windows-Kernel-General")]
+
+
+def synthetic_log(n, now, rng, first_id=1):
+    """n events ending at `now`, PER_DAY a day; one disk Event 7 and a few Update failures sprinkled in."""
+    events = []
+    for i in range(n):
+        t = now - (n - i) * DAY / PER_DAY
+        event_id, provider = rng.choice(NOISE)
+        if rng.random() < 0.0005: event_id, provider = 20, "Microsoft-Windows-WindowsUpdateClient"
+        events.append({"record_id": first_id + i, "id": event_id, "provider": provider, "time": t, "message": ""})
+    return events
+
+
+def last_200(events):
+    # What the PowerShell probe did: Get-WinEvent -MaxEvents 200 | Where Id -eq 7
+    return sum(1 for e in events[-200:] if e["id"] == 7)
+
+
+def timed(fn):
+    t = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t, out
+
+
+if __name__ == "__main__":
+    rng = random.Random(3)
+    now = time.time()
+    events = synthetic_log(EVENTS, now, rng)
+    # A bad block 12 days ago: inside the 30-day window, thousands of events back
+    bad = next(e for e in events if e["time"] >= now - 12 * DAY)
+    bad.update(id=7, provider="disk")
+    source = FileEventSource({"System": events})
+    print(f"System log: {EVENTS:,} events ({EVENTS / PER_DAY:.0f} days), bad block at record {bad['record_id']:,} "
+          f"({events[-1]['record_id'] - bad['record_id']:,} events ago)\n")
+
+    took, found = timed(lambda: last_200(events))
+    print(f"{'old: newest 200 events':<34} {took * 1000:8.1f} ms  bad sectors seen: {found}")
+
+    took, full = timed(lambda: scan(source, EventBookmarks(), "bench", RULES, now))
+    print(f"{'first run: full 30-day window':<34} {took * 1000:8.1f} ms  bad sectors: {full['bad_sectors']['count']}, "
+          f"update failures: {full['update_failures']['count']}, matching events read {full['bad_sectors']['scanned']:,}")
+
+    # Next day: keep the bookmark, append a day of events
+    bookmarks = EventBookmarks()
+    scan(source, bookmarks, "bench", RULES, now)
+    tomorrow = now + DAY
+    events += synthetic_log(PER_DAY, tomorrow, rng, first_id=events[-1]["record_id"] + 1)
+    source = FileEventSource({"System": events})
+    took, inc = timed(lambda: scan(source, bookmarks, "bench", RULES, tomorrow))
+    print(f"{'next day: incremental':<34} {took * 1000:8.1f} ms  bad sectors: {inc['bad_sectors']['count']}, "
+          f"update failures: {inc['update_failures']['count']} ({inc['update_failures']['new']} new), matching events read {inc['bad_sectors']['scanned']:,}")
+    took, again = timed(lambda: scan(source, bookmarks, "bench", RULES, tomorrow))
+    print(f"{'same day again: nothing new':<34} {took * 1000:8.1f} ms  matching events read {again['bad_sectors']['scanned']:,}")
+
+    # Log cleared: record ids start over, the bookmark is dropped and the window re-read
+    cleared = FileEventSource({"System": synthetic_log(PER_DAY, tomorrow, rng)})
+    took, reset = timed(lambda: scan(cleared, bookmarks, "bench", RULES, tomorrow))
+    print(f"{'after the log was cleared':<34} {took * 1000:8.1f} ms  matching events read {reset['bad_sectors']['scanned']:,}, "
+          f"bad sectors still remembered: {reset['bad_sectors']['count']}")
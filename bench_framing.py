@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import socket
+import subprocess
+
+from tcp_framing import HEADER, FramedClient
+
+# FRAMES on loopback against the selectors server: the obvious client
+# (header + payload concatenated per send, recv() chunks joined) vs.
+# FramedClient (sendmsg scatter/gather, recv_into a preallocated buffer),
+# one request at a time and pipelined. Small frames are syscall-bound,
+# large ones copy-bound.
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVER = os.path.join(HERE, "simple_TCP_server_in_python.py")
+PORT = 9961
+SCALE = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+SMALL, SMALL_COUNT = 64, int(50_000 * SCALE)
+LARGE, LARGE_COUNT = 1024 * 1024, int(300 * SCALE)
+
+
+def naive_connect():
+    sock = socket.create_connection(("127.0.0.1", PORT))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.recv(64)  # greeting
+    sock.sendall(b"FRAMES\n")
+    return sock
+
+
+def naive_recv_frame(sock, pending):
+    """The usual loop: recv() chunks, join, slice; `pending` carries bytes past the frame."""
+    data = pending[0]
+    while len(data) < HEADER.size or len(data) < HEADER.size + HEADER.unpack_from(data)[0]:
+        chunk = sock.recv(256 * 1024)
+        if not chunk: raise ConnectionError("server closed the connection")
+        data += chunk
+    end = HEADER.size + HEADER.unpack_from(data)[0]
+    pending[0] = data[end:]
+    return data[HEADER.size:end]
+
+
+def naive(payloads, depth=1):
+    sock = naive_connect()
+    pending = [b""]
+    with sock:
+        for i in range(0, len(payloads), depth):
+            batch = payloads[i:i + depth]
+            for p in batch: sock.sendall(HEADER.pack(len(p)) + p)  # one send + one copy per frame
+            for _ in batch: naive_recv_frame(sock, pending)
+    return len(payloads)
+
+
+def framed(payloads, depth=1):
+    with FramedClient("127.0.0.1", PORT) as client:
+        if depth == 1:
+            for p in payloads: client.request(p)
+            return len(payloads)
+        return client.pipeline(payloads, depth)
+
+
+def row(label, fn, payloads, depth):
+    start = time.perf_counter()
+    n = fn(payloads, depth)
+    took = time.perf_counter() - start
+    size = len(payloads[0])
+    print(f"{label:<34} {n / took:>12,.0f} frames/s {n * size / took / 1024**2:>10,.1f} MB/s")
+    return n / took
+
+
+if __name__ == "__main__":
+    proc = subprocess.Popen([sys.executable, SERVER, "--port", str(PORT)], stdout=subprocess.PIPE, text=True)
+    proc.stdout.readline()
+    try:
+        small = [os.urandom(SMALL)] * SMALL_COUNT
+        print(f"{SMALL_COUNT:,} x {SMALL} B frames (echoed)")
+        base = row("naive, 1 in flight", naive, small, 1)
+        row("FramedClient.request, 1 in flight", framed, small, 1)
+        row("naive, 64 in flight (send per frame)", naive, small, 64)
+        for depth in (16, 64, 256):
+            fast = row(f"pipeline, {depth} in flight (sendmsg)", framed, small, depth)
+        print(f"  -> {fast / base:.0f}x the naive request/response rate\n")
+
+        large = [os.urandom(LARGE)] * LARGE_COUNT
+        print(f"{LARGE_COUNT:,} x 1 MB frames (echoed)")
+        base = row("naive, 1 in flight", naive, large, 1)
+        row("FramedClient.request, 1 in flight", framed, large, 1)
+        fast = row("pipeline, 4 in flight", framed, large, 4)
+        print(f"  -> {fast / base:.1f}x the naive throughput")
+    finally:
+        proc.terminate()
+        proc.wait()
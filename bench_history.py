@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+
+from v18_history import HistoryStore
+
+# v18_history at fleet scale, test_speed_diff_by_B-Tree.py style:
+# fill a store with a year of daily runs from many hosts, time the query CLI's
+# questions, then drop the indexes and time them again.
+FINDINGS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+PER_RUN = 40
+HOSTS = 500
+DAY = 86400
+CATEGORIES = ["OS Version", "CPU", "RAM Usage", "SMART Status", "Uptime", "Firewall", "Antivirus", "BitLocker",
+              "Temp Files", "Startup Apps", "DNS", "Latency", "Win Updates", "BSOD History", "Power Plan", "Top Hog"]
+
+
+def fake_run(rng, host, ts, failing_disk):
+    findings = []
+    for i in range(PER_RUN):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        status, message = "INFO", f"value {rng.randint(1, 999)}"
+        if category == "SMART Status":
+            status, message = ("FAIL", "Failing") if failing_disk else ("PASS", "OK")
+        elif rng.random() < 0.04:
+            status, message = rng.choice(["WARNING", "FAIL"]), f"{category} problem {rng.randint(1, 3)}"
+        findings.append({"ts": ts + i * 0.05, "module": "bench", "category": category, "status": status,
+                         "message": message, "detail": "", "fix": "Investigate manually."})
+    stats = {"PASS": 0, "WARNING": 0, "FAIL": 0, "INFO": 0}
+    for f in findings: stats[f["status"]] += 1
+    return findings, stats
+
+
+def fill(store, runs):
+    rng = random.Random(7)
+    now = time.time()
+    start = now - runs / HOSTS * DAY
+    disk_dies = {f"PC-{h:04d}": start + rng.random() * (now - start) for h in range(0, HOSTS, 25)}
+    for n in range(runs):
+        host = f"PC-{n % HOSTS:04d}"
+        ts = start + (n // HOSTS) * DAY + rng.random() * 3600
+        findings, stats = fake_run(rng, host, ts, ts >= disk_dies.get(host, float("inf")))
+        store.record_run(host, findings, stats, ts=ts, duration_ms=9000, backend="bench")
+    return disk_dies
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t)
+    return best, out
+
+
+def capped(conn, fn, seconds=30):
+    """One timed call, or None if SQLite is still busy after `seconds` (aborted from the progress handler)."""
+    deadline = time.perf_counter() + seconds
+    conn.set_progress_handler(lambda: time.perf_counter() > deadline, 100_000)
+    try: return timed(fn, repeat=1)[0]
+    except sqlite3.OperationalError: return None
+    finally: conn.set_progress_handler(None, 0)
+
+
+def queries(store, host, now):
+    week, month = now - 7 * DAY, now - 30 * DAY
+    return [
+        ("trend (1 host, 1 check, 30d)", lambda: store.trend(host, "SMART Status", month)),
+        ("issues --host (first/last seen)", lambda: store.issue_spans(month, host)),
+        ("fleet counts (7d)", lambda: store.fleet_counts(week)),
+        ("regressed (7d)", lambda: store.regressions(week)),
+    ]
+
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(prefix="v18_history_"), "history.db")
+    store = HistoryStore(path)
+    runs = FINDINGS // PER_RUN
+    print(f"Filling {runs:,} runs x {PER_RUN} findings ({HOSTS} hosts) ...")
+    t = time.perf_counter()
+    disk_dies = fill(store, runs)
+    took = time.perf_counter() - t
+    print(f"  {took:.1f}s ({runs / took:,.0f} runs/s, one transaction each), {os.path.getsize(path) / 1024**2:.0f} MB\n")
+
+    # Per-row autocommit, for comparison with one transaction per run
+    scratch = sqlite3.connect(os.path.join(os.path.dirname(path), "autocommit.db"), isolation_level=None)
+    scratch.execute("PRAGMA journal_mode=WAL")
+    scratch.execute("CREATE TABLE findings (host TEXT, ts REAL, category TEXT, status TEXT, message TEXT)")
+    t = time.perf_counter()
+    for i in range(PER_RUN * 20): scratch.execute("INSERT INTO findings VALUES (?,?,?,?,?)", ("PC", i, "CPU", "INFO", "x"))
+    per_run_autocommit = (time.perf_counter() - t) / 20
+    print(f"One run as {PER_RUN} autocommitted INSERTs: {per_run_autocommit * 1000:.1f} ms vs batched {took / runs * 1000:.2f} ms\n")
+
+    host = next(iter(disk_dies))
+    now = time.time()
+    indexed = {}
+    for label, fn in queries(store, host, now):
+        indexed[label] = timed(fn)
+    store.conn.execute("DROP INDEX idx_findings_host_cat_ts")
+    store.conn.execute("DROP INDEX idx_findings_status_ts")
+    print(f"{'query':<34} {'indexed':>10} {'no index':>10}  rows")
+    for label, fn in queries(store, host, now):
+        t_no = capped(store.conn, fn)
+        t_ix, rows = indexed[label]
+        print(f"{label:<34} {t_ix * 1000:8.1f}ms {f'{t_no * 1000:8.0f}ms' if t_no is not None else '    > 30s'}  {len(rows)}")
+
+    store.conn.execute("CREATE INDEX idx_findings_host_cat_ts ON findings(host, category, ts)")
+    first_fail = min((r for r in store.issue_spans(0, host) if r[1] == "SMART Status"), key=lambda r: r[3])
+    print(f"\n{host}'s disk: planted failure {time.strftime('%Y-%m-%d', time.localtime(disk_dies[host]))}, "
+          f"history says first seen {time.strftime('%Y-%m-%d', time.localtime(first_fail[3]))}")
+    store.close()
@@ -0,0 +1,75 @@
+import sys
+import time
+import random
+import tracemalloc
+from array import array
+
+from compare_finding_number_in_list_vs_set import SortedIntArray, Bitmap, BloomFilter
+
+# N distinct ints drawn from [0, 4N) (25% dense), held as list, set, sorted
+# array, bitmap and Bloom filter: build time, traced bytes per element, and
+# per-lookup latency one at a time and as a batch (half hits, half misses).
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+QUERIES = 20_000
+LIST_QUERIES = 20  # every list miss walks all N elements
+REPEAT = 5
+
+
+def build(make, source):
+    """(structure, seconds, traced bytes); source is an array('q'), so list/set pay for their own int objects."""
+    start = time.perf_counter()
+    s = make(source)
+    took = time.perf_counter() - start
+    del s
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    s = make(source)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return s, took, size
+
+
+def best_ns(fn, ops):
+    """Fastest of REPEAT runs, in ns per operation."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter_ns()
+        fn()
+        best = min(best, time.perf_counter_ns() - start)
+    return best / ops
+
+
+def single(s, queries):
+    for q in queries: q in s
+
+
+if __name__ == "__main__":
+    rng = random.Random(1)
+    source = array("q", rng.sample(range(4 * N), N))
+    members = set(source)
+    hits = rng.sample(list(source), QUERIES // 2)
+    misses = [q for q in (rng.randrange(4 * N) for _ in range(QUERIES)) if q not in members][:QUERIES // 2]
+    queries = hits + misses
+    rng.shuffle(queries)
+
+    contenders = [
+        ("list", list),
+        ("set", set),
+        ("SortedIntArray", SortedIntArray),
+        ("Bitmap", lambda src: Bitmap(src, lo=0, hi=4 * N)),
+        ("BloomFilter(1%)", lambda src: BloomFilter(N, 0.01).update(src)),
+        ("BloomFilter(0.1%)", lambda src: BloomFilter(N, 0.001).update(src)),
+    ]
+    print(f"{N:,} distinct ints from [0, {4 * N:,}); {QUERIES:,} queries, half hits; best of {REPEAT}\n")
+    print(f"{'':<18} {'build':>8} {'B/elem':>7} {'single ns':>10} {'batch ns':>9} {'false +':>8}")
+    for label, make in contenders:
+        s, took, size = build(make, source)
+        if label == "list":
+            single_ns, batch = best_ns(lambda: single(s, misses[:LIST_QUERIES]), LIST_QUERIES), "-"
+        else:
+            single_ns = best_ns(lambda: single(s, queries), QUERIES)
+            if hasattr(s, "contains_many"): batch = f"{best_ns(lambda: s.contains_many(queries), QUERIES):.0f}"
+            else: batch = f"{best_ns(lambda: [q in s for q in queries], QUERIES):.0f}"
+        false_pos = f"{sum(q in s for q in misses) / len(misses):.3%}" if label.startswith("Bloom") else "-"
+        print(f"{label:<18} {took:>7.2f}s {size / N:>7.1f} {single_ns:>10.0f} {batch:>9} {false_pos:>8}")
+        del s
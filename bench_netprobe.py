@@ -0,0 +1,138 @@
+import sys
+import time
+import socket
+import struct
+import asyncio
+import threading
+import http.client
+
+import v18_netprobe
+from v18_netprobe import dns_query, dns_answer
+
+# check_network against local stand-in servers, so it runs offline and the
+# numbers are repeatable:
+#   - a UDP DNS server answering A queries after DNS_DELAY (NXDOMAIN for
+#     names it doesn't know)
+#   - an HTTP/1.1 keep-alive server answering after HTTP_DELAY, plus
+#     HANDSHAKE_DELAY on a connection's first response (stands in for the
+#     TCP + TLS setup a real endpoint costs)
+# "old" is the previous shape: one lookup / one fresh connection at a time.
+# "new" is v18_netprobe: every target concurrently, pooled keep-alive.
+DNS_DELAY = 0.015
+HTTP_DELAY = 0.020
+HANDSHAKE_DELAY = 0.040
+SAMPLES = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+ZONE = {"google.com": "10.0.0.1", "cloudflare.com": "10.0.0.2", "microsoft.com": "10.0.0.3"}
+
+
+class StandInDns(asyncio.DatagramProtocol):
+    def connection_made(self, transport): self.transport = transport
+
+    def datagram_received(self, data, addr):
+        asyncio.get_running_loop().call_later(DNS_DELAY, self.answer, data, addr)
+
+    def answer(self, query, addr):
+        qid = struct.unpack_from("!H", query)[0]
+        end = query.index(b"\0", 12) + 5
+        labels, pos = [], 12
+        while query[pos]:
+            labels.append(query[pos + 1:pos + 1 + query[pos]].decode())
+            pos += 1 + query[pos]
+        address = ZONE.get(".".join(labels))
+        if address is None:
+            self.transport.sendto(struct.pack("!HHHHHH", qid, 0x8183, 1, 0, 0, 0) + query[12:end], addr)
+            return
+        answer = b"\xc0\x0c" + struct.pack("!HHIH", 1, 1, 60, 4) + socket.inet_aton(address)
+        self.transport.sendto(struct.pack("!HHHHHH", qid, 0x8180, 1, 1, 0, 0) + query[12:end] + answer, addr)
+
+
+async def stand_in_http(reader, writer):
+    first = True
+    try:
+        while True:
+            request = await reader.readuntil(b"\r\n\r\n")
+            await asyncio.sleep(HTTP_DELAY + (HANDSHAKE_DELAY if first else 0))
+            first = False
+            path = request.split(b" ")[1]
+            if path == b"/json":
+                body = b'{"query": "198.51.100.7", "isp": "Stand-in ISP"}'
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+            else:
+                writer.write(b"HTTP/1.1 204 No Content\r\n\r\n")
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def start_servers():
+    """Run both stand-ins on a background loop; returns (dns addr, http port)."""
+    ready = threading.Event()
+    ports = {}
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(StandInDns, local_addr=("127.0.0.1", 0))
+        server = await asyncio.start_server(stand_in_http, "127.0.0.1", 0)
+        ports["dns"] = transport.get_extra_info("sockname")
+        ports["http"] = server.sockets[0].getsockname()[1]
+        ready.set()
+        await asyncio.Event().wait()
+
+    threading.Thread(target=asyncio.run, args=(main(),), daemon=True).start()
+    ready.wait()
+    return ports["dns"], ports["http"]
+
+
+def old_style(nameserver, http_urls, public_ip_url, samples):
+    """Sequential lookups and a fresh HTTP connection per request."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(3)
+    for name in list(ZONE) * samples:
+        sock.sendto(dns_query(name, 1), nameserver)
+        dns_answer(sock.recv(512))
+    sock.close()
+    for url in http_urls * samples + [public_ip_url]:
+        host, _, path = url[7:].partition("/")
+        conn = http.client.HTTPConnection(host, timeout=3)
+        conn.request("GET", "/" + path)
+        conn.getresponse().read()
+        conn.close()
+
+
+if __name__ == "__main__":
+    nameserver, port = start_servers()
+    http_urls = [f"http://127.0.0.1:{port}/generate_204", f"http://127.0.0.1:{port}/connecttest",
+                 f"http://localhost:{port}/cp"]
+    public_ip_url = f"http://127.0.0.1:{port}/json"
+    print(f"Stand-ins: DNS {nameserver[0]}:{nameserver[1]} (+{DNS_DELAY * 1000:.0f} ms), "
+          f"HTTP :{port} (+{HTTP_DELAY * 1000:.0f} ms, +{HANDSHAKE_DELAY * 1000:.0f} ms per new connection)\n")
+
+    start = time.perf_counter()
+    old_style(nameserver, http_urls, public_ip_url, SAMPLES)
+    old = time.perf_counter() - start
+    n_dns, n_http = len(ZONE) * SAMPLES, len(http_urls) * SAMPLES + 1
+    print(f"old: sequential, new connection each   {old * 1000:7.0f} ms  ({n_dns} lookups, {n_http} requests, {n_http} connections)")
+
+    report = v18_netprobe.run(dns_targets=list(ZONE) + ["missing.example"], http_targets=http_urls,
+                              samples=SAMPLES, nameserver=nameserver, public_ip_url=public_ip_url)
+    print(f"new: concurrent, pooled keep-alive     {report['duration_ms']:7.0f} ms  "
+          f"({n_dns + SAMPLES} lookups, {report['requests']} requests, {report['connections']} connections)\n")
+
+    for name, entry in report["dns"].items():
+        lat = entry["latency_ms"]
+        print(f"  DNS  {name:<28} {str(entry['address']):<10} cold {entry['cold_ms'] or 0:5.1f}  "
+              + (f"p50 {lat['p50']:5.1f}  p95 {lat['p95']:5.1f}  max {lat['max']:5.1f} ms" if lat else f"errors {entry['errors']}"))
+    for url, entry in report["http"].items():
+        lat = entry["latency_ms"]
+        print(f"  HTTP {url.split('//')[1]:<28} {entry['status']:<10} cold {entry['cold_ms']:5.1f}  "
+              f"p50 {lat['p50']:5.1f}  p95 {lat['p95']:5.1f}  max {lat['max']:5.1f} ms")
+    print(f"  Public IP: {report['public_ip']}")
+
+    ok = (all(report["dns"][n]["address"] == a for n, a in ZONE.items())
+          and report["dns"]["missing.example"]["address"] is None
+          and all(e["status"] == 204 and e["samples"] == SAMPLES for e in report["http"].values())
+          and report["connections"] == len(http_urls) + 1  # one per concurrent target, then reused
+          and report["public_ip"]["query"] == "198.51.100.7")
+    print(f"\nResults match the stand-ins: {ok}")
@@ -0,0 +1,62 @@
+import sys
+import time
+import subprocess
+
+import psutil
+
+import v18_procrank
+from v18_procrank import snapshot, rank, top_processes
+
+# Spawns N idle `sleep` processes plus one CPU burner (Linux/macOS), then
+# compares the old Top Hog probe with the two-sample heap ranking.
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+BURNER = [sys.executable, "-c", "while True: pass"]
+
+
+def old_top_hog():
+    # The original check_performance code
+    return sorted([p.info for p in psutil.process_iter(['name', 'cpu_percent'])], key=lambda p: p['cpu_percent'], reverse=True)[0]
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+if __name__ == "__main__":
+    children = []
+    try:
+        print(f"Spawning {N} idle processes + 1 busy loop ...")
+        for _ in range(N): children.append(subprocess.Popen(["sleep", "300"]))
+        burner = subprocess.Popen(BURNER)
+        children.append(burner)
+        time.sleep(1.0)
+        print(f"Processes on host: {len(psutil.pids())}\n")
+
+        t, top = timed(old_top_hog, repeat=1)
+        print(f"old: sort all by first-call cpu_percent  {t * 1000:8.1f} ms -> {top['name']} ({top['cpu_percent']}%)  <- arbitrary")
+
+        t, before = timed(lambda: snapshot(psutil))
+        print(f"new: one snapshot ({len(before)} procs)        {t * 1000:8.1f} ms")
+        after = snapshot(psutil)
+        t_heap, _ = timed(lambda: rank(before, after, 1.0, top_n=5), repeat=20)
+        heap_nlargest = v18_procrank.heapq.nlargest
+        v18_procrank.heapq.nlargest = lambda n, it: sorted(it, reverse=True)[:n]
+        t_sort, _ = timed(lambda: rank(before, after, 1.0, top_n=5), repeat=20)
+        v18_procrank.heapq.nlargest = heap_nlargest
+        print(f"new: rank() cpu/rss/io with heapq        {t_heap * 1000:8.2f} ms  (same with full sorts: {t_sort * 1000:.2f} ms)")
+
+        # A child dying between the two samples must just drop out
+        children.pop(0).kill()
+        start = time.perf_counter()
+        ranked = top_processes(interval=0.5, top_n=3)
+        print(f"new: top_processes(interval=0.5)         {(time.perf_counter() - start) * 1000:8.1f} ms")
+        for p in ranked["cpu"]: print(f"       {p['name']:<16} pid {p['pid']:<7} {p['cpu_percent']:>6}%")
+        print(f"busy loop pid {burner.pid} ranked first: {ranked['cpu'][0]['pid'] == burner.pid}")
+    finally:
+        for c in children: c.kill()
+        for c in children: c.wait()
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import threading
+from collections import deque
+
+from bench_runner import load_file
+
+# queue_simulation has no .py suffix, so load it by path
+queue_simulation = load_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "queue_simulation"))
+OrderQueue, ConsumerPool = queue_simulation.OrderQueue, queue_simulation.ConsumerPool
+
+# The order queue under load: 1 vs N consumers on I/O-bound jobs (throughput
+# and latency percentiles), producer backpressure on a small rail, CPU burned
+# while nothing arrives (the old busy-polled list vs. blocking get()), and
+# draining a big backlog with list.pop(0) vs. a deque.
+JOBS = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+JOB_TIME = 0.010
+IDLE = 1.0
+
+
+def io_job(order):
+    time.sleep(JOB_TIME)
+
+
+def run_pool(workers, jobs=JOBS, maxsize=64):
+    orders = OrderQueue(maxsize)
+    pool = ConsumerPool(orders, io_job, workers=workers).start()
+    for i in range(jobs): orders.put(i)
+    return pool.stop()
+
+
+def busy_poll_idle():
+    """The first design: a chef spinning on len() of a shared list; returns CPU seconds burned."""
+    order_queue, done = [], threading.Event()
+    burned = []
+
+    def chef():
+        start = time.thread_time()
+        while not done.is_set():
+            if len(order_queue) > 0: order_queue.pop(0)
+        burned.append(time.thread_time() - start)
+
+    t = threading.Thread(target=chef)
+    t.start()
+    time.sleep(IDLE)
+    done.set()
+    t.join()
+    return burned[0]
+
+
+def blocking_idle():
+    """A chef blocked in OrderQueue.get() with nothing to do; returns CPU seconds burned."""
+    orders, burned = OrderQueue(), []
+
+    def chef():
+        start = time.thread_time()
+        while orders.get()[1] is not queue_simulation.STOP: pass
+        burned.append(time.thread_time() - start)
+
+    t = threading.Thread(target=chef)
+    t.start()
+    time.sleep(IDLE)
+    orders.close(1)
+    t.join()
+    return burned[0]
+
+
+def drain(store, pop):
+    start = time.perf_counter()
+    while store: pop()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{JOBS} jobs of {JOB_TIME * 1000:.0f} ms (I/O-bound), producer as fast as the rail allows\n")
+    print(f"{'consumers':>9} {'elapsed':>8} {'jobs/s':>8} {'wait p50':>9} {'wait p99':>9} {'e2e p50':>9} {'e2e p99':>9} {'blocked':>8}")
+    for workers in (1, 2, 4, 8, 16):
+        m = run_pool(workers)
+        print(f"{workers:>9} {m['elapsed_s']:>7.2f}s {m['throughput']:>8.1f} {m['wait_ms']['p50']:>7.1f}ms {m['wait_ms']['p99']:>7.1f}ms "
+              f"{m['latency_ms']['p50']:>7.1f}ms {m['latency_ms']['p99']:>7.1f}ms {m['producer_blocked_s']:>7.2f}s")
+
+    print("\nBackpressure: 100 jobs into a rail of maxsize, 4 consumers")
+    for maxsize in (4, 16, 100):
+        m = run_pool(4, jobs=100, maxsize=maxsize)
+        print(f"  maxsize {maxsize:>3}: producer blocked {m['producer_blocked_s']:.2f}s, end-to-end p99 {m['latency_ms']['p99']:.1f}ms")
+
+    print(f"\nCPU burned by one idle consumer over {IDLE:.0f}s with no orders:")
+    print(f"  busy-polled list  {busy_poll_idle():.3f}s")
+    print(f"  OrderQueue.get()  {blocking_idle():.3f}s")
+
+    n = 100_000
+    print(f"\nDraining a {n:,}-order backlog:")
+    backlog = list(range(n))
+    print(f"  list.pop(0)       {drain(backlog, lambda: backlog.pop(0)) * 1000:8.1f}ms")
+    backlog = deque(range(n))
+    print(f"  deque.popleft()   {drain(backlog, backlog.popleft) * 1000:8.1f}ms")
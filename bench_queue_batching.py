@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+from bench_runner import load_file
+
+# queue_simulation has no .py suffix, so load it by path
+queue_simulation = load_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "queue_simulation"))
+OrderQueue, ConsumerPool, BatchConsumerPool = queue_simulation.OrderQueue, queue_simulation.ConsumerPool, queue_simulation.BatchConsumerPool
+
+# One consumer in front of a batch-capable backend (a fixed cost per call
+# plus a small cost per item, like a bulk INSERT): max_batch swept against
+# the arrival rate, reporting throughput, batch sizes and end-to-end latency.
+DURATION = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+PER_CALL = 0.005
+PER_ITEM = 0.0002
+MAX_WAIT = 0.005
+
+
+def backend(batch):
+    time.sleep(PER_CALL + PER_ITEM * len(batch))
+
+
+def produce(orders, rate):
+    """Paced arrivals at `rate`/s for DURATION seconds (deadline-based, so sleep jitter doesn't accumulate)."""
+    start, n = time.perf_counter(), int(rate * DURATION)
+    for i in range(n):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0: time.sleep(delay)
+        orders.put(i)
+
+
+def run(rate, max_batch):
+    orders = OrderQueue(maxsize=0)  # unbounded: an overloaded consumer shows up as latency, not a blocked producer
+    if max_batch == 1: pool = ConsumerPool(orders, lambda item: backend([item]))
+    else: pool = BatchConsumerPool(orders, backend, max_batch=max_batch, max_wait=MAX_WAIT)
+    pool.start()
+    produce(orders, rate)
+    return pool.stop()
+
+
+if __name__ == "__main__":
+    print(f"Backend: {PER_CALL * 1000:.0f} ms per call + {PER_ITEM * 1000:.1f} ms per item "
+          f"(one-at-a-time capacity ~{1 / (PER_CALL + PER_ITEM):.0f}/s); max_wait {MAX_WAIT * 1000:.0f} ms; {DURATION:.1f}s of arrivals\n")
+    print(f"{'rate/s':>7} {'max_batch':>9} {'done/s':>8} {'avg batch':>9} {'batch sizes (size:count)':<34} {'p50':>9} {'p99':>9}")
+    for rate in (100, 500, 2000):
+        for max_batch in (1, 4, 16, 64):
+            m = run(rate, max_batch)
+            sizes = m.get("batch_size", {"mean": 1.0, "histogram": {1: m["items"]}})
+            hist = " ".join(f"{k}:{v}" for k, v in sizes["histogram"].items())
+            if len(hist) > 34: hist = hist[:31] + "..."
+            print(f"{rate:>7} {max_batch:>9} {m['throughput']:>8.0f} {sizes['mean']:>9.1f} {hist:<34} "
+                  f"{m['latency_ms']['p50']:>7.1f}ms {m['latency_ms']['p99']:>7.1f}ms")
+        print()
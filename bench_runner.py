@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import time
+import inspect
+import platform
+import argparse
+import datetime
+import statistics
+import tracemalloc
+import importlib.util
+from importlib.machinery import SourceFileLoader
+
+# ==========================================
+# BENCHMARK RUNNER
+# ==========================================
+# Discovers every top-level `bench_*` function in the given files (like
+# pytest does with test_*). A benchmark either IS the timed body, or does
+# its setup and returns the body:
+#
+#   def bench_set_lookup():
+#       s = set(range(100_000))
+#       return lambda: 99_999 in s
+#
+# Each body is calibrated so one sample lasts >= --min-time (fast bodies run
+# many calls per sample), warmed up, then sampled --repeat times with
+# perf_counter_ns. Reported per call: median, IQR and min, plus the
+# tracemalloc peak of one extra, untimed call (tracing slows allocation, so
+# it never overlaps the timed samples). --json saves the run; --baseline
+# compares against a saved run and exits 1 when any median or memory peak
+# got worse by more than --threshold.
+
+def load_file(path):
+    """Import a file by path (works for names with dashes or no .py suffix)."""
+    name = os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+    loader = SourceFileLoader(name, path)
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader(name, loader))
+    loader.exec_module(module)
+    return module
+
+
+def discover(paths, keyword=None):
+    """[(name, fn)] for every bench_* function defined in the files, in source order."""
+    found = []
+    for path in paths:
+        module = load_file(path)
+        prefix = os.path.splitext(os.path.basename(path))[0]
+        benches = []
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if not name.startswith("bench_") or fn.__module__ != module.__name__: continue
+            full = f"{prefix}::{name}"
+            if keyword and keyword not in full: continue
+            benches.append((fn.__code__.co_firstlineno, full, fn))
+        found += [(full, fn) for _, full, fn in sorted(benches, key=lambda b: b[0])]
+    return found
+
+
+def prepare(fn):
+    """Run the benchmark once: a returned callable is the body, otherwise fn itself is (and that call was a warmup)."""
+    body = fn()
+    return body if callable(body) else fn
+
+
+def calibrate(body, min_time_ns):
+    """Calls per sample so one sample takes at least min_time_ns."""
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number): body()
+        took = time.perf_counter_ns() - start
+        if took >= min_time_ns or number >= 1 << 24: return number
+        # Aim a little past the target from what this attempt took, at most 10x per step
+        number = min(number * 10, max(number + 1, int(number * min_time_ns * 1.2 / max(took, 1))))
+
+
+def peak_memory(body):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        body()
+        return max(0, tracemalloc.get_traced_memory()[1] - before)
+    finally: tracemalloc.stop()
+
+
+def measure(fn, warmup=2, repeat=15, min_time=0.01, memory=True):
+    body = prepare(fn)
+    number = calibrate(body, int(min_time * 1e9))
+    for _ in range(warmup):
+        for _ in range(number): body()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number): body()
+        samples.append((time.perf_counter_ns() - start) / number)
+    q1, median, q3 = statistics.quantiles(samples, n=4, method="inclusive") if len(samples) > 1 else samples * 3
+    return {
+        "median_ns": round(median, 1),
+        "iqr_ns": round(q3 - q1, 1),
+        "min_ns": round(min(samples), 1),
+        "q1_ns": round(q1, 1),
+        "q3_ns": round(q3, 1),
+        "number": number,
+        "repeat": repeat,
+        "peak_bytes": peak_memory(body) if memory else None,
+    }
+
+
+def compare(results, baseline, threshold):
+    """[(name, what, old, new, ratio, regressed)] for benchmarks present in both runs."""
+    rows = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None: continue
+        ratio = new["median_ns"] / old["median_ns"] if old["median_ns"] else 1.0
+        # A slowdown only counts if it clears the old run's noise too (new q1 above old q3)
+        slower = ratio > 1 + threshold and new["q1_ns"] > old["q3_ns"]
+        rows.append((name, "time", old["median_ns"], new["median_ns"], ratio, slower))
+        if new.get("peak_bytes") is not None and old.get("peak_bytes"):
+            mem = new["peak_bytes"] / old["peak_bytes"]
+            rows.append((name, "memory", old["peak_bytes"], new["peak_bytes"], mem, mem > 1 + threshold and new["peak_bytes"] - old["peak_bytes"] > 1024))
+    return rows
+
+
+def human_ns(ns):
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale: return f"{ns / scale:.2f}{unit}"
+    return f"{ns:.0f}ns"
+
+
+def human_bytes(n):
+    if n is None: return "-"
+    for unit, scale in (("MB", 1 << 20), ("KB", 1 << 10)):
+        if n >= scale: return f"{n / scale:.1f}{unit}"
+    return f"{n}B"
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1: raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def positive_float(text):
+    value = float(text)
+    if not value > 0: raise argparse.ArgumentTypeError(f"must be greater than 0, got {text}")
+    return value
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Run bench_* functions with warmup, repeats and a baseline comparison")
+    parser.add_argument("paths", nargs="*", default=["bench_suite.py"], help="Files to collect bench_* functions from (default: bench_suite.py)")
+    parser.add_argument("-k", dest="keyword", help="Only benchmarks whose file::name contains this")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed samples before measuring")
+    parser.add_argument("--repeat", type=positive_int, default=15, help="Timed samples per benchmark")
+    parser.add_argument("--min-time", type=positive_float, default=0.01, help="Seconds one sample should last (fast bodies loop)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak run")
+    parser.add_argument("--json", help="Write results here")
+    parser.add_argument("--baseline", help="Earlier --json output to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown/growth that counts as a regression (0.10 = 10%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    benches = discover(args.paths, args.keyword)
+    if not benches: sys.exit("No bench_* functions found.")
+
+    print(f"{len(benches)} benchmarks; warmup {args.warmup}, {args.repeat} samples of >= {args.min_time * 1000:g} ms\n")
+    print(f"{'benchmark':<52} {'median':>10} {'IQR':>10} {'min':>10} {'peak mem':>10}")
+    results = {}
+    for name, fn in benches:
+        r = results[name] = measure(fn, args.warmup, args.repeat, args.min_time, not args.no_memory)
+        print(f"{name:<52} {human_ns(r['median_ns']):>10} {human_ns(r['iqr_ns']):>10} {human_ns(r['min_ns']):>10} {human_bytes(r['peak_bytes']):>10}")
+
+    if args.json:
+        run = {
+            "meta": {
+                "when": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "warmup": args.warmup, "repeat": args.repeat, "min_time": args.min_time,
+            },
+            "results": results,
+        }
+        with open(args.json, "w") as f: json.dump(run, f, indent=2)
+        print(f"\nSaved {args.json}")
+
+    if not args.baseline: return 0
+    with open(args.baseline) as f: baseline = json.load(f)
+    rows = compare(results, baseline["results"], args.threshold)
+    print(f"\nAgainst {args.baseline} ({baseline['meta'].get('when', '?')}), threshold {args.threshold:.0%}:")
+    regressions = 0
+    for name, what, old, new, ratio, regressed in rows:
+        fmt = human_ns if what == "time" else human_bytes
+        flag = "REGRESSION" if regressed else ("faster" if what == "time" and ratio < 1 - args.threshold else "")
+        print(f"  {name:<52} {what:<6} {fmt(old):>10} -> {fmt(new):>10} {ratio:>6.2f}x  {flag}")
+        regressions += regressed
+    missing = sorted(set(baseline["results"]) - set(results))
+    if missing: print(f"  not run this time: {', '.join(missing)}")
+    print(f"\n{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
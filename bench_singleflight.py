@@ -0,0 +1,112 @@
+import sys
+import time
+import asyncio
+import threading
+
+from cache_test import LRUCache, SingleFlight, AsyncSingleFlight, MISSING
+
+# Thundering herd on one hot key: N concurrent callers miss together.
+# Cache-aside alone sends all N to the backend; with SingleFlight the
+# backend sees one call and the rest wait for it. Also checks that a
+# failing fetch reaches every waiter and is not cached.
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+BACKEND_DELAY = 0.2
+
+
+class Backend:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.in_flight = self.peak = 0
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def _leave(self):
+        with self._lock: self.in_flight -= 1
+
+    def query(self, user_id):
+        self._enter()
+        try:
+            time.sleep(BACKEND_DELAY)
+            if self.fail: raise ConnectionError("database unavailable")
+            return f"User_Data_{user_id}"
+        finally: self._leave()
+
+    async def query_async(self, user_id):
+        self._enter()
+        try:
+            await asyncio.sleep(BACKEND_DELAY)
+            if self.fail: raise ConnectionError("database unavailable")
+            return f"User_Data_{user_id}"
+        finally: self._leave()
+
+
+def threaded(backend, coalesce):
+    cache, flights = LRUCache(), SingleFlight()
+    barrier = threading.Barrier(N)
+    results, errors = [], []
+
+    def load(user_id):
+        data = backend.query(user_id)
+        cache.set(user_id, data)
+        return data
+
+    def caller():
+        barrier.wait()  # everyone misses at the same moment
+        try:
+            data = cache.get(7, MISSING)
+            if data is MISSING: data = flights.do(7, load, 7) if coalesce else load(7)
+            results.append(data)
+        except ConnectionError as e: errors.append(e)
+
+    threads = [threading.Thread(target=caller) for _ in range(N)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return time.perf_counter() - start, results, errors, cache
+
+
+async def asynchronous(backend, coalesce):
+    cache, flights = LRUCache(), AsyncSingleFlight()
+
+    async def load(user_id):
+        data = await backend.query_async(user_id)
+        cache.set(user_id, data)
+        return data
+
+    async def caller():
+        data = cache.get(7, MISSING)
+        if data is MISSING: data = await (flights.do(7, load, 7) if coalesce else load(7))
+        return data
+
+    start = time.perf_counter()
+    out = await asyncio.gather(*(caller() for _ in range(N)), return_exceptions=True)
+    results = [r for r in out if not isinstance(r, BaseException)]
+    errors = [r for r in out if isinstance(r, BaseException)]
+    return time.perf_counter() - start, results, errors, cache
+
+
+def report(label, backend, took, results, errors, cache):
+    print(f"{label:<30} {backend.calls:>8} {backend.peak:>9} {took:>8.2f}s {len(results):>5} {len(errors):>6} {len(cache):>7}")
+
+
+if __name__ == "__main__":
+    print(f"{N} concurrent callers, one hot key, backend takes {BACKEND_DELAY * 1000:.0f} ms\n")
+    print(f"{'':<30} {'backend':>8} {'in-flight':>9} {'time':>9} {'ok':>5} {'errors':>6} {'cached':>7}")
+    for coalesce in (False, True):
+        backend = Backend()
+        report(f"threads, {'single-flight' if coalesce else 'cache-aside'}", backend, *threaded(backend, coalesce))
+    for coalesce in (False, True):
+        backend = Backend()
+        report(f"asyncio, {'single-flight' if coalesce else 'cache-aside'}", backend, *asyncio.run(asynchronous(backend, coalesce)))
+
+    print()
+    backend = Backend(fail=True)
+    report("threads, failing backend", backend, *threaded(backend, True))
+    backend = Backend(fail=True)
+    report("asyncio, failing backend", backend, *asyncio.run(asynchronous(backend, True)))
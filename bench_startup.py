@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+
+# Cold-start cost of v18.py per module selection. Each run is a fresh
+# interpreter replaying the sample fixture headless, so what's measured is
+# imports + collector setup + the selected probes, not the machine itself.
+# The -X importtime pass shows which modules each selection pulls in.
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURE = os.path.join(HERE, "fixtures", "v18_sample_windows.json")
+SELECTIONS = ["identity", "network", "security", "hardware", "software", "performance",
+              "identity,hardware,network,security,software,performance"]
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+WORKDIR = tempfile.mkdtemp(prefix="v18_startup_")  # the FIX_SHEET report lands here
+STARTUP = {"site", "encodings"}  # paid by the bare interpreter too
+
+
+def v18_argv(modules):
+    return [os.path.join(HERE, "v18.py"), "--fixture", FIXTURE, "--no-tui", "--no-cache",
+            "--format", "ndjson", "--output", os.devnull, "--modules", modules, "--hog-interval", "0"]
+
+
+def cold_start(modules, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + v18_argv(modules), cwd=WORKDIR, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def import_profile(modules):
+    """(total import µs, {top-level package: cumulative µs}) from -X importtime."""
+    out = subprocess.run([sys.executable, "-X", "importtime"] + v18_argv(modules), cwd=WORKDIR,
+                         stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True, check=True).stderr
+    packages = {}
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit(): continue  # header row
+        if name[:3] == "   ": continue  # nested import, already counted in its parent
+        top = name.strip().split(".")[0]
+        if top in STARTUP: continue
+        packages[top] = packages.get(top, 0) + int(cumulative)
+    return sum(packages.values()), packages
+
+
+def interpreter_floor(runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    floor = interpreter_floor(RUNS)
+    print(f"Bare interpreter: {floor * 1000:.0f} ms (median of {RUNS})\n")
+    print(f"{'modules':<24} {'cold start':>10} {'imports':>9}  heaviest imports")
+    for modules in SELECTIONS:
+        median = cold_start(modules, RUNS)
+        total, packages = import_profile(modules)
+        heavy = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:4]
+        label = "all" if modules.count(",") == 5 else modules
+        print(f"{label:<24} {median * 1000:8.0f} ms {total / 1000:6.0f} ms  "
+              + ", ".join(f"{name} {us / 1000:.0f}" for name, us in heavy))
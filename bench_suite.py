@@ -0,0 +1,111 @@
+import os
+import threading
+
+from cache_test import LRUCache, cached
+from Cdoe_simple_thread import LockedCounter, ShardedCounter, ProcessCounter
+from compare_finding_number_in_list_vs_set import SortedIntArray, Bitmap, BloomFilter
+from bench_runner import load_file
+
+# The timing scripts' measurements as bench_* functions for bench_runner.py:
+#   python bench_runner.py --json baseline.json
+#   python bench_runner.py --baseline baseline.json
+# Setup happens in the function; the returned callable is what gets timed.
+btree = load_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_speed_diff_by_B-Tree.py"))  # dashes: not importable by name
+
+N = 100_000
+TARGET = N - 1  # worst case for the list
+
+
+# --- compare_finding_number_in_list_vs_set.py ---
+
+def bench_list_lookup():
+    s = list(range(N))
+    return lambda: TARGET in s
+
+
+def bench_set_lookup():
+    s = set(range(N))
+    return lambda: TARGET in s
+
+
+def bench_sorted_array_lookup():
+    s = SortedIntArray(range(N))
+    return lambda: TARGET in s
+
+
+def bench_bitmap_lookup():
+    s = Bitmap.from_range(0, N)
+    return lambda: TARGET in s
+
+
+def bench_bloom_lookup():
+    s = BloomFilter(N, 0.01).update(range(N))
+    return lambda: TARGET in s
+
+
+def bench_set_build():
+    set(range(N))
+
+
+def bench_sorted_array_build():
+    SortedIntArray(range(N))
+
+
+# --- test_speed_diff_by_B-Tree.py ---
+
+def bench_sqlite_scan_lookup():
+    conn, data = btree.build_table(N, seed=1)
+    target = data[N // 2][0]
+    return lambda: btree.find(conn, target)
+
+
+def bench_sqlite_index_lookup():
+    conn, data = btree.build_table(N, seed=1)
+    btree.create_index(conn)
+    target = data[N // 2][0]
+    return lambda: btree.find(conn, target)
+
+
+# --- cache_test.py ---
+
+def bench_lru_get_hit():
+    cache = LRUCache(max_entries=N)
+    for i in range(N): cache.set(i, i)
+    return lambda: cache.get(TARGET)
+
+
+def bench_lru_set_evicting():
+    cache = LRUCache(max_entries=1000)
+    keys = iter(range(1 << 62))
+    return lambda: cache.set(next(keys), None)
+
+
+def bench_cached_decorator_hit():
+    fn = cached(max_entries=16)(lambda user_id: user_id)
+    fn(7)
+    return lambda: fn(7)
+
+
+# --- Cdoe_simple_thread.py ---
+
+def bench_locked_counter_incr():
+    return LockedCounter().incr
+
+
+def bench_sharded_counter_incr():
+    return ShardedCounter().incr
+
+
+def bench_process_counter_incr():
+    return ProcessCounter().incr
+
+
+def bench_sharded_counter_4_threads():
+    def run():
+        c = ShardedCounter()
+        def work():
+            for _ in range(10_000): c.incr()
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+    return run
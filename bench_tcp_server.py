@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import socket
+import signal
+import threading
+import subprocess
+
+import psutil
+
+import tcp_loadgen
+
+# simple_TCP_server_in_python.py under load on loopback: the original thread
+# per connection vs. the selectors event loop, from a handful of clients to
+# thousands. Client and server share the machine, so absolute numbers are
+# lower than a real network would allow; the comparison is the point.
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVER = os.path.join(HERE, "simple_TCP_server_in_python.py")
+DURATION = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+CONNECTIONS = [10, 100, 1000, 4000]
+
+
+def start_server(port, engine, *extra):
+    proc = subprocess.Popen([sys.executable, SERVER, "--port", str(port), "--engine", engine, *extra],
+                            stdout=subprocess.PIPE, text=True)
+    proc.stdout.readline()  # "listening on ..."
+    return proc
+
+
+def footprint(proc):
+    p = psutil.Process(proc.pid)
+    return p.memory_info().rss / 1024**2, p.num_threads()
+
+
+if __name__ == "__main__":
+    tcp_loadgen.raise_fd_limit()
+    print(f"{DURATION:g}s per ping test, loopback, {os.cpu_count()} CPU(s)\n")
+    print(f"{'engine':<10} {'test':<18} {'rate':>14} {'p50':>10} {'p99':>10} {'errors':>7} {'server RSS':>11} {'threads':>8}")
+    for port, engine in ((9971, "threads"), (9972, "selectors")):
+        proc = start_server(port, engine)
+        try:
+            res = tcp_loadgen.run("connect", port=port, total=5000, concurrency=200)
+            rss, threads = footprint(proc)
+            print(f"{engine:<10} {'connect x5000':<18} {res['rate']:>9,.0f} c/s {res['latency_ms']['p50']:>8.2f}ms "
+                  f"{res['latency_ms']['p99']:>8.2f}ms {res['errors']:>7} {rss:>9.0f}MB {threads:>8}")
+            for n in CONNECTIONS:
+                # sample the footprint while the connections are open
+                peak, done = [0, 0], False
+                def watch():
+                    while not done:
+                        rss, threads = footprint(proc)
+                        peak[0], peak[1] = max(peak[0], rss), max(peak[1], threads)
+                        time.sleep(0.2)
+                watcher = threading.Thread(target=watch, daemon=True)
+                watcher.start()
+                res = tcp_loadgen.run("ping", port=port, connections=n, duration=DURATION)
+                done = True
+                watcher.join()
+                lat = res["latency_ms"] or {"p50": 0, "p99": 0}
+                print(f"{engine:<10} {f'ping x{n}':<18} {res['rate']:>9,.0f} r/s {lat['p50']:>8.2f}ms "
+                      f"{lat['p99']:>8.2f}ms {res['errors']:>7} {peak[0]:>9.0f}MB {peak[1]:>8}")
+        finally:
+            proc.kill()
+            proc.wait()
+        print()
+
+    # Idle timeout + graceful shutdown on the event loop
+    proc = start_server(9973, "selectors", "--idle-timeout", "1", "--grace", "2")
+    idle = [socket.create_connection(("127.0.0.1", 9973)) for _ in range(500)]
+    time.sleep(2.5)
+    closed = 0
+    for s in idle:
+        s.settimeout(1)
+        try:
+            s.recv(64)  # greeting
+            if s.recv(64) == b"": closed += 1
+        except OSError: closed += 1
+        s.close()
+    print(f"idle timeout 1s: {closed}/500 silent connections closed by the server")
+    proc.kill()
+    proc.wait()
+    proc = start_server(9974, "selectors", "--grace", "2")
+    busy = socket.create_connection(("127.0.0.1", 9974))
+    busy.recv(64)
+    busy.sendall(b"PING\n")
+    t = time.perf_counter()
+    proc.send_signal(signal.SIGTERM)
+    proc.wait()
+    print(f"SIGTERM with a PING connection open: exited after {time.perf_counter() - t:.1f}s (grace 2s); {proc.stdout.read().strip()}")
+    busy.close()
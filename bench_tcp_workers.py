@@ -0,0 +1,53 @@
+import os
+import sys
+import json
+import signal
+import socket
+import subprocess
+
+import tcp_loadgen
+
+# --workers scaling on loopback: the same PING load against 1..N event-loop
+# processes, with SO_REUSEPORT listeners and with one pre-forked socket.
+# The load generator runs in its own processes on the same machine, so it
+# competes with the server for cores; with C cores, expect the curve to
+# flatten around C/2 workers. On a single core there is nothing to scale to.
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVER = os.path.join(HERE, "simple_TCP_server_in_python.py")
+DURATION = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+CORES = os.cpu_count() or 1
+WORKERS = sorted({1, 2, max(1, CORES // 2), CORES})
+CONNECTIONS = 400
+
+
+def start_server(port, workers, share):
+    proc = subprocess.Popen([sys.executable, SERVER, "--port", str(port), "--workers", str(workers), "--share", share],
+                            stdout=subprocess.PIPE, text=True)
+    proc.stdout.readline()  # "listening on ..."
+    return proc
+
+
+def stop_server(proc):
+    proc.send_signal(signal.SIGTERM)
+    out = proc.communicate(timeout=30)[0]
+    line = next((l for l in out.splitlines() if l.startswith("Stopped: ")), None)
+    return json.loads(line[len("Stopped: "):]) if line else {}
+
+
+if __name__ == "__main__":
+    tcp_loadgen.raise_fd_limit()
+    client_procs = max(1, CORES // 2)
+    print(f"{CORES} CPU(s), {CONNECTIONS} PING connections from {client_procs} client process(es), {DURATION:g}s per run\n")
+    print(f"{'share':<10} {'workers':>7} {'requests/s':>12} {'speedup':>8} {'p99':>9}  accepted per worker")
+    shares = ["reuseport", "inherit"] if hasattr(socket, "SO_REUSEPORT") else ["inherit"]
+    for i, share in enumerate(shares):
+        base = None
+        for n in WORKERS:
+            port = 9950 + 10 * i + n
+            proc = start_server(port, n, share)
+            try: res = tcp_loadgen.run("ping", port=port, connections=CONNECTIONS, duration=DURATION, procs=client_procs)
+            finally: stats = stop_server(proc)
+            base = base or res["rate"]
+            spread = " / ".join(str(w["accepted"]) for w in stats.get("workers", [])) or "-"
+            print(f"{share:<10} {n:>7} {res['rate']:>12,.0f} {res['rate'] / base:>7.2f}x {res['latency_ms']['p99']:>7.2f}ms  {spread}")
+        print()
@@ -1,7 +1,332 @@
+import sys
 import time
+import asyncio
+import functools
+import threading
+import collections
 
-# This Dictionary acts as our "Redis"
-cache = {}
+# ==========================================
+# BOUNDED CACHE (LRU + TTL)
+# ==========================================
+# A plain dict as "Redis" grows forever and never forgets a stale value.
+# LRUCache keeps the same get/set idea with limits:
+#   max_entries / max_bytes : the least recently used entries go first (either
+#                             may be None for no bound of that kind)
+#   ttl                     : per cache or per set(), in seconds; expired entries
+#                             miss. None never expires; 0 is expired on arrival
+#   one lock                : safe to share between threads
+# hits / misses / evictions / expirations are counted for stats().
+# @cached(...) wraps a function with its own LRUCache, like functools.lru_cache.
+#
+# A cache alone still lets a hot key's misses stampede the database: 100
+# callers that miss at once make 100 slow queries. SingleFlight (threads) and
+# AsyncSingleFlight (asyncio) coalesce them: the first caller for a key runs
+# the fetch, everyone else arriving meanwhile waits for that result. An
+# exception reaches every waiter and nothing is cached, so the next call retries.
+#
+# Rendering a page of 200 users is still 200 round trips, one id at a time.
+# BatchLoader (threads) and DataLoader (asyncio) collect the ids asked for
+# within one short window (DataLoader: one event-loop tick by default),
+# drop duplicates and cached ids, and make ONE bulk call per max_batch ids.
+# Ids already being fetched join that fetch, so they single-flight too.
+
+MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, max_entries=1024, max_bytes=None, ttl=None, sizeof=sys.getsizeof, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.clock = clock
+        self._data = collections.OrderedDict()  # key -> (value, expires or None, size); oldest first
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[1] is not None and entry[1] <= self.clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key, default=None):
+        """Like get(), but not counted in stats() and not marked as recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[1] is not None and entry[1] <= self.clock()): return default
+            return entry[0]
+
+    def set(self, key, value, ttl=MISSING):
+        ttl = self.ttl if ttl is MISSING else ttl
+        size = self.sizeof(value) if self.max_bytes else 0
+        with self._lock:
+            if key in self._data: self._remove(key)
+            self._data[key] = (value, self.clock() + ttl if ttl is not None else None, size)
+            self.bytes += size
+            while (self.max_entries is not None and len(self._data) > self.max_entries) or (self.max_bytes and self.bytes > self.max_bytes and len(self._data) > 1):
+                _, (_, _, old) = self._data.popitem(last=False)
+                self.bytes -= old
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key not in self._data: return False
+            self._remove(key)
+            return True
+
+    def _remove(self, key):
+        self.bytes -= self._data.pop(key)[2]
+
+    def purge_expired(self):
+        """Drop every expired entry now (get() only notices the ones it's asked for)."""
+        with self._lock:
+            now = self.clock()
+            dead = [k for k, (_, expires, _) in self._data.items() if expires is not None and expires <= now]
+            for k in dead: self._remove(k)
+            self.expirations += len(dead)
+            return len(dead)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self): return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > self.clock())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "expirations": self.expirations,
+                "entries": len(self._data), "bytes": self.bytes, "hit_rate": round(self.hits / lookups, 3) if lookups else None}
+
+
+def cached(max_entries=1024, max_bytes=None, ttl=None):
+    """Decorator: memoize a function on its arguments in an LRUCache (exposed as `.cache`)."""
+    def decorate(fn):
+        cache = LRUCache(max_entries, max_bytes, ttl)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = args + tuple(sorted(kwargs.items())) if kwargs else args
+            value = cache.get(key, MISSING)
+            if value is MISSING:
+                value = fn(*args, **kwargs)
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorate
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.calls = self.shared = 0  # fn executions / callers that rode along on one
+
+    def do(self, key, fn, *args):
+        """fn(*args) once per key at a time; concurrent callers with the same key get the same result (or exception)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.calls += 1
+            else: self.shared += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None: raise flight.error
+            return flight.value
+        try:
+            flight.value = fn(*args)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock: del self._flights[key]
+            flight.done.set()
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        self._flights = {}
+        self.calls = self.shared = 0
+
+    async def do(self, key, fn, *args):
+        """await fn(*args) once per key at a time; see SingleFlight.do."""
+        task = self._flights.get(key)
+        if task is None:
+            # Its own task, so a cancelled caller (even the first) doesn't cancel the fetch for everyone else
+            task = self._flights[key] = asyncio.ensure_future(fn(*args))
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+            self.calls += 1
+        else: self.shared += 1
+        return await asyncio.shield(task)
+
+
+def _chunks(items, size):
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class BatchLoader:
+    def __init__(self, batch_fn, max_batch=100, max_wait=0.002, cache=None):
+        """batch_fn(keys) -> {key: value}; keys it leaves out raise KeyError for their callers."""
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._pending = {}   # key -> _Flight, waiting for the window to close
+        self._inflight = {}  # key -> _Flight, in a bulk call right now
+        self._collecting = False  # a caller is holding the window open
+        self.batches = self.requested = self.fetched = 0
+
+    def load(self, key):
+        if self.cache is not None:
+            value = self.cache.get(key, MISSING)
+            if value is not MISSING: return value
+        batch, lead = None, False
+        with self._lock:
+            self.requested += 1
+            flight = self._inflight.get(key) or self._pending.get(key)
+            if flight is None:
+                flight = self._pending[key] = _Flight()
+                if len(self._pending) >= self.max_batch: batch = self._take()
+                elif not self._collecting: self._collecting = lead = True
+        if lead:
+            # First caller of the window: give the others max_wait to join, then send what's there
+            time.sleep(self.max_wait)
+            with self._lock:
+                self._collecting = False
+                batch = self._take()
+        if batch: self._run(batch)
+        flight.done.wait()
+        if flight.error is not None: raise flight.error
+        return flight.value
+
+    def load_many(self, keys):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(min(32, len(keys)) or 1) as pool: return list(pool.map(self.load, keys))
+
+    def _take(self):
+        batch, self._pending = self._pending, {}
+        self._inflight.update(batch)
+        return batch
+
+    def _run(self, batch):
+        try:
+            for keys in _chunks(batch, self.max_batch):
+                self.batches += 1
+                self.fetched += len(keys)
+                try: results, error = self.batch_fn(keys), None
+                except Exception as e: results, error = {}, e
+                self._settle(batch, keys, results, error)
+        except BaseException as e:
+            # KeyboardInterrupt / SystemExit mid-batch: hand it to every waiter still parked, then let it through
+            self._settle(batch, [k for k, flight in batch.items() if not flight.done.is_set()], {}, e)
+            raise
+
+    def _settle(self, batch, keys, results, error):
+        with self._lock:
+            for k in keys: self._inflight.pop(k, None)
+        for k in keys:
+            flight = batch[k]
+            try:
+                if error is None and k in results:
+                    flight.value = results[k]
+                    if self.cache is not None: self.cache.set(k, flight.value)
+                else: flight.error = error or KeyError(k)
+            finally: flight.done.set()
+
+
+class DataLoader:
+    def __init__(self, batch_fn, max_batch=100, max_wait=0.0, cache=None):
+        """async batch_fn(keys) -> {key: value}. max_wait=0 batches everything asked for in the same loop tick."""
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = cache
+        self._pending = {}   # key -> Future
+        self._inflight = {}
+        self._handle = None
+        self._tasks = set()  # running batch tasks; the loop only holds them weakly
+        self.batches = self.requested = self.fetched = 0
+
+    async def load(self, key):
+        if self.cache is not None:
+            value = self.cache.get(key, MISSING)
+            if value is not MISSING: return value
+        self.requested += 1
+        fut = self._inflight.get(key) or self._pending.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_batch: self._dispatch()
+            elif self._handle is None:
+                self._handle = loop.call_later(self.max_wait, self._dispatch) if self.max_wait else loop.call_soon(self._dispatch)
+        return await asyncio.shield(fut)
+
+    async def load_many(self, keys):
+        return await asyncio.gather(*(self.load(k) for k in keys))
+
+    def _dispatch(self):
+        if self._handle is not None: self._handle.cancel()
+        self._handle = None
+        batch, self._pending = self._pending, {}
+        self._inflight.update(batch)
+        for keys in _chunks(batch, self.max_batch):
+            task = asyncio.ensure_future(self._run(keys, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, keys, batch):
+        self.batches += 1
+        self.fetched += len(keys)
+        results, error = {}, None
+        try: results = await self.batch_fn(keys)
+        except BaseException as e:
+            error = e
+            if not isinstance(e, Exception): raise  # CancelledError / KeyboardInterrupt: waiters get it below
+        finally:
+            for k in keys:
+                self._inflight.pop(k, None)
+                fut = batch[k]
+                if fut.done(): continue
+                if error is None and k in results:
+                    if self.cache is not None: self.cache.set(k, results[k])
+                    fut.set_result(results[k])
+                elif isinstance(error, asyncio.CancelledError): fut.cancel()
+                else: fut.set_exception(error or KeyError(k))
+
+
+# This cache acts as our "Redis" (bounded, and user data goes stale after 5 minutes)
+cache = LRUCache(max_entries=10_000, ttl=300)
 
 def slow_database_query(user_id):
     print(f"   [DB] Fetching User {user_id} from Hard Disk... (Slow)")
@@ -9,29 +334,75 @@ def slow_database_query(user_id):
     return f"User_Data_{user_id}"
 
 def get_user(user_id):
-    # 1. CHECK CACHE (The "Hit")
-    if user_id in cache:
+    # 1. CHECK CACHE (The "Hit"); peek() only decides what to print - the loader's own
+    #    lookup is the one counted in cache.stats(), so each call is one hit or one miss
+    if cache.peek(user_id, MISSING) is not MISSING:
         print(f"✅ [Cache] Found User {user_id} instantly!")
-        return cache[user_id]
-    
-    # 2. CACHE MISS (The "Miss")
-    print(f"❌ [Cache] User {user_id} not found.")
-    
-    # 3. FETCH FROM DB
-    data = slow_database_query(user_id)
-    
-    # 4. SAVE TO CACHE (For next time)
-    cache[user_id] = data
-    return data
+    else:
+        # 2. CACHE MISS (The "Miss")
+        print(f"❌ [Cache] User {user_id} not found.")
+
+    # 3. FETCH FROM DB: batched with every other miss in the next couple of ms, once per id
+    # 4. SAVE TO CACHE (For next time): the loader does it before waking the callers
+    return user_loader.load(user_id)
+
+def slow_database_bulk_query(user_ids):
+    print(f"   [DB] Fetching {len(user_ids)} Users in one query... (Slow)")
+    time.sleep(2) # one round trip, however many ids
+    return {user_id: f"User_Data_{user_id}" for user_id in user_ids}
+
+async def slow_database_bulk_query_async(user_ids):
+    print(f"   [DB] Fetching {len(user_ids)} Users in one query... (Slow, async)")
+    await asyncio.sleep(2)
+    return {user_id: f"User_Data_{user_id}" for user_id in user_ids}
+
+user_loader = BatchLoader(slow_database_bulk_query, cache=cache)
+async_user_loader = DataLoader(slow_database_bulk_query_async, cache=cache)
+
+async def get_user_async(user_id):
+    return await async_user_loader.load(user_id)
 
 # --- SIMULATION ---
 
-print("--- Request 1: User 55 (First Time) ---")
-start = time.time()
-print(f"Result: {get_user(55)}")
-print(f"Time Taken: {time.time() - start:.2f} seconds\n")
+if __name__ == "__main__":
+    print("--- Request 1: User 55 (First Time) ---")
+    start = time.perf_counter()
+    print(f"Result: {get_user(55)}")
+    print(f"Time Taken: {time.perf_counter() - start:.2f} seconds\n")
+
+    print("--- Request 2: User 55 (Second Time) ---")
+    start = time.perf_counter()
+    print(f"Result: {get_user(55)}")
+    print(f"Time Taken: {time.perf_counter() - start:.2f} seconds\n")
+
+    print("--- Request 3: User 55 after its TTL ---")
+    cache.set(55, cache.peek(55), ttl=0.1)
+    time.sleep(0.2)
+    start = time.perf_counter()
+    print(f"Result: {get_user(55)}")
+    print(f"Time Taken: {time.perf_counter() - start:.2f} seconds")
+    print(f"Cache stats: {cache.stats()}\n")
+
+    print("--- Decorator: 3 slots, 4 users ---")
+    query = cached(max_entries=3)(slow_database_query)
+    for user_id in (1, 2, 3, 1, 4, 2):
+        start = time.perf_counter()
+        query(user_id)
+        print(f"User {user_id}: {time.perf_counter() - start:.2f} seconds")
+    print(f"Cache stats: {query.cache.stats()}\n")
+
+    print("--- Thundering herd: 20 threads miss on User 77 at once ---")
+    start, calls = time.perf_counter(), user_loader.batches
+    threads = [threading.Thread(target=get_user, args=(77,)) for _ in range(20)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    print(f"Time Taken: {time.perf_counter() - start:.2f} seconds, DB calls: {user_loader.batches - calls}\n")
 
-print("--- Request 2: User 55 (Second Time) ---")
-start = time.time()
-print(f"Result: {get_user(55)}")
-print(f"Time Taken: {time.time() - start:.2f} seconds")
+    print("--- A page of 200 users (some repeated, User 55 cached), 1000 asyncio tasks ---")
+    page = [55] + [100 + i % 200 for i in range(999)]
+    async def render():
+        return await asyncio.gather(*(get_user_async(user_id) for user_id in page))
+    start = time.perf_counter()
+    results = asyncio.run(render())
+    print(f"Time Taken: {time.perf_counter() - start:.2f} seconds, {len(results)} results, "
+          f"DB calls: {async_user_loader.batches} for {async_user_loader.fetched} distinct ids (max_batch {async_user_loader.max_batch})")
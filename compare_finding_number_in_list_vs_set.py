@@ -1,22 +1,167 @@
+import math
 import time
+import hashlib
+from array import array
+from bisect import bisect_left
 
-# 1. Setup
-print("Building database...")
-N = 10_000_000
-my_list = list(range(N))
-my_set = set(range(N)) # This uses a Hash Map internally
-target = 9_999_999
-
-print("Race starting...")
-
-# 2. Test List Search (Linear Search - O(n))
-start = time.time()
-found = target in my_list
-end = time.time()
-print(f"List Search Time: {end - start:.10f} seconds")
-
-# 3. Test Set Search (Hash Map Search - O(1))
-start = time.time()
-found = target in my_set
-end = time.time()
-print(f"Set  Search Time: {end - start:.10f} seconds")
\ No newline at end of file
+# ==========================================
+# MEMBERSHIP STRUCTURES
+# ==========================================
+# A list of ints costs ~36 B/element (8 B pointer + a 28 B int object) and
+# searches linearly; a set hashes in O(1) but costs ~60 B/element. When the
+# members are ints there are much denser options:
+#
+#   SortedIntArray : sorted array('q') + bisect; 8 B/element, O(log n)
+#   Bitmap         : one bit per value in [lo, hi); the answer for dense ranges
+#   BloomFilter    : ~1.2 B/element at 1% false positives; never a false
+#                    negative, sometimes a false positive
+# Each has `x in s` and contains_many(xs) for batches (sorted batches let
+# SortedIntArray walk forward instead of bisecting from scratch).
+
+class SortedIntArray:
+    def __init__(self, values=()):
+        self._a = array("q", sorted(set(values)))
+
+    def __contains__(self, x):
+        a = self._a
+        i = bisect_left(a, x)
+        return i < len(a) and a[i] == x
+
+    def contains_many(self, xs):
+        a, n = self._a, len(self._a)
+        out = [False] * len(xs)
+        lo = 0
+        for j in sorted(range(len(xs)), key=xs.__getitem__):  # query in order, each search starts where the last ended
+            x = xs[j]
+            lo = bisect_left(a, x, lo)
+            if lo == n: break
+            out[j] = a[lo] == x
+        return out
+
+    def __len__(self): return len(self._a)
+
+    @property
+    def nbytes(self): return self._a.itemsize * len(self._a)
+
+
+class Bitmap:
+    def __init__(self, values=(), lo=0, hi=None):
+        values = values if hi is not None else list(values)
+        if hi is None: hi = max(values, default=lo - 1) + 1
+        self.lo, self.hi = lo, hi
+        self._bits = bytearray((hi - lo + 7) // 8)
+        self._count = 0
+        for v in values: self.add(v)
+
+    @classmethod
+    def from_range(cls, start, stop):
+        """Every value in [start, stop) - filled a byte at a time, not a bit."""
+        bm = cls(lo=start, hi=stop)
+        full, rest = divmod(stop - start, 8)
+        bm._bits[:full] = b"\xff" * full
+        if rest: bm._bits[full] = (1 << rest) - 1
+        bm._count = stop - start
+        return bm
+
+    def add(self, v):
+        if not self.lo <= v < self.hi: raise ValueError(f"{v} outside bitmap range [{self.lo}, {self.hi})")
+        i = v - self.lo
+        if not self._bits[i >> 3] & (1 << (i & 7)):
+            self._bits[i >> 3] |= 1 << (i & 7)
+            self._count += 1
+
+    def __contains__(self, v):
+        if not self.lo <= v < self.hi: return False
+        i = v - self.lo
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def contains_many(self, xs):
+        bits, lo, hi = self._bits, self.lo, self.hi
+        return [lo <= v < hi and bool(bits[(v - lo) >> 3] & (1 << ((v - lo) & 7))) for v in xs]
+
+    def __len__(self): return self._count
+
+    @property
+    def nbytes(self): return len(self._bits)
+
+
+_M64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    def __init__(self, capacity, fp_rate=0.01):
+        if capacity < 1: raise ValueError("capacity must be at least 1")
+        if not 0 < fp_rate < 1: raise ValueError("fp_rate must be between 0 and 1")
+        self.capacity, self.fp_rate = capacity, fp_rate
+        # Optimal size and hash count for `capacity` items at `fp_rate`
+        self.m = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self._bits = bytearray((self.m + 7) // 8)
+        self._count = 0
+
+    def _positions(self, key):
+        # Double hashing (Kirsch-Mitzenmacher): k positions from two hashes. Ints go
+        # through splitmix64 (a few integer multiplies); anything else, or a
+        # filter too big for 32-bit halves, through a 128-bit blake2b digest.
+        m = self.m
+        if isinstance(key, int) and m <= 1 << 32:
+            z = (key + 0x9E3779B97F4A7C15) & _M64
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _M64
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _M64
+            z ^= z >> 31
+            h1, h2 = z & 0xFFFFFFFF, (z >> 32) | 1
+        else:
+            digest = hashlib.blake2b(str(key).encode(), digest_size=16).digest()
+            h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % m for i in range(self.k)]
+
+    def add(self, key):
+        bits = self._bits
+        for p in self._positions(key): bits[p >> 3] |= 1 << (p & 7)
+        self._count += 1
+
+    def update(self, keys):
+        for key in keys: self.add(key)
+        return self
+
+    def __contains__(self, key):
+        bits = self._bits
+        for p in self._positions(key):
+            if not bits[p >> 3] & (1 << (p & 7)): return False  # most misses stop at the first clear bit
+        return True
+
+    def contains_many(self, keys): return [k in self for k in keys]
+
+    def __len__(self): return self._count
+
+    @property
+    def nbytes(self): return len(self._bits)
+
+    def expected_fp_rate(self):
+        """False-positive rate for the items added so far: (1 - e^(-kn/m))^k."""
+        return (1 - math.exp(-self.k * self._count / self.m)) ** self.k
+
+
+if __name__ == "__main__":
+    # 1. Setup
+    print("Building database...")
+    N = 10_000_000
+    my_list = list(range(N))
+    my_set = set(range(N)) # This uses a Hash Map internally
+    my_array = SortedIntArray(range(N))
+    my_bitmap = Bitmap.from_range(0, N)
+    target = 9_999_999
+    ROUNDS = 1000
+
+    print(f"Race starting... (worst case for the list: the last element; average of {ROUNDS} lookups, perf_counter)")
+
+    # 2. Test List Search (Linear Search - O(n)); only a few rounds, each one walks 10M elements
+    start = time.perf_counter()
+    for _ in range(10): found = target in my_list
+    print(f"List   Search Time: {(time.perf_counter() - start) / 10:.10f} seconds")
+
+    # 3. Test Set Search (Hash Map Search - O(1)) and the compact alternatives
+    for label, s in (("Set   ", my_set), ("Array ", my_array), ("Bitmap", my_bitmap)):
+        start = time.perf_counter()
+        for _ in range(ROUNDS): found = target in s
+        print(f"{label} Search Time: {(time.perf_counter() - start) / ROUNDS:.10f} seconds")
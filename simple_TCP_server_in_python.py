@@ -1,21 +1,563 @@
+import os
+import sys
+import json
+import time
 import socket
+import signal
+import argparse
+import tempfile
+import selectors
+import threading
 
-# 1. Create a TCP Socket (SOCK_STREAM means TCP)
-server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+from tcp_framing import FrameReader, FrameWriter, FrameError, send_frames
 
-# 2. Bind to an address (Localhost, Port 9999)
-server.bind(('127.0.0.1', 9999))
+# ==========================================
+# TCP PROBE SERVER (bandwidth / latency)
+# ==========================================
+# Started life as a one-shot "Hello" server; now it's the other end of
+# v18.py's built-in speed test (v18_bandwidth.py), so a run only needs this
+# script on a LAN box (or loopback), no outside service.
+#
+# Every connection gets the greeting line, then sends ONE command line:
+#   PING              echo whatever arrives until the client closes (RTT)
+#   DOWNLOAD <secs>   stream the payload file for <secs>, then close
+#   UPLOAD            read until EOF, reply "<bytes received>\n"
+#   FRAMES            length-prefixed request/response frames (tcp_framing.py),
+#                     pipelined; each request frame gets frame_handler(payload)
+#
+# DOWNLOAD uses socket.sendfile(), so payload bytes go from the page cache
+# to the socket without passing through Python; UPLOAD recv_into()s a
+# preallocated buffer through a memoryview. Neither path copies per chunk,
+# which keeps the server from being the bottleneck it's meant to measure.
+#
+# Two engines serve the same protocol:
+#   selectors (default) : EventLoopServer, one thread + one selector, non-blocking
+#                         sockets; an idle connection costs a dict entry, not a thread
+#   threads             : the original thread per connection
+# Both take --backlog and --idle-timeout; the selectors engine also drains
+# in-flight connections for --grace seconds on SIGINT/SIGTERM.
+# tcp_loadgen.py is the matching load generator.
+#
+# One event loop is one core (the GIL). --workers N runs N EventLoopServer
+# processes on the same port under a Supervisor (POSIX only):
+#   --share reuseport (Linux/BSD) : each worker binds its own SO_REUSEPORT
+#                                   listener; the kernel spreads connections
+#   --share inherit               : the supervisor binds once and forks; every
+#                                   worker accept()s from the one inherited socket
+# The supervisor restarts workers that die and sums their counters, which
+# each worker writes into shared memory once a second.
 
-# 3. Listen for calls
-server.listen()
-print("Server is listening on 127.0.0.1:9999...")
+HOST, PORT = '127.0.0.1', 9999
+GREETING = b"Hello from the TCP Server!\n"
+PAYLOAD_SIZE = 4 * 1024 * 1024
+BLOCK = 1024 * 1024
+BACKLOG = 1024
+IDLE_TIMEOUT = 60.0
+MAX_PENDING = 256 * 1024  # echo bytes queued for a slow reader before we stop reading from it
 
-# 4. Accept the call
-client_socket, addr = server.accept()
-print(f"Connection from: {addr}")
 
-# 5. Send a message (Bytes)
-client_socket.send(b"Hello from the TCP Server!")
+def make_payload(size=PAYLOAD_SIZE):
+    """Random bytes in an anonymous temp file (random so nothing on the path can compress them)."""
+    payload = tempfile.TemporaryFile()
+    payload.write(os.urandom(size))
+    payload.flush()
+    return payload
 
-# 6. Close
-client_socket.close()
\ No newline at end of file
+
+def bind_listener(host, port, backlog=BACKLOG, reuse_port=False, listen=True):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port: sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    if listen: sock.listen(backlog)
+    return sock
+
+
+def raise_fd_limit():
+    """Lift the soft open-files limit to the hard one (thousands of sockets need it); returns the new limit."""
+    try: import resource
+    except ImportError: return None  # Windows: select()/IOCP limits, not RLIMIT_NOFILE
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        return hard
+    return soft
+
+
+def read_command(client_socket):
+    """(command line, bytes that arrived after it)"""
+    data = b""
+    while b"\n" not in data:
+        chunk = client_socket.recv(256)
+        if not chunk: break
+        data += chunk
+    line, _, rest = data.partition(b"\n")
+    return line.decode("ascii", "replace").split(), rest
+
+
+def send_stream(client_socket, payload, seconds, zero_copy=True):
+    size = os.fstat(payload.fileno()).st_size
+    data = None
+    deadline = time.monotonic() + seconds
+    offset = 0
+    while time.monotonic() < deadline:
+        if zero_copy:
+            client_socket.sendfile(payload, offset, BLOCK)
+        else:
+            if data is None:
+                payload.seek(0)
+                data = payload.read()
+            client_socket.sendall(data[offset:offset + BLOCK])  # slicing bytes copies every block
+        offset = (offset + BLOCK) % size
+
+
+def receive_stream(client_socket, already=0):
+    buf = bytearray(BLOCK)
+    view = memoryview(buf)
+    total = already
+    while True:
+        n = client_socket.recv_into(view)
+        if not n: return total
+        total += n
+
+
+def echo_frame(frame):
+    """Default FRAMES handler: the response is the request (a memoryview, so nothing is copied)."""
+    return frame
+
+
+def serve_frames(client_socket, rest, frame_handler=echo_frame):
+    reader = FrameReader()
+    reader.feed(rest)
+    while True:
+        replies = [frame_handler(f) for f in reader.frames()]
+        if replies: send_frames(client_socket, replies)
+        if not reader.recv_into(client_socket): return
+
+
+def handle_client(client_socket, addr, payload, zero_copy=True, frame_handler=echo_frame):
+    with client_socket:
+        try:
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client_socket.sendall(GREETING)
+            command, rest = read_command(client_socket)
+            if not command: return
+            if command[0] == "PING":
+                if rest: client_socket.sendall(rest)
+                while True:
+                    data = client_socket.recv(256)
+                    if not data: break
+                    client_socket.sendall(data)
+            elif command[0] == "DOWNLOAD":
+                send_stream(client_socket, payload, float(command[1]), zero_copy)
+            elif command[0] == "UPLOAD":
+                total = receive_stream(client_socket, len(rest))
+                client_socket.sendall(f"{total}\n".encode())
+            elif command[0] == "FRAMES":
+                serve_frames(client_socket, rest, frame_handler)
+        except (OSError, ValueError, IndexError):
+            pass  # client went away mid-test / bad command
+
+
+class _Conn:
+    __slots__ = ("sock", "state", "inbuf", "out", "last", "deadline", "offset", "received", "close_after", "events", "reader", "writer")
+
+    def __init__(self, sock, now):
+        self.sock = sock
+        self.state = "command"   # command -> ping | download | upload | frames
+        self.inbuf = b""
+        self.out = bytearray(GREETING)
+        self.last = now
+        self.deadline = None
+        self.offset = 0
+        self.received = 0
+        self.close_after = False  # close once `out` is flushed
+        self.events = 0
+        self.reader = self.writer = None  # FRAMES only
+
+
+class EventLoopServer:
+    """The probe protocol on one thread: a selector multiplexes the listener and every client socket."""
+
+    def __init__(self, host=HOST, port=PORT, zero_copy=True, backlog=BACKLOG, idle_timeout=IDLE_TIMEOUT, grace=5.0, frame_handler=echo_frame,
+                 listener=None, reuse_port=False, report=None):
+        # listener: an already-listening socket (pre-fork workers share the supervisor's)
+        self.listener = listener or bind_listener(host, port, backlog, reuse_port)
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+        self.idle_timeout = idle_timeout
+        self.grace = grace
+        self.frame_handler = frame_handler
+        self.report = report  # called with the counters once a second and at exit
+        self.payload = make_payload()
+        # os.sendfile works on non-blocking sockets (socket.sendfile doesn't); Windows has neither
+        self.sendfile = zero_copy and hasattr(os, "sendfile")
+        # No sendfile: memoryview slices (no copy); --copy keeps plain bytes so slicing copies, for comparison
+        self.data = None if self.sendfile else memoryview(self._read_payload()) if zero_copy else self._read_payload()
+        self.size = os.fstat(self.payload.fileno()).st_size
+        self.sel = selectors.DefaultSelector()
+        self.sel.register(self.listener, selectors.EVENT_READ, None)
+        # stop() may come from a signal handler or another thread: wake select() through a socketpair
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self.sel.register(self._wake_r, selectors.EVENT_READ, "wake")
+        self.conns = {}
+        self._stopping = False
+        self.recv_buf = bytearray(BLOCK)
+        self.recv_view = memoryview(self.recv_buf)
+        self.stats = {"accepted": 0, "closed": 0, "idle_closed": 0, "active": 0, "peak": 0, "bytes_in": 0, "bytes_out": 0, "frames": 0}
+
+    def _read_payload(self):
+        self.payload.seek(0)
+        return self.payload.read()
+
+    def stop(self):
+        """Stop accepting; let in-flight connections finish for `grace` seconds."""
+        self._stopping = True
+        try: self._wake_w.send(b"x")
+        except OSError: pass
+
+    # -------- loop --------
+    def serve_forever(self):
+        next_sweep = time.monotonic() + 1.0
+        drain_until = None
+        try:
+            while True:
+                if self._stopping and drain_until is None:
+                    drain_until = time.monotonic() + self.grace
+                    self.sel.unregister(self.listener)
+                    self.listener.close()
+                if drain_until is not None and (not self.conns or time.monotonic() >= drain_until): break
+                for key, mask in self.sel.select(timeout=0.5):
+                    if key.data is None: self._accept()
+                    elif key.data == "wake": self._wake_r.recv(64)
+                    else:
+                        conn = key.data
+                        if mask & selectors.EVENT_READ and conn.sock.fileno() != -1: self._on_read(conn)
+                        if mask & selectors.EVENT_WRITE and conn.sock.fileno() != -1: self._on_write(conn)
+                now = time.monotonic()
+                if now >= next_sweep:
+                    self._sweep(now)
+                    if self.report: self.report(self.stats)
+                    next_sweep = now + 1.0
+        finally:
+            for conn in list(self.conns.values()): self._close(conn)
+            if self.listener.fileno() != -1: self.listener.close()
+            self.sel.close()
+            self.payload.close()
+            self._wake_r.close()
+            self._wake_w.close()
+        if self.report: self.report(self.stats)
+        return self.stats
+
+    def _sweep(self, now):
+        if not self.idle_timeout: return
+        for conn in [c for c in self.conns.values() if c.state != "download" and now - c.last > self.idle_timeout]:
+            self.stats["idle_closed"] += 1
+            self._close(conn)
+
+    def _accept(self):
+        # Drain the accept queue in one wake-up; a connect storm is many connections per select()
+        now = time.monotonic()
+        while True:
+            try: sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError): return
+            except OSError: return  # EMFILE etc.: leave the rest in the backlog for now
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = _Conn(sock, now)
+            self.conns[sock.fileno()] = conn
+            self.stats["accepted"] += 1
+            self.stats["active"] += 1
+            self.stats["peak"] = max(self.stats["peak"], self.stats["active"])
+            self._update(conn, register=True)
+
+    def _close(self, conn):
+        fd = conn.sock.fileno()
+        if fd == -1: return
+        try: self.sel.unregister(conn.sock)
+        except (KeyError, ValueError): pass
+        self.conns.pop(fd, None)
+        conn.sock.close()
+        self.stats["closed"] += 1
+        self.stats["active"] -= 1
+
+    def _update(self, conn, register=False):
+        """Re-arm the selector for what this connection is waiting on."""
+        events = 0
+        if conn.writer is not None:
+            # Replies still reference the read buffer: no reading until they're out
+            events = selectors.EVENT_WRITE if conn.writer.pending else selectors.EVENT_READ
+        else:
+            if not conn.close_after and conn.state != "download" and len(conn.out) < MAX_PENDING: events |= selectors.EVENT_READ
+            if conn.out or conn.state == "download": events |= selectors.EVENT_WRITE
+        if register: self.sel.register(conn.sock, events, conn)
+        elif events != conn.events:
+            if events: self.sel.modify(conn.sock, events, conn)
+            else: self._close(conn)
+        conn.events = events
+
+    # -------- protocol --------
+    def _on_read(self, conn):
+        if conn.state == "frames": return self._on_frames(conn)
+        try: n = conn.sock.recv_into(self.recv_view)
+        except (BlockingIOError, InterruptedError): return
+        except OSError: return self._close(conn)
+        conn.last = time.monotonic()
+        if not n:  # EOF
+            if conn.state == "upload":
+                conn.out += f"{conn.received}\n".encode()
+                conn.close_after = True
+                return self._update(conn)
+            return self._close(conn)
+        self.stats["bytes_in"] += n
+        data = self.recv_view[:n]
+        if conn.state == "command":
+            conn.inbuf += bytes(data)
+            if b"\n" not in conn.inbuf:
+                if len(conn.inbuf) > 256: self._close(conn)
+                return
+            line, _, rest = conn.inbuf.partition(b"\n")
+            conn.inbuf = b""
+            command = line.decode("ascii", "replace").split()
+            try:
+                if command[0] == "PING":
+                    conn.state = "ping"
+                    conn.out += rest
+                elif command[0] == "DOWNLOAD":
+                    conn.state = "download"
+                    conn.deadline = time.monotonic() + float(command[1])
+                elif command[0] == "UPLOAD":
+                    conn.state = "upload"
+                    conn.received = len(rest)
+                elif command[0] == "FRAMES":
+                    conn.state = "frames"
+                    conn.reader, conn.writer = FrameReader(), FrameWriter()
+                    if conn.out: conn.writer.add_raw(bytes(conn.out))
+                    conn.out.clear()
+                    conn.reader.feed(rest)
+                    return self._reply_frames(conn)
+                else: return self._close(conn)
+            except (IndexError, ValueError): return self._close(conn)
+        elif conn.state == "ping": conn.out += data
+        elif conn.state == "upload": conn.received += n
+        # Write the echo now instead of waiting a select() round for EVENT_WRITE; usually it all fits
+        if conn.out: return self._on_write(conn)
+        self._update(conn)
+
+    def _on_frames(self, conn):
+        try: n = conn.reader.recv_into(conn.sock)
+        except (BlockingIOError, InterruptedError): return
+        except OSError: return self._close(conn)
+        if not n: return self._close(conn)
+        conn.last = time.monotonic()
+        self.stats["bytes_in"] += n
+        self._reply_frames(conn)
+
+    def _reply_frames(self, conn):
+        """Answer every complete frame read so far with one sendmsg(); the rest waits for EVENT_WRITE."""
+        try:
+            frames = conn.reader.frames()
+            for frame in frames: conn.writer.add(self.frame_handler(frame))
+        except FrameError: return self._close(conn)
+        self.stats["frames"] += len(frames)
+        self._flush_frames(conn)
+
+    def _flush_frames(self, conn):
+        before = conn.writer.pending
+        try: conn.writer.flush(conn.sock)
+        except OSError: return self._close(conn)
+        self.stats["bytes_out"] += before - conn.writer.pending
+        self._update(conn)
+
+    def _on_write(self, conn):
+        if conn.writer is not None: return self._flush_frames(conn)
+        try:
+            if conn.out:
+                n = conn.sock.send(conn.out)
+                del conn.out[:n]
+            elif conn.state == "download":
+                if time.monotonic() >= conn.deadline: return self._close(conn)
+                if self.sendfile: n = os.sendfile(conn.sock.fileno(), self.payload.fileno(), conn.offset, BLOCK)
+                else: n = conn.sock.send(self.data[conn.offset:conn.offset + BLOCK])
+                conn.offset = (conn.offset + n) % self.size
+            else: n = 0
+        except (BlockingIOError, InterruptedError): return self._update(conn)
+        except OSError: return self._close(conn)
+        self.stats["bytes_out"] += n
+        conn.last = time.monotonic()
+        if not conn.out and conn.close_after: return self._close(conn)
+        self._update(conn)
+
+
+def serve_threads(host=HOST, port=PORT, zero_copy=True, ready=None, backlog=BACKLOG, idle_timeout=IDLE_TIMEOUT):
+    # 1. Create a TCP Socket (SOCK_STREAM means TCP)
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+    # 2. Bind to an address (port 0 = any free port)
+    server.bind((host, port))
+
+    # 3. Listen for calls
+    server.listen(backlog)
+    payload = make_payload()
+    if ready is not None: ready(server.getsockname())
+    else: print(f"Probe server is listening on {host}:{server.getsockname()[1]}...", flush=True)
+
+    # 4. Accept calls; one thread each so parallel streams run in parallel
+    with server, payload:
+        while True:
+            client_socket, addr = server.accept()
+            if idle_timeout: client_socket.settimeout(idle_timeout)  # recv() raises, handle_client closes
+            threading.Thread(target=handle_client, args=(client_socket, addr, payload, zero_copy), daemon=True).start()
+
+
+# ==========================
+# MULTI-PROCESS (--workers)
+# ==========================
+COUNTERS = ("accepted", "closed", "idle_closed", "active", "peak", "bytes_in", "bytes_out", "frames")
+RESTART_WINDOW, RESTART_LIMIT = 10.0, 5  # more deaths than this in the window = back off a second
+
+
+def _worker_main(index, counters, listener, server_kwargs):
+    # Counters go to a shared array slot, not a queue: a worker killed mid-report can't corrupt anything
+    base = index * len(COUNTERS)
+    def report(stats):
+        for i, k in enumerate(COUNTERS): counters[base + i] = stats[k]
+    server = EventLoopServer(listener=listener, report=report, **server_kwargs)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: server.stop())
+    server.serve_forever()
+
+
+class Supervisor:
+    """N EventLoopServer processes on one port; restarts any that die and sums their counters."""
+
+    def __init__(self, workers, host=HOST, port=PORT, share="reuseport", backlog=BACKLOG, **server_kwargs):
+        import multiprocessing
+        self.ctx = multiprocessing.get_context("fork")  # workers inherit the listener / payload setup
+        self.workers = workers
+        self.share = share
+        self.server_kwargs = dict(server_kwargs, backlog=backlog)
+        if share == "reuseport":
+            # Bound but not listening: reserves the port (and resolves port 0) without taking connections
+            self.sock = bind_listener(host, port, backlog, reuse_port=True, listen=False)
+            self.server_kwargs.update(host=host, port=self.sock.getsockname()[1], reuse_port=True)
+        else:
+            self.sock = bind_listener(host, port, backlog)
+        self.address = self.sock.getsockname()
+        self.counters = self.ctx.Array("q", workers * len(COUNTERS), lock=False)
+        self.procs = [None] * workers
+        self.retired = {k: 0 for k in COUNTERS if k not in ("active", "peak")}  # from processes that have exited
+        self.restarts = [0] * workers
+        self.deaths = []
+        self._stopping = False
+
+    def _spawn(self, index):
+        listener = self.sock if self.share == "inherit" else None
+        proc = self.ctx.Process(target=_worker_main, args=(index, self.counters, listener, self.server_kwargs), daemon=True,
+                                name=f"tcp-worker-{index}")
+        proc.start()
+        self.procs[index] = proc
+
+    def stop(self): self._stopping = True
+
+    def worker_stats(self, index):
+        base = index * len(COUNTERS)
+        return dict(zip(COUNTERS, self.counters[base:base + len(COUNTERS)]))
+
+    def _retire(self, index):
+        # Fold a dead worker's last report into the totals and clear its slot for the replacement
+        stats = self.worker_stats(index)
+        for k in self.retired: self.retired[k] += stats[k]
+        base = index * len(COUNTERS)
+        self.counters[base:base + len(COUNTERS)] = [0] * len(COUNTERS)
+
+    def stats(self):
+        workers = [self.worker_stats(i) for i in range(self.workers)]
+        total = dict(self.retired, active=0)
+        for stats in workers:
+            for k in total: total[k] += stats[k]
+        total["restarts"] = sum(self.restarts)
+        total["workers"] = [dict(s, worker=i, pid=self.procs[i].pid if self.procs[i] else None, restarts=self.restarts[i])
+                            for i, s in enumerate(workers)]
+        return total
+
+    def run(self, stats_interval=None):
+        for i in range(self.workers): self._spawn(i)
+        next_stats = time.monotonic() + stats_interval if stats_interval else None
+        try:
+            while not self._stopping:
+                time.sleep(0.2)
+                now = time.monotonic()
+                for i, proc in enumerate(self.procs):
+                    if proc.is_alive() or self._stopping: continue
+                    proc.join()
+                    self._retire(i)
+                    self.deaths = [t for t in self.deaths if now - t < RESTART_WINDOW] + [now]
+                    print(f"Worker {i} (pid {proc.pid}) exited with {proc.exitcode}; restarting", flush=True)
+                    if len(self.deaths) > RESTART_LIMIT: time.sleep(1.0)
+                    self.restarts[i] += 1
+                    self._spawn(i)
+                if next_stats and now >= next_stats:
+                    print(f"Stats: {json.dumps(self.stats())}", flush=True)
+                    next_stats = now + stats_interval
+        finally:
+            # Graceful: every worker drains its own connections, stragglers are killed after the grace period
+            for proc in self.procs:
+                if proc.is_alive(): os.kill(proc.pid, signal.SIGTERM)
+            deadline = time.monotonic() + self.server_kwargs.get("grace", 5.0) + 1.0
+            for proc in self.procs:
+                proc.join(max(0.0, deadline - time.monotonic()))
+                if proc.is_alive(): proc.kill()
+            self.sock.close()
+        return self.stats()
+
+
+def serve(host=HOST, port=PORT, zero_copy=True, ready=None, engine="selectors", backlog=BACKLOG, idle_timeout=IDLE_TIMEOUT, grace=5.0,
+          workers=1, share="reuseport", stats_interval=None):
+    if engine == "threads":
+        return serve_threads(host, port, zero_copy, ready, backlog, idle_timeout)
+    if workers > 1:
+        supervisor = Supervisor(workers, host, port, share, backlog, zero_copy=zero_copy, idle_timeout=idle_timeout, grace=grace)
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: supervisor.stop())
+        if ready is not None: ready(supervisor.address)
+        else: print(f"Probe server is listening on {host}:{supervisor.address[1]} ({workers} workers, {share})...", flush=True)
+        stats = supervisor.run(stats_interval)
+        if ready is None: print(f"Stopped: {json.dumps(stats)}", flush=True)
+        return stats
+    server = EventLoopServer(host, port, zero_copy, backlog, idle_timeout, grace)
+    if threading.current_thread() is threading.main_thread():
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: server.stop())
+    if ready is not None: ready(server.address)
+    else: print(f"Probe server is listening on {host}:{server.address[1]}...", flush=True)
+    stats = server.serve_forever()
+    if ready is None: print(f"Stopped: {json.dumps(stats)}", flush=True)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandwidth/latency probe server for v18.py --speed-server")
+    parser.add_argument("--host", default=HOST, help="Address to bind (0.0.0.0 for the whole LAN)")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--copy", action="store_true", help="Send with sendall(bytes slice) instead of sendfile (for comparison)")
+    parser.add_argument("--engine", choices=["selectors", "threads"], default="selectors", help="Event loop (default) or a thread per connection")
+    parser.add_argument("--backlog", type=int, default=BACKLOG, help=f"listen() backlog (default {BACKLOG})")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT, help=f"Close connections silent this many seconds (0 = never, default {IDLE_TIMEOUT:g})")
+    parser.add_argument("--grace", type=float, default=5.0, help="Seconds to let connections finish after SIGINT/SIGTERM (selectors engine)")
+    parser.add_argument("--workers", type=int, default=1, help="Event loop processes sharing the port (selectors engine, POSIX)")
+    parser.add_argument("--share", choices=["reuseport", "inherit"], default="reuseport" if hasattr(socket, "SO_REUSEPORT") else "inherit",
+                        help="How --workers share the port: SO_REUSEPORT listeners or one pre-forked socket")
+    parser.add_argument("--stats-interval", type=float, help="With --workers: print the summed counters every N seconds")
+    args = parser.parse_args()
+    if args.workers > 1 and (args.engine != "selectors" or not hasattr(os, "fork")):
+        parser.error("--workers needs the selectors engine and fork() (not available on Windows)")
+    if args.workers > 1 and args.share == "reuseport" and not hasattr(socket, "SO_REUSEPORT"):
+        parser.error("SO_REUSEPORT isn't available here; use --share inherit")
+    raise_fd_limit()
+    try: serve(args.host, args.port, zero_copy=not args.copy, engine=args.engine, backlog=args.backlog, idle_timeout=args.idle_timeout, grace=args.grace,
+               workers=args.workers, share=args.share, stats_interval=args.stats_interval)
+    except KeyboardInterrupt: sys.exit(0)
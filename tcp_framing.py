@@ -0,0 +1,194 @@
+import socket
+import struct
+import itertools
+import selectors
+import collections
+
+# ==========================================
+# LENGTH-PREFIXED FRAMES FOR simple_TCP_server_in_python.py
+# ==========================================
+# After the greeting a client sends "FRAMES\n"; from then on both directions
+# are frames: a 4-byte big-endian length, then that many bytes. The server
+# answers every request frame with one response frame, in order, so a
+# client may pipeline many requests before reading any answers.
+#
+# Neither side copies payload bytes:
+#   FrameReader : recv_into() a preallocated bytearray; complete frames come
+#                 back as memoryview slices of it (valid until the next read)
+#   FrameWriter : queues (header, payload view) pairs and hands them to ONE
+#                 sendmsg() call (scatter/gather), so 100 small frames are one
+#                 syscall and a 1 MB payload is never concatenated with its header
+
+HEADER = struct.Struct("!I")
+MAX_FRAME = 16 * 1024 * 1024
+IOV_MAX = 1024  # buffers per sendmsg() (Linux IOV_MAX)
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")  # not on Windows: falls back to one joined send()
+
+
+class FrameError(ValueError):
+    pass
+
+
+class FrameReader:
+    def __init__(self, size=64 * 1024, max_frame=MAX_FRAME):
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.start = self.end = 0  # unconsumed bytes are buf[start:end]
+        self.max_frame = max_frame
+
+    def recv_into(self, sock):
+        """One recv_into() at the tail of the buffer; returns the byte count (0 = EOF).
+
+        Frames returned by earlier frames() calls are overwritten from here on.
+        """
+        self._make_room()
+        n = sock.recv_into(self.view[self.end:])
+        self.end += n
+        return n
+
+    def feed(self, data):
+        """Bytes that arrived some other way (e.g. after the "FRAMES" command line)."""
+        self._make_room(len(data))
+        self.buf[self.end:self.end + len(data)] = data
+        self.end += len(data)
+
+    def frames(self):
+        """Every complete frame in the buffer, as memoryviews (no copy)."""
+        out = []
+        while self.end - self.start >= HEADER.size:
+            (length,) = HEADER.unpack_from(self.buf, self.start)
+            if length > self.max_frame: raise FrameError(f"frame of {length} bytes exceeds {self.max_frame}")
+            total = HEADER.size + length
+            if self.end - self.start < total:
+                # Big frame still arriving: make the buffer fit it so the rest lands in place
+                if total > len(self.buf): self._grow(total)
+                break
+            out.append(self.view[self.start + HEADER.size:self.start + total])
+            self.start += total
+        return out
+
+    def _make_room(self, need=1):
+        if self.start == self.end: self.start = self.end = 0
+        if len(self.buf) - self.end >= need: return
+        pending = self.end - self.start
+        if pending + need > len(self.buf): return self._grow(pending + need)
+        # Slide the partial frame to the front (a copy of at most one frame's prefix)
+        self.buf[:pending] = self.buf[self.start:self.end]
+        self.start, self.end = 0, pending
+
+    def _grow(self, size):
+        # A new bytearray, not a resize: views handed out by frames() may still point at the old one
+        pending = self.end - self.start
+        buf = bytearray(max(size, 2 * len(self.buf)))
+        buf[:pending] = self.view[self.start:self.end]
+        self.buf, self.view = buf, memoryview(buf)
+        self.start, self.end = 0, pending
+
+
+class FrameWriter:
+    def __init__(self):
+        self.buffers = collections.deque()
+        self.pending = 0  # bytes queued
+
+    def add(self, payload):
+        payload = memoryview(payload)
+        self.buffers.append(HEADER.pack(payload.nbytes))
+        if payload.nbytes: self.buffers.append(payload)
+        self.pending += HEADER.size + payload.nbytes
+
+    def add_raw(self, data):
+        """Unframed bytes (the greeting, when it hasn't gone out yet)."""
+        self.buffers.append(memoryview(data))
+        self.pending += len(data)
+
+    def flush(self, sock):
+        """Send as much as the socket takes; True once everything queued is out."""
+        while self.buffers:
+            batch = list(itertools.islice(self.buffers, IOV_MAX))
+            try: n = sock.sendmsg(batch) if HAS_SENDMSG else sock.send(b"".join(batch))
+            except (BlockingIOError, InterruptedError): return False
+            self.pending -= n
+            while n:
+                first = self.buffers[0]
+                size = first.nbytes if isinstance(first, memoryview) else len(first)
+                if n < size:
+                    self.buffers[0] = memoryview(first)[n:]
+                    break
+                self.buffers.popleft()
+                n -= size
+        return True
+
+
+def send_frames(sock, payloads):
+    """Blocking send of several frames in as few sendmsg() calls as possible."""
+    writer = FrameWriter()
+    for p in payloads: writer.add(p)
+    writer.flush(sock)
+
+
+class FramedClient:
+    def __init__(self, host, port, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = FrameReader()
+        greeting = b""
+        while not greeting.endswith(b"\n"):
+            chunk = self.sock.recv(1)
+            if not chunk: raise ConnectionError("server closed the connection")
+            greeting += chunk
+        self.sock.sendall(b"FRAMES\n")
+        self._ready = collections.deque()
+
+    def close(self): self.sock.close()
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def _next(self):
+        while not self._ready:
+            if not self.reader.recv_into(self.sock): raise ConnectionError("server closed the connection")
+            self._ready.extend(self.reader.frames())
+        return self._ready.popleft()
+
+    def request(self, payload):
+        """One round trip; the response view is valid until the next call."""
+        send_frames(self.sock, [payload])
+        return self._next()
+
+    def pipeline(self, payloads, depth=32, on_response=None):
+        """Keep up to `depth` requests in flight; on_response(i, view) sees each answer in order.
+
+        Sends and reads are interleaved on a non-blocking socket, so big frames
+        can't deadlock with both sides stuck in send(). Returns the response count.
+        """
+        payloads = iter(payloads)
+        writer, sent, done, exhausted = FrameWriter(), 0, 0, False
+        timeout = self.sock.gettimeout()
+        self.sock.setblocking(False)
+        sel = selectors.DefaultSelector()
+        sel.register(self.sock, selectors.EVENT_READ)
+        armed = selectors.EVENT_READ
+        try:
+            while not exhausted or done < sent:
+                while not exhausted and sent - done < depth:
+                    p = next(payloads, None)
+                    if p is None: exhausted = True
+                    else:
+                        writer.add(p)
+                        sent += 1
+                want = selectors.EVENT_READ | (0 if writer.flush(self.sock) else selectors.EVENT_WRITE)
+                if want != armed: armed = sel.modify(self.sock, want).events
+                if done == sent: continue
+                events = sel.select(timeout)
+                if not events: raise TimeoutError(f"no response in {timeout}s")
+                for _, mask in events:
+                    if mask & selectors.EVENT_READ:
+                        try: n = self.reader.recv_into(self.sock)
+                        except (BlockingIOError, InterruptedError): continue
+                        if not n: raise ConnectionError("server closed the connection")
+                        for frame in self.reader.frames():
+                            if on_response: on_response(done, frame)
+                            done += 1
+        finally:
+            sel.close()
+            self.sock.settimeout(timeout)
+        return done
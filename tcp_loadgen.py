@@ -0,0 +1,127 @@
+import sys
+import time
+import asyncio
+import argparse
+
+from simple_TCP_server_in_python import HOST, PORT, raise_fd_limit
+from v18_netprobe import distribution
+
+# ==========================================
+# LOAD GENERATOR FOR simple_TCP_server_in_python.py
+# ==========================================
+# Two workloads, both asyncio so one process holds thousands of sockets:
+#   connect : open -> read greeting -> close, `concurrency` at a time  => connections/s
+#   ping    : `connections` long-lived PING connections, each doing 8-byte
+#             round trips back to back for `duration`               => requests/s, latency
+# --procs N splits the work over N processes so the client isn't the
+# bottleneck; latencies from every process are merged before percentiles.
+
+MSG = 8
+
+
+async def _open(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    await reader.readline()  # greeting
+    return reader, writer
+
+
+async def connect_storm(host, port, total, concurrency):
+    latencies, errors = [], 0
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with gate:
+            start = time.perf_counter()
+            try:
+                _, writer = await _open(host, port)
+                latencies.append((time.perf_counter() - start) * 1000)
+                writer.close()
+                await writer.wait_closed()
+            except OSError:
+                errors += 1
+
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies, errors
+
+
+async def ping_load(host, port, connections, duration):
+    latencies, errors = [], 0
+    opened = asyncio.Event()
+    ready = 0
+
+    async def client(i):
+        nonlocal errors, ready
+        try:
+            reader, writer = await _open(host, port)
+        except OSError:
+            errors += 1
+            ready += 1
+            if ready == connections: opened.set()
+            return
+        ready += 1
+        if ready == connections: opened.set()
+        await opened.wait()  # everyone connected before the clock starts
+        writer.write(b"PING\n")
+        msg = i.to_bytes(MSG, "big")
+        deadline = time.perf_counter() + duration
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                writer.write(msg)
+                await reader.readexactly(MSG)
+                latencies.append((time.perf_counter() - start) * 1000)
+        except (OSError, asyncio.IncompleteReadError):
+            errors += 1
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(client(i) for i in range(connections)))
+    return latencies, errors
+
+
+def _worker(job):
+    raise_fd_limit()
+    mode, host, port, n, concurrency, duration = job
+    start = time.perf_counter()
+    if mode == "connect": latencies, errors = asyncio.run(connect_storm(host, port, n, concurrency))
+    else: latencies, errors = asyncio.run(ping_load(host, port, n, duration))
+    return latencies, errors, time.perf_counter() - start
+
+
+def run(mode="ping", host=HOST, port=PORT, connections=100, duration=5.0, total=5000, concurrency=200, procs=1):
+    """Drive the server; returns {"rate", "ok", "errors", "elapsed", "latency_ms"} (rate = connections/s or requests/s)."""
+    if mode == "connect": jobs = [(mode, host, port, total // procs, max(1, concurrency // procs), duration)] * procs
+    else: jobs = [(mode, host, port, connections // procs, 0, duration)] * procs
+    if procs == 1: results = [_worker(jobs[0])]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(procs) as pool: results = list(pool.map(_worker, jobs))
+    latencies = [x for r in results for x in r[0]]
+    # connect: wall time of the whole storm; ping: the measured window (connection setup excluded)
+    elapsed = max(r[2] for r in results) if mode == "connect" else duration
+    return {"mode": mode, "rate": round(len(latencies) / elapsed, 1), "ok": len(latencies), "errors": sum(r[1] for r in results),
+            "elapsed": round(elapsed, 3), "latency_ms": distribution(latencies, digits=3, percentiles=(50, 99))}
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for simple_TCP_server_in_python.py")
+    parser.add_argument("mode", choices=["connect", "ping"])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--connections", type=int, default=100, help="ping: concurrent long-lived connections")
+    parser.add_argument("--duration", type=float, default=5.0, help="ping: seconds of round trips")
+    parser.add_argument("--total", type=int, default=5000, help="connect: connections to open in all")
+    parser.add_argument("--concurrency", type=int, default=200, help="connect: connections in flight at once")
+    parser.add_argument("--procs", type=int, default=1, help="Client processes to spread the load over")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    res = run(args.mode, args.host, args.port, args.connections, args.duration, args.total, args.concurrency, args.procs)
+    unit = "connections/s" if args.mode == "connect" else "requests/s"
+    lat = res["latency_ms"] or {"p50": 0, "p99": 0, "max": 0}
+    print(f"{res['rate']:,.0f} {unit}  ({res['ok']:,} ok, {res['errors']} errors in {res['elapsed']:g}s)  "
+          f"latency p50 {lat['p50']:.3f} ms / p99 {lat['p99']:.3f} ms / max {lat['max']:.3f} ms")
+    sys.exit(1 if res["errors"] and not res["ok"] else 0)
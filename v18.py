@@ -1,508 +1,980 @@
-import sys
-import ctypes
-import psutil
-import platform
-import datetime
-import subprocess
-import winreg
-import wmi
-import socket
-import speedtest
-import requests
-import time
-import struct
-import argparse
-import os
-import json
-from rich import box
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.align import Align
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
-from rich.prompt import Confirm, Prompt
-
-# ==========================================
-# 1. SETUP & ARGS
-# ==========================================
-def parse_arguments():
-    parser = argparse.ArgumentParser(description="IT Diagnostic Master Tool v18.0")
-    parser.add_argument("--all", action="store_true", help="Run ALL checks")
-    parser.add_argument("--auto", action="store_true", help="Skip menu, run all")
-    parser.add_argument("--quick", action="store_true", help="Skip Speedtest")
-    return parser.parse_args()
-
-def is_admin():
-    try: return ctypes.windll.shell32.IsUserAnAdmin()
-    except: return False
-
-if not is_admin():
-    args_str = " ".join(sys.argv[1:])
-    ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, f'"{sys.argv[0]}" {args_str}', None, 1)
-    sys.exit()
-
-try: c_wmi = wmi.WMI()
-except: c_wmi = None
-
-console = Console()
-
-class IT_Diagnostic_v18:
-    def __init__(self, args):
-        self.args = args
-        self.issues_found = [] 
-        self.hostname = platform.node()
-        self.specs = {} 
-        self.stats = {"PASS": 0, "FAIL": 0, "WARNING": 0, "INFO": 0}
-        
-        self.modules = {
-            "identity": False, "hardware": False, "software": False, 
-            "security": False, "network": False, "performance": False
-        }
-
-        if args.all or args.auto:
-             for k in self.modules: self.modules[k] = True
-        else:
-            self.show_main_menu()
-
-    def show_main_menu(self):
-        console.clear()
-        subtitle = "[spring_green1]Ultimate Edition[/]"
-        console.print(Panel(Align.center(f"[bold white]IT DIAGNOSTIC MASTER (v18.0)[/]\n{subtitle}"), 
-                            border_style="spring_green1", box=box.ROUNDED, padding=(1, 4), expand=True))
-        
-        console.print("\n[bold cyan]Select Diagnostics:[/bold cyan]")
-        console.print("1. [bold white]Run Everything[/] (Full Audit)")
-        console.print("2. [bold white]Identity & Context[/] (Serial, OS, Uptime)")
-        console.print("3. [bold white]Hardware Deep Dive[/] (Drivers, SMART, Ram Speed)")
-        console.print("4. [bold white]Network Stack[/] (Gateway, Ports, Speed)")
-        console.print("5. [bold white]Security Audit[/] (AV, TPM, UAC, Admin)")
-        console.print("6. [bold white]Software Health[/] (Updates, Startup, Temp)")
-        console.print("7. [bold white]Performance[/] (Hogs, BSOD, Power Plan)")
-        console.print("0. Exit")
-        
-        choice = Prompt.ask("\n[bold yellow]Enter Choice[/]", choices=["0", "1", "2", "3", "4", "5", "6", "7"], default="1")
-        
-        if choice == "0": sys.exit()
-        if choice == "1": 
-            for k in self.modules: self.modules[k] = True
-        elif choice == "2": self.modules["identity"] = True
-        elif choice == "3": self.modules["hardware"] = True
-        elif choice == "4": self.modules["network"] = True
-        elif choice == "5": self.modules["security"] = True
-        elif choice == "6": self.modules["software"] = True
-        elif choice == "7": self.modules["performance"] = True
-        
-        console.clear()
-
-    def log(self, category, message, status="INFO", detail=None, action_item=None):
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        if status == "PASS": icon="[green]✔[/]"; style="green"; self.stats["PASS"]+=1
-        elif status == "FAIL": icon="[red]✖[/]"; style="bold red"; self.stats["FAIL"]+=1
-        elif status == "WARNING": icon="[yellow]![/]"; style="yellow"; self.stats["WARNING"]+=1
-        else: icon="[blue]i[/]"; style="cyan"; self.stats["INFO"]+=1
-
-        console.print(f"{timestamp} | {icon} | [bold white]{category:18}[/bold white] | [{style}]{message}[/{style}]")
-        if detail: console.print(f"             [dim]↳ {detail}[/dim]")
-
-        if status == "INFO":
-            if category in self.specs: self.specs[category] += f", {message}"
-            else: self.specs[category] = message
-
-        if status in ["FAIL", "WARNING"]:
-            if not action_item: action_item = "Investigate manually."
-            self.issues_found.append({"category": category, "error": message, "detail": detail if detail else "", "fix": action_item})
-
-    def section(self, title):
-        console.print(f"\n[bold magenta italic]--- {title} ---[/bold magenta italic]")
-
-    # ==========================
-    # MODULE 1: IDENTITY
-    # ==========================
-    def check_identity(self):
-        self.section("IDENTITY & CONTEXT")
-        try:
-            os_name = f"{platform.system()} {platform.release()}"
-            build = platform.version()
-            if c_wmi:
-                for os_data in c_wmi.Win32_OperatingSystem():
-                    os_name = os_data.Caption
-                    build = os_data.BuildNumber
-            self.log("OS Version", f"{os_name} (Build {build})", "INFO")
-        except: pass
-
-        if c_wmi:
-            try:
-                for sys in c_wmi.Win32_ComputerSystem():
-                    self.log("Model", f"{sys.Manufacturer} {sys.Model}", "INFO")
-                for bios in c_wmi.Win32_BIOS():
-                    self.log("Serial Number", bios.SerialNumber, "INFO")
-            except: pass
-
-        uptime_s = time.time() - psutil.boot_time()
-        days = uptime_s // (24 * 3600)
-        self.log("Uptime", f"{int(days)} Days", "WARNING" if days > 7 else "PASS", 
-                 action_item="Reboot recommended." if days > 7 else None)
-
-    # ==========================
-    # MODULE 2: HARDWARE (Restored RAM Speed, SMART, Printers)
-    # ==========================
-    def check_hardware(self):
-        self.section("HARDWARE DIAGNOSTICS")
-        
-        # CPU
-        if c_wmi:
-            try:
-                for cpu in c_wmi.Win32_Processor(): 
-                    self.log("CPU Model", cpu.Name.strip(), "INFO")
-                    self.log("CPU Cores", f"{cpu.NumberOfCores}C / {cpu.NumberOfLogicalProcessors}T", "INFO")
-            except: pass
-
-        # GPU
-        if c_wmi:
-            try:
-                for gpu in c_wmi.Win32_VideoController():
-                    vram = "Unknown"
-                    try: vram = f"{int(gpu.AdapterRAM) / (1024**3):.2f} GB"
-                    except: pass
-                    self.log("GPU Info", f"{gpu.Name} ({vram})", "INFO")
-            except: pass
-
-        # RAM (RESTORED DETAILS)
-        if c_wmi:
-            try:
-                total_cap = 0
-                for mem in c_wmi.Win32_PhysicalMemory():
-                    cap = int(mem.Capacity) / (1024**3)
-                    total_cap += cap
-                    speed = mem.Speed if hasattr(mem, 'Speed') else "?"
-                    maker = mem.Manufacturer if hasattr(mem, 'Manufacturer') else ""
-                    self.log("RAM Stick", f"{cap:.0f}GB @ {speed}MHz {maker}", "INFO")
-                
-                mem_stats = psutil.virtual_memory()
-                status = "FAIL" if mem_stats.percent > 90 else "PASS"
-                self.log("RAM Usage", f"{mem_stats.percent}% Used (of {total_cap:.0f}GB)", status)
-            except: pass
-
-        # Battery
-        if c_wmi:
-            try:
-                for b in c_wmi.Win32_Battery():
-                    status = "Plugged In" if b.BatteryStatus == 2 else "On Battery"
-                    self.log("Battery", f"{b.EstimatedChargeRemaining}% ({status})", "INFO")
-            except: pass
-
-        # Device Drivers (The "Drive Manager" Check)
-        if c_wmi:
-            try:
-                errors = c_wmi.query("SELECT * FROM Win32_PnPEntity WHERE ConfigManagerErrorCode != 0")
-                if errors:
-                    for dev in errors:
-                        self.log("Driver Error", dev.Caption, "FAIL", f"Code: {dev.ConfigManagerErrorCode}", 
-                                 action_item=f"Reinstall driver for {dev.Caption}")
-                else:
-                    self.log("Drivers", "No Yellow Bangs", "PASS")
-            except: pass
-
-        # Storage (Type)
-        try:
-            cmd = "Get-PhysicalDisk | Select-Object MediaType"
-            out = subprocess.check_output(["powershell", "-Command", cmd], stderr=subprocess.DEVNULL).decode()
-            if "HDD" in out: self.log("Drive Type", "HDD Detected", "WARNING", action_item="Upgrade to SSD.")
-            elif "SSD" in out: self.log("Drive Type", "SSD Detected", "PASS")
-        except: pass
-
-        # Storage (SMART RESTORED)
-        if c_wmi:
-            try:
-                for d in c_wmi.Win32_DiskDrive():
-                    if d.Status != "OK":
-                        self.log("SMART Status", d.Caption, "FAIL", d.Status, action_item="REPLACE DRIVE.")
-                    else:
-                        self.log("SMART Status", "Healthy", "PASS")
-            except: pass
-
-        # Storage (Bad Sectors Event 7)
-        try:
-            ps_cmd = "Get-WinEvent -LogName System -MaxEvents 200 -ErrorAction SilentlyContinue | Where-Object { $_.Id -eq 7 } | Select-Object -First 1"
-            out = subprocess.check_output(["powershell", "-Command", ps_cmd], stderr=subprocess.DEVNULL).decode().strip()
-            if out: self.log("Bad Sectors", "CONFIRMED", "FAIL", "Event 7 found", action_item="REPLACE DRIVE.")
-            else: self.log("Bad Sectors", "Clean", "PASS")
-        except: pass
-
-        # Printers (RESTORED)
-        if c_wmi:
-            try:
-                for p in c_wmi.Win32_Printer():
-                    if p.Status and p.Status != "OK" and p.Status != "Unknown":
-                        self.log("Printer", p.Name, "WARNING", f"Status: {p.Status}")
-            except: pass
-
-    # ==========================
-    # MODULE 3: NETWORK
-    # ==========================
-    def check_network(self):
-        self.section("NETWORK & CONNECTIVITY")
-        
-        if c_wmi:
-            try:
-                for adapter in c_wmi.Win32_NetworkAdapterConfiguration(IPEnabled=True):
-                    desc = adapter.Description
-                    ip_address = adapter.IPAddress[0] if adapter.IPAddress else "No IP"
-                    gateway = adapter.DefaultIPGateway[0] if adapter.DefaultIPGateway else "No Gateway"
-                    if "No IP" not in ip_address:
-                        self.log("Interface", desc[:30], "INFO")
-                        self.log(" > IP", ip_address, "INFO")
-                        self.log(" > Gateway", gateway, "INFO")
-            except: pass
-
-        try:
-            socket.gethostbyname("google.com")
-            self.log("DNS", "OK", "PASS")
-        except: self.log("DNS", "Failed", "FAIL", action_item="Check DNS.")
-        
-        try:
-            res = requests.get('http://ip-api.com/json', timeout=2).json()
-            self.log("Public IP", f"{res.get('query')} ({res.get('isp')})", "INFO")
-        except: self.log("Public IP", "Offline", "WARNING")
-
-        try:
-            connections = psutil.net_connections(kind='inet')
-            listening = [c.laddr.port for c in connections if c.status == 'LISTEN']
-            if 3389 in listening: self.log("Open Ports", "RDP (3389) Open", "WARNING", action_item="Secure RDP.")
-        except: pass
-        
-        # if not self.args.quick:
-        #     if Confirm.ask("Run Speedtest?", default=False):
-        #         try:
-        #             self.log("Speedtest", "Testing...", "INFO")
-        #             st = speedtest.Speedtest()
-        #             st.get_best_server()
-        #             down = st.download()/1e6
-        #             if down < 10: self.log("Download", f"{down:.1f} Mbps", "WARNING", action_item="Slow Internet.")
-        #             else: self.log("Download", f"{down:.1f} Mbps", "PASS")
-        #         except: self.log("Speedtest", "Failed", "WARNING")
-
-    # ==========================
-    # MODULE 4: SECURITY (Restored AV, TPM, UAC)
-    # ==========================
-    def check_security(self):
-        self.section("SECURITY & COMPLIANCE")
-        
-        # Antivirus (RESTORED)
-        try:
-            wmi_sec = wmi.WMI(namespace=r"root\SecurityCenter2")
-            av = wmi_sec.AntivirusProduct()
-            if av: self.log("Antivirus", "Active", "PASS")
-            else: self.log("Antivirus", "Missing", "FAIL", action_item="Install AV.")
-        except: pass
-
-        # TPM (RESTORED)
-        if c_wmi:
-            try:
-                tpm = c_wmi.Win32_Tpm()
-                if tpm: self.log("TPM Chip", "Present", "PASS")
-                else: self.log("TPM Chip", "Not Detected", "WARNING")
-            except: pass
-
-        # UAC (RESTORED)
-        try:
-            key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Policies\System")
-            val, _ = winreg.QueryValueEx(key, "EnableLUA")
-            if val == 1: self.log("UAC", "Enabled", "PASS")
-            else: self.log("UAC", "Disabled", "FAIL", action_item="Enable UAC.")
-        except: pass
-
-        # BitLocker
-        try:
-            ps_cmd = "Get-BitLockerVolume -MountPoint C: | Select-Object -ExpandProperty ProtectionStatus"
-            out = subprocess.check_output(["powershell", "-Command", ps_cmd], stderr=subprocess.DEVNULL).decode().strip()
-            if "1" in out: self.log("BitLocker", "Encrypted", "PASS")
-            else: self.log("BitLocker", "Unencrypted", "WARNING", action_item="Enable BitLocker.")
-        except: pass
-        
-        # Firewall
-        try:
-            out = subprocess.check_output("netsh advfirewall show allprofiles state", shell=True).decode()
-            if "OFF" in out: self.log("Firewall", "Disabled", "FAIL", action_item="Enable Firewall.")
-            else: self.log("Firewall", "Enabled", "PASS")
-        except: pass
-
-        # Local Admin
-        try:
-            out = subprocess.check_output("net localgroup administrators", shell=True).decode()
-            lines = [x.strip() for x in out.splitlines() if x.strip() and "User" not in x and "command" not in x and "-" not in x]
-            suspicious = [u for u in lines if u.lower() not in ['administrator', 'domain admins', self.hostname.lower()]]
-            if len(suspicious) > 0: self.log("Local Admins", f"Check: {', '.join(suspicious)}", "WARNING")
-            else: self.log("Local Admins", "Clean", "PASS")
-        except: pass
-
-        # Domain
-        if c_wmi:
-            try:
-                sys_info = c_wmi.Win32_ComputerSystem()[0]
-                if sys_info.PartOfDomain:
-                    self.log("Domain", f"Joined: {sys_info.Domain}", "PASS")
-                    try:
-                        cmd = f"nltest /sc_query:{sys_info.Domain}"
-                        out = subprocess.check_output(cmd, shell=True, stderr=subprocess.STDOUT).decode()
-                        if "Success" in out: self.log("Trust Status", "OK", "PASS")
-                        else: self.log("Trust Status", "Broken", "FAIL", action_item="Rejoin Domain.")
-                    except: pass
-                else: self.log("Domain", "Workgroup", "INFO")
-            except: pass
-
-    # ==========================
-    # MODULE 5: SOFTWARE (Restored Update Failures)
-    # ==========================
-    def check_software(self):
-        self.section("SOFTWARE & OS")
-        
-        try:
-            cmd = r"cscript //nologo %windir%\system32\slmgr.vbs /xpr"
-            out = subprocess.check_output(cmd, shell=True).decode()
-            if "permanently" in out.lower() or "volume" in out.lower(): self.log("Activation", "Licensed", "PASS")
-            else: self.log("Activation", "Not Activated", "FAIL", action_item="Activate Windows License.")
-        except: pass
-
-        reboot = False
-        try:
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Component Based Servicing\RebootPending"): reboot = True
-        except: pass
-        if reboot: self.log("Updates", "Reboot Pending", "FAIL", action_item="Restart PC.")
-        else: self.log("Updates", "Clean", "PASS")
-
-        # Windows Update History (RESTORED)
-        try:
-            ps_cmd = "Get-WinEvent -ProviderName 'Microsoft-Windows-WindowsUpdateClient' -MaxEvents 20 -ErrorAction SilentlyContinue | Where-Object {$_.Id -eq 20} | Measure-Object | Select-Object -ExpandProperty Count"
-            out = subprocess.check_output(["powershell", "-Command", ps_cmd], stderr=subprocess.DEVNULL).decode().strip()
-            if out and int(out) > 0: self.log("Win Updates", f"{out} Recent Failures", "WARNING", action_item="Check Windows Update.")
-            else: self.log("Win Updates", "No Recent Failures", "PASS")
-        except: pass
-
-        try:
-            count = 0
-            paths = [r"SOFTWARE\Microsoft\Windows\CurrentVersion\Run", r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Run"]
-            for p in paths:
-                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, p)
-                for i in range(winreg.QueryInfoKey(key)[0]): count += 1
-            status = "WARNING" if count > 10 else "PASS"
-            self.log("Startup Apps", f"{count} Apps", status, action_item="Disable unused startup apps.")
-        except: pass
-
-        try:
-            temp_path = os.environ.get('TEMP')
-            total_size = sum(os.path.getsize(os.path.join(dp, f)) for dp, dn, filenames in os.walk(temp_path) for f in filenames) / (1024*1024)
-            if total_size > 1024: self.log("Temp Files", f"{total_size:.0f} MB Found", "WARNING", action_item="Run Disk Cleanup.")
-            else: self.log("Temp Files", f"{total_size:.0f} MB (Clean)", "PASS")
-        except: pass
-
-    # ==========================
-    # MODULE 6: PERFORMANCE (Restored Power Plan)
-    # ==========================
-    def check_performance(self):
-        self.section("PERFORMANCE")
-        cpu = psutil.cpu_percent(interval=1)
-        self.log("CPU Load", f"{cpu}%", "PASS" if cpu < 90 else "FAIL")
-        
-        # Power Plan (RESTORED)
-        try:
-            out = subprocess.check_output("powercfg /getactivescheme", shell=True).decode()
-            plan = out.split("(")[1].split(")")[0] if "(" in out else "Unknown"
-            self.log("Power Plan", plan, "INFO")
-        except: pass
-
-        try:
-            top = sorted([p.info for p in psutil.process_iter(['name', 'cpu_percent'])], key=lambda p: p['cpu_percent'], reverse=True)[0]
-            self.log("Top Hog", f"{top['name']} ({top['cpu_percent']}%)", "INFO")
-        except: pass
-
-        try:
-            dump_path = os.path.expandvars(r"%SystemRoot%\Minidump")
-            if os.path.exists(dump_path) and len(os.listdir(dump_path)) > 0:
-                self.log("BSOD History", "Crashes Detected", "WARNING", action_item="Check Minidumps folder.")
-            else:
-                self.log("BSOD History", "Clean", "PASS")
-        except: pass
-
-    # ==========================
-    # REPORTING
-    # ==========================
-    def save_report(self):
-        date_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-        filename = f"FIX_SHEET_{self.hostname}.txt"
-        
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write("IT REPAIR CHECKLIST & DIAGNOSTIC REPORT\n")
-            f.write(f"Device: {self.hostname} | {date_str}\n")
-            f.write("="*60 + "\n\n")
-            
-            if self.specs:
-                f.write("DEVICE CONTEXT:\n")
-                for k,v in self.specs.items(): f.write(f" - {k}: {v}\n")
-                f.write("-" * 30 + "\n\n")
-            
-            if not self.issues_found:
-                f.write("STATUS: GREEN (HEALTHY)\n")
-                f.write("No actionable issues found. System is ready for use.\n")
-            else:
-                f.write(f"STATUS: RED ({len(self.issues_found)} ISSUES FOUND)\n")
-                f.write("Please perform the following repairs:\n\n")
-                
-                for idx, issue in enumerate(self.issues_found, 1):
-                    f.write(f"{idx}. [ ] ISSUE: {issue['category']} - {issue['error']}\n")
-                    if issue['detail']: f.write(f"       DETAIL: {issue['detail']}\n")
-                    f.write(f"       FIX:    {issue['fix']}\n")
-                    f.write("-" * 60 + "\n")
-            
-            f.write("\nTechnician Signature: __________________________\n")
-        return filename
-
-    def run(self):
-        if not any(self.modules.values()): return
-
-        tasks = []
-        if self.modules["identity"]: tasks.append(self.check_identity)
-        if self.modules["hardware"]: tasks.append(self.check_hardware)
-        if self.modules["network"]: tasks.append(self.check_network)
-        if self.modules["security"]: tasks.append(self.check_security)
-        if self.modules["software"]: tasks.append(self.check_software)
-        if self.modules["performance"]: tasks.append(self.check_performance)
-
-        console.print(Panel(Align.center("[bold white]Running Diagnostics...[/]"), border_style="cyan", expand=True))
-        
-        with Progress(SpinnerColumn(), TextColumn("[bold cyan]{task.description}"), BarColumn(), console=console) as progress:
-            t1 = progress.add_task("Scanning...", total=len(tasks))
-            for task in tasks:
-                task()
-                progress.advance(t1)
-
-        console.print("\n")
-        grid = Table.grid(expand=True)
-        grid.add_column(justify="center", ratio=1)
-        grid.add_column(justify="center", ratio=1)
-        grid.add_column(justify="center", ratio=1)
-        grid.add_row(
-            f"[bold green]PASS: {self.stats['PASS']}[/]",
-            f"[bold yellow]WARN: {self.stats['WARNING']}[/]",
-            f"[bold red]FAIL: {self.stats['FAIL']}[/]"
-        )
-        console.print(Panel(grid, border_style="grey50"))
-
-        if self.issues_found:
-            table = Table(title="ISSUES DETECTED", show_header=True, header_style="bold red", expand=True)
-            table.add_column("Category", style="cyan")
-            table.add_column("Error", style="white")
-            table.add_column("Recommended Fix", style="yellow")
-            for i in self.issues_found:
-                table.add_row(i['category'], i['error'], i['fix'])
-            console.print(table)
-        else:
-            console.print(Panel("[bold green]System Healthy - No Issues Found[/]", border_style="green"))
-
-        f = self.save_report()
-        console.print(f"\n[bold green]Report Saved:[/bold green] {f}")
-
-if __name__ == "__main__":
-    arguments = parse_arguments()
-    tool = IT_Diagnostic_v18(arguments)
-    tool.run()
\ No newline at end of file
+import sys
+import ctypes
+import platform
+import datetime
+import time
+import argparse
+import queue
+import threading
+from v18_collectors import make_collector
+from v18_factcache import FactCache, default_cache_path
+from v18_events import open_sink
+# rich, concurrent.futures, psutil, wmi, requests and speedtest are imported
+# where they're used, so a headless or single-module run only pays for what
+# its probes touch (see bench_startup.py).
+
+# ==========================================
+# 1. SETUP & ARGS
+# ==========================================
+def positive_int(text):
+    value = int(text)
+    if value < 1: raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="IT Diagnostic Master Tool v18.0")
+    parser.add_argument("--all", action="store_true", help="Run ALL checks")
+    parser.add_argument("--auto", action="store_true", help="Skip menu, run all")
+    parser.add_argument("--quick", action="store_true", help="Skip Speedtest")
+    parser.add_argument("--speed-server", metavar="HOST[:PORT]", help="Run the built-in speed test against simple_TCP_server_in_python.py there")
+    parser.add_argument("--speed-duration", type=float, default=5.0, help="Seconds per download/upload test (default 5)")
+    parser.add_argument("--speed-streams", type=int, default=4, help="Parallel TCP streams per speed test (default 4)")
+    parser.add_argument("--modules", metavar="LIST", help="Comma-separated modules to run without the menu: " + ",".join(IT_Diagnostic_v18.MODULE_ORDER))
+    parser.add_argument("--parallel", action="store_true", help="Run probes concurrently on a worker pool")
+    parser.add_argument("--workers", type=int, default=8, help="Worker threads for --parallel (default 8)")
+    parser.add_argument("--probe-timeout", type=float, default=20.0, help="Seconds before a probe is abandoned in --parallel mode")
+    parser.add_argument("--backend", choices=["auto", "windows", "linux", "fixture"], default="auto", help="Where facts come from (default: this OS)")
+    parser.add_argument("--fixture", metavar="PATH", help="JSON fixture to replay (implies --backend fixture)")
+    parser.add_argument("--event-file", metavar="PATH", help='Scan events from a JSON file ({"System": [{record_id, id, provider, time}, ...]}) instead of the live event log')
+    parser.add_argument("--record-fixture", metavar="PATH", help="Save everything collected this run as a replayable fixture")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached static facts and probe everything")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the static fact cache")
+    parser.add_argument("--cache-file", metavar="PATH", default=default_cache_path(), help="Static fact cache location")
+    parser.add_argument("--history", metavar="PATH", help="Run history database (default: next to the fact cache; off for fixture replays)")
+    parser.add_argument("--no-history", action="store_true", help="Don't append this run to the history database")
+    parser.add_argument("--format", choices=["text", "json", "ndjson"], default="text", help="Event output format (default: text)")
+    parser.add_argument("--output", metavar="PATH", help="Write --format events here instead of stdout (also with the TUI on)")
+    parser.add_argument("--profile", metavar="PATH", help="Write a cProfile/pstats dump of the whole run here (main thread; use without --parallel)")
+    parser.add_argument("--no-tui", action="store_true", help="No rich rendering or menu (implies --auto)")
+    parser.add_argument("--net-samples", type=int, default=5, help="Requests per DNS/HTTP target when measuring latency (default 5)")
+    parser.add_argument("--hog-interval", type=float, default=1.0, help="Seconds between the two Top Hog process samples")
+    parser.add_argument("--top-n", type=int, default=5, help="Processes listed per Top Hog ranking (default 5)")
+    parser.add_argument("--watch", action="store_true", help="Daemon mode: sample CPU/memory/disk/network and report state changes")
+    parser.add_argument("--watch-interval", type=float, default=1.0, help="Seconds between --watch samples (default 1)")
+    parser.add_argument("--watch-window", type=positive_int, default=60, help="Samples in the --watch sliding window (default 60)")
+    parser.add_argument("--watch-duration", type=float, help="Stop --watch after this many seconds (default: until Ctrl+C)")
+    args = parser.parse_args(argv)
+    if args.modules:
+        args.modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+        unknown = [m for m in args.modules if m not in IT_Diagnostic_v18.MODULE_ORDER]
+        if unknown: parser.error(f"unknown module(s): {', '.join(unknown)}")
+    return args
+
+# Probes that read root\wmi, BitLocker, the Security log or other admin-only state
+ADMIN_MODULES = {"hardware", "security", "software"}
+
+def is_admin():
+    try: return ctypes.windll.shell32.IsUserAnAdmin()
+    except: return False
+
+def relaunch_elevated(modules):
+    """Re-run this script through UAC with the module selection already made, then exit."""
+    argv = sys.argv[1:]
+    if "--modules" in argv:
+        i = argv.index("--modules")
+        argv = argv[:i] + argv[i + 2:]
+    argv = [a for a in argv if not a.startswith("--modules=")]
+    args_str = " ".join(argv + ["--modules", ",".join(modules)])
+    ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, f'"{sys.argv[0]}" {args_str}', None, 1)
+    sys.exit()
+
+default_console = None
+
+def get_console():
+    """The shared rich Console, created on first use."""
+    global default_console
+    if default_console is None:
+        from rich.console import Console
+        default_console = Console()
+    return default_console
+
+class _NullConsole:
+    """Stands in for rich's Console under --no-tui."""
+    def print(self, *args, **kwargs): pass
+    def clear(self): pass
+
+class _ProbeSlot:
+    """One row of the probe table while it runs in --parallel mode (method=None is a section header)."""
+    def __init__(self, module, label, method, timeout):
+        self.module = module
+        self.label = label
+        self.method = method
+        self.timeout = timeout
+        self.buffer = []
+        self.started = None
+        self.finished = None
+        self.timed_out = False
+        self.timing = None
+        from concurrent.futures import Future
+        self.future = Future()
+
+class IT_Diagnostic_v18:
+    def __init__(self, args, collector=None, console=None):
+        self.args = args
+        # --format json/ndjson on stdout can't share it with rich
+        headless = getattr(args, "no_tui", False) or (getattr(args, "format", "text") != "text" and not getattr(args, "output", None))
+        self.tui = not headless
+        self.console = console or (get_console() if self.tui else _NullConsole())
+        self.sink = None
+        # With the TUI on, text events only go to a file when one is asked for
+        if not self.tui or getattr(args, "format", "text") != "text" or getattr(args, "output", None) not in (None, "-"):
+            self.sink = open_sink(args.format, args.output)
+        self.issues_found = [] 
+        self.findings = []
+        self.top_processes = None
+        self.collector = collector or make_collector(getattr(args, "backend", "auto"), getattr(args, "fixture", None))
+        self.hostname = self.collector.hostname()
+        self.fact_cache = None
+        if self.collector.name != "fixture" and not getattr(args, "no_cache", False):
+            self.fact_cache = FactCache(args.cache_file, self.hostname, self.collector.boot_time(), refresh=args.refresh)
+            self.collector.fact_cache = self.fact_cache
+            from v18_dirsize import DirSizeCache
+            self.collector.dirsize_cache = DirSizeCache(args.cache_file + ".dirs")
+            from v18_eventlog import EventBookmarks
+            self.collector.event_bookmarks = EventBookmarks(args.cache_file + ".events")
+        if getattr(args, "event_file", None):
+            from v18_eventlog import FileEventSource
+            self.collector.event_source = FileEventSource.load(args.event_file)
+        self.specs = {} 
+        self.stats = {"PASS": 0, "FAIL": 0, "WARNING": 0, "INFO": 0}
+        self._local = threading.local()
+        self.timings = []
+        self._timings_lock = threading.Lock()
+        
+        self.modules = {
+            "identity": False, "hardware": False, "software": False, 
+            "security": False, "network": False, "performance": False
+        }
+
+        if getattr(args, "modules", None):
+            for k in self.modules: self.modules[k] = k in args.modules
+        elif args.all or args.auto or getattr(args, "watch", False) or not self.tui:
+             for k in self.modules: self.modules[k] = True
+        else:
+            self.show_main_menu()
+
+    def show_main_menu(self):
+        from rich import box
+        from rich.panel import Panel
+        from rich.align import Align
+        from rich.prompt import Prompt
+        self.console.clear()
+        subtitle = "[spring_green1]Ultimate Edition[/]"
+        self.console.print(Panel(Align.center(f"[bold white]IT DIAGNOSTIC MASTER (v18.0)[/]\n{subtitle}"), 
+                            border_style="spring_green1", box=box.ROUNDED, padding=(1, 4), expand=True))
+        
+        self.console.print("\n[bold cyan]Select Diagnostics:[/bold cyan]")
+        self.console.print("1. [bold white]Run Everything[/] (Full Audit)")
+        self.console.print("2. [bold white]Identity & Context[/] (Serial, OS, Uptime)")
+        self.console.print("3. [bold white]Hardware Deep Dive[/] (Drivers, SMART, Ram Speed)")
+        self.console.print("4. [bold white]Network Stack[/] (Gateway, Ports, Speed)")
+        self.console.print("5. [bold white]Security Audit[/] (AV, TPM, UAC, Admin)")
+        self.console.print("6. [bold white]Software Health[/] (Updates, Startup, Temp)")
+        self.console.print("7. [bold white]Performance[/] (Hogs, BSOD, Power Plan)")
+        self.console.print("0. Exit")
+        
+        choice = Prompt.ask("\n[bold yellow]Enter Choice[/]", choices=["0", "1", "2", "3", "4", "5", "6", "7"], default="1")
+        
+        if choice == "0": sys.exit()
+        if choice == "1": 
+            for k in self.modules: self.modules[k] = True
+        elif choice == "2": self.modules["identity"] = True
+        elif choice == "3": self.modules["hardware"] = True
+        elif choice == "4": self.modules["network"] = True
+        elif choice == "5": self.modules["security"] = True
+        elif choice == "6": self.modules["software"] = True
+        elif choice == "7": self.modules["performance"] = True
+        
+        self.console.clear()
+
+    def log(self, category, message, status="INFO", detail=None, action_item=None):
+        # Probes log into a per-probe buffer; it's emitted (with the probe's duration) once the probe ends
+        record = (datetime.datetime.now().astimezone(), category, message, status, detail, action_item)
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None: buffer.append(record)
+        else: self.emit(*record)
+
+    def emit(self, ts, category, message, status="INFO", detail=None, action_item=None, module=None, probe=None, duration=None):
+        timestamp = ts.strftime("%H:%M:%S")
+        if status == "PASS": icon="[green]✔[/]"; style="green"; self.stats["PASS"]+=1
+        elif status == "FAIL": icon="[red]✖[/]"; style="bold red"; self.stats["FAIL"]+=1
+        elif status == "WARNING": icon="[yellow]![/]"; style="yellow"; self.stats["WARNING"]+=1
+        else: icon="[blue]i[/]"; style="cyan"; self.stats["INFO"]+=1
+
+        self.console.print(f"{timestamp} | {icon} | [bold white]{category:18}[/bold white] | [{style}]{message}[/{style}]")
+        if detail: self.console.print(f"             [dim]↳ {detail}[/dim]")
+
+        if status == "INFO":
+            if category in self.specs: self.specs[category] += f", {message}"
+            else: self.specs[category] = message
+
+        if status in ["FAIL", "WARNING"]:
+            if not action_item: action_item = "Investigate manually."
+            self.issues_found.append({"category": category, "error": message, "detail": detail if detail else "", "fix": action_item})
+
+        event = {"type": "finding", "ts": ts.isoformat(timespec="milliseconds"), "host": self.hostname,
+                 "module": module, "probe": probe, "category": category, "status": status, "message": message,
+                 "detail": detail or "", "fix": action_item or "",
+                 "duration_ms": round(duration * 1000, 1) if duration is not None else None}
+        self.findings.append(event)
+        if self.sink: self.sink.write(event)
+
+    def section(self, title):
+        self.console.print(f"\n[bold magenta italic]--- {title} ---[/bold magenta italic]")
+
+    # ==========================
+    # PROBE TABLE
+    # ==========================
+    # module -> [(label, method, timeout)]. List order is report order.
+    # timeout=None means --probe-timeout; only used in --parallel mode.
+    MODULE_ORDER = ["identity", "hardware", "network", "security", "software", "performance"]
+    SECTIONS = {
+        "identity": "IDENTITY & CONTEXT", "hardware": "HARDWARE DIAGNOSTICS",
+        "network": "NETWORK & CONNECTIVITY", "security": "SECURITY & COMPLIANCE",
+        "software": "SOFTWARE & OS", "performance": "PERFORMANCE",
+    }
+    PROBES = {
+        "identity": [
+            ("OS Version", "probe_os_version", None),
+            ("Model", "probe_model_serial", None),
+            ("Uptime", "probe_uptime", None),
+        ],
+        "hardware": [
+            ("CPU Model", "probe_cpu", None),
+            ("GPU Info", "probe_gpu", None),
+            ("RAM", "probe_ram", None),
+            ("Battery", "probe_battery", None),
+            ("Drivers", "probe_drivers", None),
+            ("Drive Type", "probe_drive_type", None),
+            ("SMART Status", "probe_smart", None),
+            ("Bad Sectors", "probe_bad_sectors", 45.0),
+            ("Printer", "probe_printers", None),
+        ],
+        "network": [
+            ("Interface", "probe_interfaces", None),
+            ("DNS", "probe_dns", None),
+            ("Latency", "probe_latency", None),
+            ("Public IP", "probe_public_ip", None),
+            ("Open Ports", "probe_open_ports", None),
+            ("Speed Test", "probe_bandwidth", 60),
+        ],
+        "security": [
+            ("Antivirus", "probe_antivirus", None),
+            ("TPM Chip", "probe_tpm", None),
+            ("UAC", "probe_uac", None),
+            ("BitLocker", "probe_bitlocker", None),
+            ("Firewall", "probe_firewall", None),
+            ("Local Admins", "probe_local_admins", None),
+            ("Domain", "probe_domain", None),
+        ],
+        "software": [
+            ("Activation", "probe_activation", None),
+            ("Updates", "probe_reboot_pending", None),
+            ("Win Updates", "probe_update_history", 45.0),
+            ("Startup Apps", "probe_startup_apps", None),
+            ("Temp Files", "probe_temp_files", 60.0),
+        ],
+        "performance": [
+            ("CPU Load", "probe_cpu_load", None),
+            ("Power Plan", "probe_power_plan", None),
+            ("Top Hog", "probe_top_hog", None),
+            ("BSOD History", "probe_bsod", None),
+        ],
+    }
+
+    # Temp Files warns past this; the scan stops as soon as it's crossed
+    TEMP_WARN_MB = 1024
+    DNS_SLOW_MS = 150
+    HTTP_SLOW_MS = 500
+    SLOW_MBPS = 10
+    # Registry keys counted by probe_startup_apps
+    STARTUP_KEYS = [r"SOFTWARE\Microsoft\Windows\CurrentVersion\Run", r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Run"]
+    # Batched PowerShell probes each module needs (see v18_collectors.POWERSHELL_PROBES)
+    POWERSHELL_KEYS = {"hardware": ["disk_media"], "security": ["bitlocker"]}
+
+    def run_module(self, module, progress=None, task_id=None):
+        self.section(self.SECTIONS[module])
+        for label, method, timeout in self.PROBES[module]:
+            self.run_probe(module, label, method)
+            if progress is not None: progress.advance(task_id)
+
+    def run_probe(self, module, label, method):
+        buffer = self._local.buffer = []
+        timing, clock = self.start_timing(module, label, method)
+        self._local.timing = timing
+        error = None
+        try:
+            getattr(self, method)()
+        except Exception as e:
+            error = e
+        finally:
+            self._local.buffer = self._local.timing = None
+            self.stop_timing(timing, clock, error, findings=len(buffer))
+            duration = timing["wall_ms"] / 1000
+            for record in buffer: self.emit(*record, module=module, probe=label, duration=duration)
+            if error is not None:
+                self.emit(datetime.datetime.now().astimezone(), label, "Probe crashed", "WARNING", str(error),
+                          module=module, probe=label, duration=duration)
+
+    # ==========================
+    # PROBE INSTRUMENTATION
+    # ==========================
+    # Every probe gets a timing record: wall + CPU time (thread_time, so parallel
+    # probes don't bill each other), outcome, and the exception if one was
+    # swallowed by the probe's own try/except or escaped it.
+    #   ok | no-data (backend had nothing) | swallowed | crashed | timeout
+    def start_timing(self, module, label, method):
+        """(timing record, clock) -- hand both back to stop_timing from the same thread."""
+        timing = {"module": module, "probe": label, "method": method, "wall_ms": None, "cpu_ms": None,
+                  "outcome": None, "exception": None, "findings": 0}
+        with self._timings_lock: self.timings.append(timing)
+        return timing, (time.perf_counter(), time.thread_time())
+
+    def stop_timing(self, timing, clock, error=None, findings=0):
+        # --parallel already gave up on this probe; its late finish must not rewrite the record
+        if timing["outcome"] == "timeout": return
+        timing["wall_ms"] = round((time.perf_counter() - clock[0]) * 1000, 2)
+        timing["cpu_ms"] = round((time.thread_time() - clock[1]) * 1000, 2)
+        timing["findings"] = findings
+        if error is not None:
+            timing["outcome"], timing["exception"] = "crashed", f"{type(error).__name__}: {error}"
+        elif timing["outcome"] is None:
+            timing["outcome"] = "ok" if timing["findings"] else "no-data"
+
+    def swallow(self, error):
+        """Called from a probe's `except`: keep the probe quiet, but remember what went wrong."""
+        timing = getattr(self._local, "timing", None)
+        if timing is not None:
+            timing["outcome"], timing["exception"] = "swallowed", f"{type(error).__name__}: {error}"
+
+    def slowest_probes(self, n=10):
+        done = [t for t in self.timings if t["wall_ms"] is not None]
+        return sorted(done, key=lambda t: t["wall_ms"], reverse=True)[:n]
+
+    # ==========================
+    # MODULE 1: IDENTITY
+    # ==========================
+    def check_identity(self): self.run_module("identity")
+
+    def probe_os_version(self):
+        try:
+            os_name = f"{platform.system()} {platform.release()}"
+            build = platform.version()
+            for os_data in self.collector.wmi("Win32_OperatingSystem") or []:
+                os_name = os_data.Caption
+                build = os_data.BuildNumber
+            self.log("OS Version", f"{os_name} (Build {build})", "INFO")
+        except Exception as e: self.swallow(e)
+
+    def probe_model_serial(self):
+        try:
+            for cs in self.collector.wmi("Win32_ComputerSystem") or []:
+                self.log("Model", f"{cs.Manufacturer} {cs.Model}", "INFO")
+            for bios in self.collector.wmi("Win32_BIOS") or []:
+                self.log("Serial Number", bios.SerialNumber, "INFO")
+        except Exception as e: self.swallow(e)
+
+    def probe_uptime(self):
+        uptime_s = time.time() - self.collector.boot_time()
+        days = uptime_s // (24 * 3600)
+        self.log("Uptime", f"{int(days)} Days", "WARNING" if days > 7 else "PASS", 
+                 action_item="Reboot recommended." if days > 7 else None)
+
+    # ==========================
+    # MODULE 2: HARDWARE (Restored RAM Speed, SMART, Printers)
+    # ==========================
+    def check_hardware(self): self.run_module("hardware")
+
+    def probe_cpu(self):
+        try:
+            for cpu in self.collector.wmi("Win32_Processor") or []: 
+                self.log("CPU Model", cpu.Name.strip(), "INFO")
+                self.log("CPU Cores", f"{cpu.NumberOfCores}C / {cpu.NumberOfLogicalProcessors}T", "INFO")
+        except Exception as e: self.swallow(e)
+
+    def probe_gpu(self):
+        try:
+            for gpu in self.collector.wmi("Win32_VideoController") or []:
+                vram = "Unknown"
+                try: vram = f"{int(gpu.AdapterRAM) / (1024**3):.2f} GB"
+                except: pass
+                self.log("GPU Info", f"{gpu.Name} ({vram})", "INFO")
+        except Exception as e: self.swallow(e)
+
+    def probe_ram(self):
+        sticks = self.collector.wmi("Win32_PhysicalMemory")
+        if sticks is None: return
+        try:
+            total_cap = 0
+            for mem in sticks:
+                cap = int(mem.Capacity) / (1024**3)
+                total_cap += cap
+                speed = mem.Speed if mem.Speed is not None else "?"
+                maker = mem.Manufacturer or ""
+                self.log("RAM Stick", f"{cap:.0f}GB @ {speed}MHz {maker}", "INFO")
+            
+            mem_stats = self.collector.virtual_memory()
+            status = "FAIL" if mem_stats.percent > 90 else "PASS"
+            self.log("RAM Usage", f"{mem_stats.percent}% Used (of {total_cap:.0f}GB)", status)
+        except Exception as e: self.swallow(e)
+
+    def probe_battery(self):
+        try:
+            for b in self.collector.wmi("Win32_Battery") or []:
+                status = "Plugged In" if b.BatteryStatus == 2 else "On Battery"
+                self.log("Battery", f"{b.EstimatedChargeRemaining}% ({status})", "INFO")
+        except Exception as e: self.swallow(e)
+
+    def probe_drivers(self):
+        # Device Drivers (The "Drive Manager" Check)
+        errors = self.collector.wmi("Win32_PnPEntity", where="ConfigManagerErrorCode != 0")
+        if errors is None: return
+        try:
+            if errors:
+                for dev in errors:
+                    self.log("Driver Error", dev.Caption, "FAIL", f"Code: {dev.ConfigManagerErrorCode}", 
+                             action_item=f"Reinstall driver for {dev.Caption}")
+            else:
+                self.log("Drivers", "No Yellow Bangs", "PASS")
+        except Exception as e: self.swallow(e)
+
+    def probe_drive_type(self):
+        out = self.collector.powershell("disk_media")
+        if out is None: return
+        if "HDD" in out: self.log("Drive Type", "HDD Detected", "WARNING", action_item="Upgrade to SSD.")
+        elif "SSD" in out: self.log("Drive Type", "SSD Detected", "PASS")
+
+    def probe_smart(self):
+        try:
+            for d in self.collector.wmi("Win32_DiskDrive") or []:
+                if d.Status != "OK":
+                    self.log("SMART Status", d.Caption, "FAIL", d.Status, action_item="REPLACE DRIVE.")
+                else:
+                    self.log("SMART Status", "Healthy", "PASS")
+        except Exception as e: self.swallow(e)
+
+    @staticmethod
+    def _event_window(hit):
+        return f" in {hit['window_days']} days" if hit.get("window_days") else ""
+
+    def probe_bad_sectors(self):
+        # Storage (Bad Sectors Event 7), bookmarked scan of the System log
+        counts = self.collector.event_counts()
+        if counts is None: return
+        hit = counts["bad_sectors"]
+        if hit["count"]: self.log("Bad Sectors", "CONFIRMED", "FAIL", f"{hit['count']} x Event 7{self._event_window(hit)}", action_item="REPLACE DRIVE.")
+        else: self.log("Bad Sectors", "Clean", "PASS")
+
+    def probe_printers(self):
+        try:
+            for p in self.collector.wmi("Win32_Printer") or []:
+                if p.Status and p.Status != "OK" and p.Status != "Unknown":
+                    self.log("Printer", p.Name, "WARNING", f"Status: {p.Status}")
+        except Exception as e: self.swallow(e)
+
+    # ==========================
+    # MODULE 3: NETWORK
+    # ==========================
+    def check_network(self): self.run_module("network")
+
+    def probe_interfaces(self):
+        try:
+            for adapter in self.collector.wmi("Win32_NetworkAdapterConfiguration", where="IPEnabled = True") or []:
+                desc = adapter.Description
+                ip_address = adapter.IPAddress[0] if adapter.IPAddress else "No IP"
+                gateway = adapter.DefaultIPGateway[0] if adapter.DefaultIPGateway else "No Gateway"
+                if "No IP" not in ip_address:
+                    self.log("Interface", desc[:30], "INFO")
+                    self.log(" > IP", ip_address, "INFO")
+                    self.log(" > Gateway", gateway, "INFO")
+        except Exception as e: self.swallow(e)
+
+    def network_report(self):
+        # One concurrent measurement per run (v18_netprobe); DNS, Latency and Public IP all share it
+        return self.collector.network_report(samples=getattr(self.args, "net_samples", 5))
+
+    @staticmethod
+    def _latency(entry):
+        lat = entry["latency_ms"]
+        if not lat and entry.get("cold_ms") is not None: return f"{entry['cold_ms']:.0f} ms (one cold request)"
+        if not lat: return "no answer"
+        return f"p50 {lat['p50']:.0f} ms / p95 {lat['p95']:.0f} ms / max {lat['max']:.0f} ms"
+
+    def probe_dns(self):
+        report = self.network_report()
+        if report is None:
+            # Backend (or an older fixture) without a latency report: single lookup
+            if self.collector.resolve("google.com"): self.log("DNS", "OK", "PASS")
+            else: self.log("DNS", "Failed", "FAIL", action_item="Check DNS.")
+            return
+        dns = report["dns"]
+        ok = [name for name, entry in dns.items() if entry["address"]]
+        # The cold (first, uncached) lookup is reported but not judged; only one lookup -> judge that
+        slow = [name for name in ok if (dns[name]["latency_ms"]["p95"] if dns[name]["latency_ms"] else dns[name]["cold_ms"]) >= self.DNS_SLOW_MS]
+        if not ok: self.log("DNS", "Failed", "FAIL", action_item="Check DNS.")
+        elif len(ok) < len(dns): self.log("DNS", f"{len(ok)}/{len(dns)} Names Resolved", "WARNING", action_item="Check DNS.")
+        elif slow: self.log("DNS", f"Slow ({', '.join(slow)})", "WARNING", action_item="Check DNS server / use a closer resolver.")
+        else: self.log("DNS", "OK", "PASS")
+        for name, entry in dns.items():
+            cold = f", first lookup {entry['cold_ms']:.0f} ms" if entry.get("cold_ms") is not None and entry["latency_ms"] else ""
+            self.log(f" > {name}"[:18], self._latency(entry), "INFO", detail=f"{entry['address']}{cold}")
+
+    def probe_latency(self):
+        report = self.network_report()
+        if report is None: return
+        http = report["http"]
+        reachable = [url for url, entry in http.items() if entry["status"] is not None]
+        slow = [url for url in reachable if http[url]["latency_ms"] and http[url]["latency_ms"]["p95"] >= self.HTTP_SLOW_MS]
+        if not reachable: self.log("Latency", "No Endpoint Reachable", "FAIL", action_item="Check Internet / proxy.")
+        elif len(reachable) < len(http): self.log("Latency", f"{len(reachable)}/{len(http)} Endpoints Reachable", "WARNING", action_item="Check firewall / proxy.")
+        elif slow: self.log("Latency", f"High ({len(slow)}/{len(http)} Endpoints)", "WARNING", action_item="Check Wi-Fi signal / ISP.")
+        else: self.log("Latency", "OK", "PASS")
+        for url, entry in http.items():
+            host = url.split("/")[2]
+            detail = f"connect + first request {entry['cold_ms']:.0f} ms" if entry["cold_ms"] is not None else None
+            self.log(f" > {host}"[:18], self._latency(entry), "INFO", detail=detail)
+
+    def probe_public_ip(self):
+        report = self.network_report()
+        res = report["public_ip"] if report is not None else self.collector.public_ip()
+        if res: self.log("Public IP", f"{res.get('query')} ({res.get('isp')})", "INFO")
+        else: self.log("Public IP", "Offline", "WARNING")
+
+    def probe_open_ports(self):
+        listening = self.collector.listening_ports()
+        if listening and 3389 in listening: self.log("Open Ports", "RDP (3389) Open", "WARNING", action_item="Secure RDP.")
+
+    def probe_bandwidth(self):
+        # Built-in speed test against simple_TCP_server_in_python.py (--speed-server); replaces speedtest-cli
+        if self.args.quick: return
+        res = self.collector.bandwidth(getattr(self.args, "speed_server", None), self.args.speed_duration, self.args.speed_streams)
+        if res is None: return
+        if not res["reachable"]:
+            self.log("Speed Test", f"{res['server']} Unreachable", "WARNING", action_item="Start simple_TCP_server_in_python.py on the server.")
+            return
+        rtt = res["rtt_ms"]
+        self.log("Speed Test", f"RTT p50 {rtt['p50']:.2f} ms / p95 {rtt['p95']:.2f} ms", "INFO",
+                 detail=f"{res['server']}, {res['streams']} streams x {res['duration']:g}s")
+        for label, key in (("Download", "download_mbps"), ("Upload", "upload_mbps")):
+            mbps = res[key]
+            if mbps is None: self.log(label, "Failed", "WARNING")
+            elif mbps < self.SLOW_MBPS: self.log(label, f"{mbps:.1f} Mbps", "WARNING", action_item="Slow Internet.")
+            else: self.log(label, f"{mbps:.1f} Mbps", "PASS")
+
+    # ==========================
+    # MODULE 4: SECURITY (Restored AV, TPM, UAC)
+    # ==========================
+    def check_security(self): self.run_module("security")
+
+    def probe_antivirus(self):
+        av = self.collector.wmi("AntivirusProduct", namespace=r"root\SecurityCenter2")
+        if av is None: return
+        if av: self.log("Antivirus", "Active", "PASS")
+        else: self.log("Antivirus", "Missing", "FAIL", action_item="Install AV.")
+
+    def probe_tpm(self):
+        tpm = self.collector.wmi("Win32_Tpm")
+        if tpm is None: return
+        if tpm: self.log("TPM Chip", "Present", "PASS")
+        else: self.log("TPM Chip", "Not Detected", "WARNING")
+
+    def probe_uac(self):
+        val = self.collector.reg_value(r"SOFTWARE\Microsoft\Windows\CurrentVersion\Policies\System", "EnableLUA")
+        if val is None: return
+        if val == 1: self.log("UAC", "Enabled", "PASS")
+        else: self.log("UAC", "Disabled", "FAIL", action_item="Enable UAC.")
+
+    def probe_bitlocker(self):
+        out = self.collector.powershell("bitlocker")
+        if out is None: return
+        if "1" in out: self.log("BitLocker", "Encrypted", "PASS")
+        else: self.log("BitLocker", "Unencrypted", "WARNING", action_item="Enable BitLocker.")
+        
+    def probe_firewall(self):
+        out = self.collector.command("firewall")
+        if out is None: return
+        if "OFF" in out: self.log("Firewall", "Disabled", "FAIL", action_item="Enable Firewall.")
+        else: self.log("Firewall", "Enabled", "PASS")
+
+    def probe_local_admins(self):
+        out = self.collector.command("local_admins")
+        if out is None: return
+        lines = [x.strip() for x in out.splitlines() if x.strip() and "User" not in x and "command" not in x and "-" not in x]
+        suspicious = [u for u in lines if u.lower() not in ['administrator', 'domain admins', self.hostname.lower()]]
+        if len(suspicious) > 0: self.log("Local Admins", f"Check: {', '.join(suspicious)}", "WARNING")
+        else: self.log("Local Admins", "Clean", "PASS")
+
+    def probe_domain(self):
+        # Same snapshot as the identity "Model" probe: Win32_ComputerSystem is queried once per run
+        systems = self.collector.wmi("Win32_ComputerSystem")
+        if not systems: return
+        sys_info = systems[0]
+        if sys_info.PartOfDomain:
+            self.log("Domain", f"Joined: {sys_info.Domain}", "PASS")
+            out = self.collector.command("nltest", sys_info.Domain)
+            if out is not None:
+                if "Success" in out: self.log("Trust Status", "OK", "PASS")
+                else: self.log("Trust Status", "Broken", "FAIL", action_item="Rejoin Domain.")
+        else: self.log("Domain", "Workgroup", "INFO")
+
+    # ==========================
+    # MODULE 5: SOFTWARE (Restored Update Failures)
+    # ==========================
+    def check_software(self): self.run_module("software")
+
+    def probe_activation(self):
+        out = self.collector.command("activation")
+        if out is None: return
+        if "permanently" in out.lower() or "volume" in out.lower(): self.log("Activation", "Licensed", "PASS")
+        else: self.log("Activation", "Not Activated", "FAIL", action_item="Activate Windows License.")
+
+    def probe_reboot_pending(self):
+        reboot = self.collector.reg_key_exists(r"SOFTWARE\Microsoft\Windows\CurrentVersion\Component Based Servicing\RebootPending")
+        if reboot is None: return
+        if reboot: self.log("Updates", "Reboot Pending", "FAIL", action_item="Restart PC.")
+        else: self.log("Updates", "Clean", "PASS")
+
+    def probe_update_history(self):
+        # Windows Update History (WindowsUpdateClient Event 20), same scan as Bad Sectors
+        counts = self.collector.event_counts()
+        if counts is None: return
+        hit = counts["update_failures"]
+        if hit["count"]: self.log("Win Updates", f"{hit['count']} Recent Failures", "WARNING", f"Event 20{self._event_window(hit)}", action_item="Check Windows Update.")
+        else: self.log("Win Updates", "No Recent Failures", "PASS")
+
+    def probe_startup_apps(self):
+        counts = [self.collector.reg_subkey_count(p) for p in self.STARTUP_KEYS]
+        if None in counts: return
+        count = sum(counts)
+        status = "WARNING" if count > 10 else "PASS"
+        self.log("Startup Apps", f"{count} Apps", status, action_item="Disable unused startup apps.")
+
+    def probe_temp_files(self):
+        size = self.collector.temp_size(limit=self.TEMP_WARN_MB * 1024*1024)
+        if size is None: return
+        # Older fixtures store a plain byte count
+        if isinstance(size, dict) and size.get("bytes") is None:
+            self.log("Temp Files", "Unavailable", "INFO", f"{size.get('missing') or 'TEMP'} not found")
+            return
+        truncated = size.truncated if isinstance(size, dict) else False
+        total_size = (size.bytes if isinstance(size, dict) else size) / (1024*1024)
+        if truncated: self.log("Temp Files", f"Over {self.TEMP_WARN_MB} MB Found", "WARNING", action_item="Run Disk Cleanup.")
+        elif total_size > self.TEMP_WARN_MB: self.log("Temp Files", f"{total_size:.0f} MB Found", "WARNING", action_item="Run Disk Cleanup.")
+        else: self.log("Temp Files", f"{total_size:.0f} MB (Clean)", "PASS")
+
+    # ==========================
+    # MODULE 6: PERFORMANCE (Restored Power Plan)
+    # ==========================
+    def check_performance(self): self.run_module("performance")
+
+    def probe_cpu_load(self):
+        cpu = self.collector.cpu_percent(interval=1)
+        if cpu is None: return
+        self.log("CPU Load", f"{cpu}%", "PASS" if cpu < 90 else "FAIL")
+        
+    def probe_power_plan(self):
+        out = self.collector.command("power_plan")
+        if out is None: return
+        plan = out.split("(")[1].split(")")[0] if "(" in out else "Unknown"
+        self.log("Power Plan", plan, "INFO")
+
+    def probe_top_hog(self):
+        top = self.collector.top_processes(self.args.hog_interval, self.args.top_n)
+        if not top: return
+        self.top_processes = top
+        if top["cpu"]: self.log("Top Hog", f"{top['cpu'][0]['name']} ({top['cpu'][0]['cpu_percent']}%)", "INFO")
+        if top["rss"]: self.log("Top Memory", f"{top['rss'][0]['name']} ({top['rss'][0]['rss_mb']:.0f} MB)", "INFO")
+        if top["io"]: self.log("Top Disk I/O", f"{top['io'][0]['name']} ({top['io'][0]['io_mb_s']:.1f} MB/s)", "INFO")
+
+    def probe_bsod(self):
+        dumps = self.collector.minidump_count()
+        if dumps is None: return
+        if dumps > 0:
+            self.log("BSOD History", "Crashes Detected", "WARNING", action_item="Check Minidumps folder.")
+        else:
+            self.log("BSOD History", "Clean", "PASS")
+
+    # ==========================
+    # PARALLEL EXECUTION
+    # ==========================
+    def run_parallel(self, modules, progress, task_id):
+        """Run every probe of the selected modules on a daemon worker pool.
+
+        Output is replayed in probe-table order as soon as each prefix of the
+        table has finished, so log lines, stats and issues_found match a serial
+        run.  A probe that exceeds its timeout is abandoned (its thread is a
+        daemon, so it can't block exit) and reported as a WARNING instead.
+        """
+        from concurrent.futures import wait, FIRST_COMPLETED
+        slots = []
+        for module in modules:
+            slots.append(_ProbeSlot(module, self.SECTIONS[module], None, None))
+            for label, method, timeout in self.PROBES[module]:
+                slots.append(_ProbeSlot(module, label, method, timeout or self.args.probe_timeout))
+        jobs = queue.Queue()
+        for slot in slots:
+            if slot.method: jobs.put(slot)
+            else: slot.future.set_result(None)
+
+        def worker():
+            while True:
+                try: slot = jobs.get_nowait()
+                except queue.Empty: return
+                if not slot.future.set_running_or_notify_cancel(): continue
+                slot.started = time.monotonic()
+                slot.timing, clock = self.start_timing(slot.module, slot.label, slot.method)
+                self._local.buffer, self._local.timing = slot.buffer, slot.timing
+                error = None
+                try:
+                    getattr(self, slot.method)()
+                except BaseException as e:
+                    error = e
+                finally:
+                    self._local.buffer = self._local.timing = None
+                slot.finished = time.monotonic()
+                self.stop_timing(slot.timing, clock, error, findings=len(slot.buffer))
+                if error is None: slot.future.set_result(None)
+                else: slot.future.set_exception(error)
+
+        for _ in range(max(1, min(self.args.workers, jobs.qsize()))):
+            threading.Thread(target=worker, daemon=True, name="probe-worker").start()
+
+        pending = {s.future: s for s in slots if s.method}
+        flushed = 0
+        while pending:
+            started = [s.started + s.timeout for s in pending.values() if s.started is not None]
+            wait_for = max(0.0, min(started) - time.monotonic()) if started else 0.05
+            done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+            for fut in done:
+                pending.pop(fut)
+                if progress is not None: progress.advance(task_id)
+            now = time.monotonic()
+            for fut, slot in list(pending.items()):
+                if slot.started is not None and now - slot.started >= slot.timeout:
+                    slot.timed_out = True
+                    pending.pop(fut)
+                    if progress is not None: progress.advance(task_id)
+            flushed = self._flush_slots(slots, flushed)
+
+    def _flush_slots(self, slots, start):
+        i = start
+        while i < len(slots):
+            slot = slots[i]
+            if not (slot.timed_out or slot.future.done()): break
+            if slot.method is None:
+                self.section(slot.label)
+            elif slot.timed_out:
+                if slot.timing is not None:
+                    slot.timing.update(outcome="timeout", wall_ms=round(slot.timeout * 1000, 2), cpu_ms=None)
+                self.emit(datetime.datetime.now().astimezone(), slot.label, f"Timed out after {slot.timeout:g}s",
+                          "WARNING", action_item="Probe hung; rerun this module on its own.",
+                          module=slot.module, probe=slot.label, duration=slot.timeout)
+            else:
+                duration = slot.finished - slot.started
+                for record in slot.buffer: self.emit(*record, module=slot.module, probe=slot.label, duration=duration)
+                if slot.future.exception():
+                    self.emit(datetime.datetime.now().astimezone(), slot.label, "Probe crashed", "WARNING",
+                              str(slot.future.exception()), module=slot.module, probe=slot.label, duration=duration)
+            i += 1
+        return i
+
+    # ==========================
+    # REPORTING
+    # ==========================
+    def save_history(self, duration):
+        """Append this run to the SQLite history (v18_history) so trends survive FIX_SHEET being overwritten."""
+        path = getattr(self.args, "history", None)
+        if getattr(self.args, "no_history", False) or (path is None and self.collector.name == "fixture"): return
+        from v18_history import HistoryStore
+        try:
+            store = HistoryStore(path)
+            store.record_run(self.hostname, self.findings, self.stats, ts=self.findings[0]["ts"] if self.findings else None,
+                             duration_ms=round(duration * 1000, 1), backend=self.collector.name,
+                             modules=[m for m in self.MODULE_ORDER if self.modules[m]])
+            store.close()
+        except Exception as e:
+            self.console.print(f"[yellow]History not saved:[/yellow] {e}")
+
+    def save_report(self):
+        date_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        filename = f"FIX_SHEET_{self.hostname}.txt"
+        
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write("IT REPAIR CHECKLIST & DIAGNOSTIC REPORT\n")
+            f.write(f"Device: {self.hostname} | {date_str}\n")
+            f.write("="*60 + "\n\n")
+            
+            if self.specs:
+                f.write("DEVICE CONTEXT:\n")
+                for k,v in self.specs.items(): f.write(f" - {k}: {v}\n")
+                f.write("-" * 30 + "\n\n")
+            
+            if not self.issues_found:
+                f.write("STATUS: GREEN (HEALTHY)\n")
+                f.write("No actionable issues found. System is ready for use.\n")
+            else:
+                f.write(f"STATUS: RED ({len(self.issues_found)} ISSUES FOUND)\n")
+                f.write("Please perform the following repairs:\n\n")
+                
+                for idx, issue in enumerate(self.issues_found, 1):
+                    f.write(f"{idx}. [ ] ISSUE: {issue['category']} - {issue['error']}\n")
+                    if issue['detail']: f.write(f"       DETAIL: {issue['detail']}\n")
+                    f.write(f"       FIX:    {issue['fix']}\n")
+                    f.write("-" * 60 + "\n")
+            
+            if self.timings:
+                f.write("\nPROBE TIMINGS (slowest first):\n")
+                for t in self.slowest_probes(len(self.timings)):
+                    cpu = f"{t['cpu_ms']:>8.1f}" if t["cpu_ms"] is not None else f"{'-':>8}"
+                    f.write(f" - {t['probe']:<18} {t['wall_ms']:>9.1f} ms wall {cpu} ms cpu  {t['outcome']}"
+                            + (f"  ({t['exception']})" if t["exception"] else "") + "\n")
+
+            f.write("\nTechnician Signature: __________________________\n")
+        return filename
+
+    def execute(self, progress=None, task_id=None):
+        """Run the selected modules' probes. No summary, report or cache write."""
+        selected = [m for m in self.MODULE_ORDER if self.modules[m]]
+        self.collector.prepare([k for m in selected for k in self.POWERSHELL_KEYS.get(m, [])])
+        if progress is not None and task_id is None:
+            task_id = progress.add_task("Scanning...", total=sum(len(self.PROBES[m]) for m in selected))
+        if self.args.parallel:
+            self.run_parallel(selected, progress, task_id)
+        else:
+            for module in selected:
+                self.run_module(module, progress, task_id)
+
+    def result(self):
+        """Everything this run found, as plain data (used by fleet mode)."""
+        return {"host": self.hostname, "stats": dict(self.stats), "issues": list(self.issues_found),
+                "findings": list(self.findings), "specs": dict(self.specs), "top_processes": self.top_processes,
+                "timings": list(self.timings)}
+
+    def run(self):
+        if not any(self.modules.values()): return
+        started = time.perf_counter()
+        self.start_event([m for m in self.MODULE_ORDER if self.modules[m]])
+
+        if self.tui:
+            from rich.panel import Panel
+            from rich.align import Align
+            from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+            self.console.print(Panel(Align.center("[bold white]Running Diagnostics...[/]"), border_style="cyan", expand=True))
+            with Progress(SpinnerColumn(), TextColumn("[bold cyan]{task.description}"), BarColumn(), console=self.console) as progress:
+                self.execute(progress)
+        else:
+            self.execute()
+
+        if self.tui: self.render_summary()
+        self.finish(time.perf_counter() - started)
+
+    def start_event(self, modules, **extra):
+        if self.sink:
+            self.sink.write({"type": "run_start", "ts": datetime.datetime.now().astimezone().isoformat(timespec="milliseconds"),
+                             "host": self.hostname, "modules": modules, "backend": self.collector.name, **extra})
+
+    def watch(self):
+        """--watch: sliding-window performance monitoring, findings only on state change."""
+        from v18_watch import Watcher
+        self.start_event(["performance"], watch=True)
+        self.section(f"WATCH MODE (every {self.args.watch_interval:g}s, window {self.args.watch_window} samples, Ctrl+C to stop)")
+        watcher = Watcher(lambda cat, msg, status, detail, fix: self.log(cat, msg, status, detail, fix),
+                          interval=self.args.watch_interval, window=self.args.watch_window)
+        started = time.perf_counter()
+        watcher.run(self.args.watch_duration)
+        self.finish(time.perf_counter() - started)
+
+    def render_summary(self):
+        from rich.table import Table
+        from rich.panel import Panel
+        self.console.print("\n")
+        grid = Table.grid(expand=True)
+        cells = [
+            f"[bold green]PASS: {self.stats['PASS']}[/]",
+            f"[bold yellow]WARN: {self.stats['WARNING']}[/]",
+            f"[bold red]FAIL: {self.stats['FAIL']}[/]"
+        ]
+        if self.fact_cache:
+            cells.append(f"[bold cyan]CACHE: {self.fact_cache.hits} hit / {self.fact_cache.misses} miss[/]")
+        for _ in cells: grid.add_column(justify="center", ratio=1)
+        grid.add_row(*cells)
+        self.console.print(Panel(grid, border_style="grey50"))
+
+        if self.issues_found:
+            table = Table(title="ISSUES DETECTED", show_header=True, header_style="bold red", expand=True)
+            table.add_column("Category", style="cyan")
+            table.add_column("Error", style="white")
+            table.add_column("Recommended Fix", style="yellow")
+            for i in self.issues_found:
+                table.add_row(i['category'], i['error'], i['fix'])
+            self.console.print(table)
+        else:
+            self.console.print(Panel("[bold green]System Healthy - No Issues Found[/]", border_style="green"))
+
+        slowest = self.slowest_probes()
+        if slowest:
+            table = Table(title="SLOWEST PROBES", show_header=True, header_style="bold magenta", expand=True)
+            table.add_column("Probe", style="white")
+            table.add_column("Module", style="cyan")
+            table.add_column("Wall", justify="right")
+            table.add_column("CPU", justify="right")
+            table.add_column("Outcome")
+            table.add_column("Exception", style="dim")
+            styles = {"ok": "green", "no-data": "dim", "swallowed": "yellow", "crashed": "red", "timeout": "red"}
+            for t in slowest:
+                table.add_row(t["probe"], t["module"], f"{t['wall_ms']:.0f} ms", f"{t['cpu_ms']:.0f} ms" if t["cpu_ms"] is not None else "-",
+                              f"[{styles.get(t['outcome'], 'white')}]{t['outcome']}[/]", t["exception"] or "")
+            self.console.print(table)
+
+        if self.top_processes and self.top_processes["cpu"]:
+            top = self.top_processes
+            table = Table(title=f"TOP PROCESSES ({top['processes']} sampled)", show_header=True, header_style="bold cyan", expand=True)
+            table.add_column("By CPU", style="white")
+            table.add_column("By Memory (RSS)", style="white")
+            table.add_column("By Disk I/O", style="white")
+            for i in range(max(len(top["cpu"]), len(top["rss"]), len(top["io"]))):
+                table.add_row(
+                    f"{top['cpu'][i]['name']} ({top['cpu'][i]['cpu_percent']}%)" if i < len(top["cpu"]) else "",
+                    f"{top['rss'][i]['name']} ({top['rss'][i]['rss_mb']:.0f} MB)" if i < len(top["rss"]) else "",
+                    f"{top['io'][i]['name']} ({top['io'][i]['io_mb_s']:.1f} MB/s)" if i < len(top["io"]) else "")
+            self.console.print(table)
+
+    def finish(self, duration):
+        if self.fact_cache:
+            try:
+                self.fact_cache.save()
+                self.collector.dirsize_cache.save()
+                self.collector.event_bookmarks.save()
+            except OSError: pass
+        f = self.save_report()
+        self.console.print(f"\n[bold green]Report Saved:[/bold green] {f}")
+        self.save_history(duration)
+        if getattr(self.args, "record_fixture", None):
+            self.console.print(f"[bold green]Fixture Saved:[/bold green] {self.collector.save_fixture(self.args.record_fixture)}")
+        if self.sink:
+            self.sink.write({"type": "run_end", "ts": datetime.datetime.now().astimezone().isoformat(timespec="milliseconds"),
+                             "host": self.hostname, "stats": dict(self.stats), "issues": len(self.issues_found),
+                             "report": f, "duration_ms": round(duration * 1000, 1), "top_processes": self.top_processes,
+                             "probes": self.timings})
+            self.sink.close()
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    profiler = None
+    if arguments.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    tool = IT_Diagnostic_v18(arguments)
+    # Elevate only once we know what will run: identity/network/performance (and --watch, which
+    # only reads psutil counters) don't need admin
+    selected = [m for m in tool.MODULE_ORDER if tool.modules[m]]
+    if not arguments.watch and sys.platform == "win32" and tool.collector.name == "windows" and ADMIN_MODULES.intersection(selected) and not is_admin():
+        relaunch_elevated(selected)
+    if arguments.watch: tool.watch()
+    else: tool.run()
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(arguments.profile)
+        tool.console.print(f"[bold green]Profile Saved:[/bold green] {arguments.profile} (python -m pstats {arguments.profile})")
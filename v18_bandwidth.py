@@ -0,0 +1,121 @@
+import time
+import socket
+import threading
+
+from v18_netprobe import distribution
+
+# ==========================================
+# BUILT-IN SPEED TEST (client side)
+# ==========================================
+# Replaces the disabled speedtest-cli block in check_network. It talks to
+# simple_TCP_server_in_python.py on loopback or a LAN host instead of the
+# public internet:
+#   1. RTT     : `pings` small round trips on one TCP_NODELAY connection
+#   2. download: `streams` parallel connections, server streams for `duration`
+#   3. upload  : `streams` parallel connections, client streams for `duration`
+# Throughput is "sustained": bytes counted only after a warm-up (TCP slow
+# start, thread start-up), divided by the time actually measured.
+
+PORT = 9999
+GREETING_MAX = 256
+
+
+def parse_server(server, default_port=PORT):
+    host, _, port = server.rpartition(":") if server.count(":") == 1 else (server, None, None)
+    return (host, int(port)) if port else (server, default_port)
+
+
+def _connect(host, port, timeout):
+    sock = socket.create_connection((host, port), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    greeting = b""
+    while not greeting.endswith(b"\n") and len(greeting) < GREETING_MAX:
+        chunk = sock.recv(1)
+        if not chunk: raise ConnectionError("probe server closed the connection")
+        greeting += chunk
+    return sock
+
+
+def ping(host, port=PORT, count=20, timeout=3.0):
+    """Round-trip times in ms."""
+    times = []
+    with _connect(host, port, timeout) as sock:
+        sock.sendall(b"PING\n")
+        for i in range(count):
+            msg = i.to_bytes(8, "big")
+            start = time.perf_counter()
+            sock.sendall(msg)
+            got = b""
+            while len(got) < len(msg):
+                chunk = sock.recv(len(msg) - len(got))
+                if not chunk: raise ConnectionError("probe server closed the connection")
+                got += chunk
+            times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def _download(host, port, seconds, counters, i, timeout, errors):
+    buf = bytearray(1024 * 1024)
+    try:
+        with _connect(host, port, timeout) as sock:
+            sock.sendall(f"DOWNLOAD {seconds}\n".encode())
+            while True:
+                n = sock.recv_into(buf)
+                if not n: break
+                counters[i] += n
+    except OSError:
+        errors.append(i)
+
+
+def _upload(host, port, stop, counters, i, timeout, errors):
+    view = memoryview(bytes(256 * 1024))
+    try:
+        with _connect(host, port, timeout) as sock:
+            sock.sendall(b"UPLOAD\n")
+            while not stop.is_set():
+                counters[i] += sock.send(view)
+            sock.shutdown(socket.SHUT_WR)
+            sock.recv(64)  # server's byte count; we trust our own
+    except OSError:
+        errors.append(i)
+
+
+def throughput(host, port=PORT, direction="download", duration=5.0, streams=4, timeout=3.0, warmup=None):
+    """Sustained Mbit/s across `streams` parallel connections, or None if every stream failed."""
+    warmup = min(duration * 0.2, 1.0) if warmup is None else warmup
+    counters, errors, stop = [0] * streams, [], threading.Event()
+    if direction == "download":
+        jobs = [(_download, (host, port, duration, counters, i, timeout, errors)) for i in range(streams)]
+    else:
+        jobs = [(_upload, (host, port, stop, counters, i, timeout, errors)) for i in range(streams)]
+    threads = [threading.Thread(target=fn, args=a, daemon=True, name=f"speed-{direction}") for fn, a in jobs]
+    start = time.monotonic()
+    for t in threads: t.start()
+    time.sleep(warmup)
+    t0, b0 = time.monotonic(), sum(counters)
+    # Stop measuring a little before the server ends download streams
+    time.sleep(max(0.0, start + duration - time.monotonic() - 0.05))
+    t1, b1 = time.monotonic(), sum(counters)
+    stop.set()
+    for t in threads: t.join(timeout + 1)
+    if len(errors) == streams: return None
+    return (b1 - b0) * 8 / 1e6 / max(t1 - t0, 1e-6)
+
+
+def measure(server, duration=5.0, streams=4, pings=20, timeout=3.0):
+    """RTT distribution + sustained download/upload against a probe server ("host" or "host:port")."""
+    host, port = parse_server(server)
+    try: rtt = ping(host, port, pings, timeout)
+    except OSError: return {"server": f"{host}:{port}", "reachable": False}
+    return {
+        "server": f"{host}:{port}",
+        "reachable": True,
+        "rtt_ms": distribution(rtt, digits=3),  # loopback/LAN round trips are well under 1 ms
+        "download_mbps": _round(throughput(host, port, "download", duration, streams, timeout)),
+        "upload_mbps": _round(throughput(host, port, "upload", duration, streams, timeout)),
+        "streams": streams,
+        "duration": duration,
+    }
+
+
+def _round(mbps): return round(mbps, 1) if mbps is not None else None
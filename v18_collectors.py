@@ -0,0 +1,481 @@
+import os
+import sys
+import json
+import time
+import glob
+import base64
+import socket
+import platform
+import threading
+import subprocess
+
+# ==========================================
+# COLLECTOR LAYER FOR v18.py
+# ==========================================
+# The checks in v18.py never talk to the OS directly; they ask a Collector.
+# Every answer is snapshotted once per run (one collector = one run), so
+# Win32_ComputerSystem is fetched once even though identity and security
+# both read it, and every answer can be dumped to a JSON fixture and replayed
+# later on any OS (--record-fixture / --backend fixture).
+#
+# "None" always means "this backend can't answer" (skip the probe),
+# while [] / 0 / "" are real answers.
+
+DEFAULT_NS = r"root\cimv2"
+
+# All PowerShell probes run in ONE powershell.exe (see WindowsCollector._powershell_batch)
+# (event log probes moved to v18_eventlog: bookmarked, no PowerShell)
+POWERSHELL_PROBES = {
+    "disk_media": "Get-PhysicalDisk | Select-Object MediaType",
+    "bitlocker": "Get-BitLockerVolume -MountPoint C: | Select-Object -ExpandProperty ProtectionStatus",
+}
+
+# key -> (shell command, merge stderr into output)
+COMMANDS = {
+    "firewall": ("netsh advfirewall show allprofiles state", False),
+    "local_admins": ("net localgroup administrators", False),
+    "activation": (r"cscript //nologo %windir%\system32\slmgr.vbs /xpr", False),
+    "power_plan": ("powercfg /getactivescheme", False),
+    "nltest": ("nltest /sc_query:{0}", True),
+}
+
+
+class Record(dict):
+    """A WMI row as plain data: rec.Name and rec["Name"] both work, missing props are None."""
+    def __getattr__(self, name):
+        if name.startswith("__"): raise AttributeError(name)
+        return self.get(name)
+
+
+def wmi_key(cls, namespace=DEFAULT_NS, where=None):
+    key = cls if namespace == DEFAULT_NS else f"{namespace}\\{cls}"
+    return f"{key}|{where}" if where else key
+
+
+class _Snapshot:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.value = None
+
+
+class Collector:
+    name = "base"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self.fact_cache = None
+        self.dirsize_cache = None  # v18_dirsize.DirSizeCache for incremental temp scans
+        self.event_bookmarks = None  # v18_eventlog.EventBookmarks; None = scan the whole window every run
+        self.event_source = None  # v18_eventlog source overriding the backend's own (--event-file)
+        self.recorded = {"hostname": self.hostname()}
+
+    # -------- snapshot + record plumbing --------
+    def _snapshot(self, section, key, fetch):
+        with self._lock:
+            snap = self._snapshots.get((section, key))
+            if snap is None: snap = self._snapshots[(section, key)] = _Snapshot()
+        # Per-key lock: parallel probes asking for the same thing wait for one fetch
+        with snap.lock:
+            if not snap.loaded:
+                snap.value = self._fetch_cached(section, key, fetch)
+                snap.loaded = True
+                if not key.startswith("__"):
+                    with self._lock:
+                        self.recorded.setdefault(section, {})[key] = snap.value
+        return snap.value
+
+    def _fetch_cached(self, section, key, fetch):
+        cache = self.fact_cache
+        if cache is not None and cache.covers(section, key):
+            hit, value = cache.get(section, key)
+            if hit: return value
+        try: value = fetch()
+        except Exception: value = None
+        if cache is not None and cache.covers(section, key): cache.put(section, key, value)
+        return value
+
+    def save_fixture(self, path):
+        boot = self.recorded.get("psutil", {}).get("boot_time")
+        if boot is not None: self.recorded["psutil"]["uptime"] = time.time() - boot
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.recorded, f, indent=2, default=str)
+        return path
+
+    def prepare(self, powershell_keys=None):
+        """Tell the backend which batched probes this run needs (default: all)."""
+        self.powershell_keys = list(powershell_keys) if powershell_keys is not None else list(POWERSHELL_PROBES)
+
+    # -------- public API used by the checks --------
+    def hostname(self): return platform.node()
+
+    def wmi(self, cls, namespace=DEFAULT_NS, where=None):
+        return self._snapshot("wmi", wmi_key(cls, namespace, where), lambda: self._wmi(cls, namespace, where))
+
+    def powershell(self, key):
+        return self._snapshot("powershell", key, lambda: self._powershell(key))
+
+    def command(self, key, *args):
+        return self._snapshot("commands", " ".join((key,) + args), lambda: self._command(key, *args))
+
+    def reg_value(self, path, name):
+        return self._snapshot("registry", f"{path}|{name}", lambda: self._reg_value(path, name))
+
+    def reg_subkey_count(self, path):
+        """Number of subkeys under HKLM\\path (QueryInfoKey()[0]), or None if the key doesn't exist / can't be read."""
+        return self._snapshot("registry_keys", path, lambda: self._reg_subkey_count(path))
+
+    def reg_key_exists(self, path):
+        """True/False for whether HKLM\\path exists, or None if the backend can't tell."""
+        return self._snapshot("registry_exists", path, lambda: self._reg_key_exists(path))
+
+    def boot_time(self): return self._snapshot("psutil", "boot_time", self._boot_time)
+    def cpu_percent(self, interval=1): return self._snapshot("psutil", f"cpu_percent:{interval}", lambda: self._cpu_percent(interval))
+    def virtual_memory(self): return self._snapshot("psutil", "virtual_memory", self._virtual_memory)
+    def listening_ports(self): return self._snapshot("psutil", "listening_ports", self._listening_ports)
+    def top_processes(self, interval=1.0, top_n=5):
+        return self._snapshot("psutil", "top_processes", lambda: self._top_processes(interval, top_n))
+    def temp_size(self, limit=None):
+        """Bytes under %TEMP%: an int, or Record(bytes, truncated); bytes is None (and `missing` the path) if %TEMP% doesn't exist."""
+        return self._snapshot("files", "temp_size", lambda: self._temp_size(limit))
+    def minidump_count(self): return self._snapshot("files", "minidump_count", self._minidump_count)
+    def event_counts(self):
+        """v18_eventlog.scan() result: rolling-window hit counts per event rule, reading only new events."""
+        return self._snapshot("eventlog", "counts", self._event_counts)
+    def network_report(self, dns_targets=None, http_targets=None, samples=5):
+        """v18_netprobe latency report: DNS + HTTP endpoints + public IP, measured concurrently once per run."""
+        return self._snapshot("network", "report", lambda: self._network_report(dns_targets, http_targets, samples))
+    def bandwidth(self, server, duration=5.0, streams=4):
+        """v18_bandwidth result against a probe server (simple_TCP_server_in_python.py), or None without one."""
+        return self._snapshot("network", "bandwidth", lambda: self._bandwidth(server, duration, streams))
+    def resolve(self, name):
+        return self._snapshot("network", f"resolve:{name}", lambda: self._from_report("dns", name, "address") or self._resolve(name))
+    def public_ip(self):
+        return self._snapshot("network", "public_ip", lambda: self._from_report("public_ip") or self._public_ip())
+
+    def _from_report(self, *path):
+        """Reuse an already-fetched network report instead of going back to the network."""
+        snap = self._snapshots.get(("network", "report"))
+        value = snap.value if snap is not None and snap.loaded else None
+        for key in path:
+            if not isinstance(value, dict): return None
+            value = value.get(key)
+        return value
+
+    # -------- backend hooks (default: can't answer) --------
+    def _wmi(self, cls, namespace, where): return None
+    def _powershell(self, key): return None
+    def _command(self, key, *args): return None
+    def _reg_value(self, path, name): return None
+    def _reg_subkey_count(self, path): return None
+    def _reg_key_exists(self, path): return None
+    def _boot_time(self): return None
+    def _cpu_percent(self, interval): return None
+    def _virtual_memory(self): return None
+    def _listening_ports(self): return None
+    def _top_processes(self, interval, top_n): return None
+    def _temp_size(self, limit): return None
+    def _minidump_count(self): return None
+
+    def _event_source(self): return None
+
+    def _event_counts(self):
+        source = self.event_source or self._event_source()
+        if source is None: return None
+        from v18_eventlog import scan, EventBookmarks
+        return scan(source, self.event_bookmarks or EventBookmarks(), self.hostname())
+
+    def _resolve(self, name):
+        try: return socket.gethostbyname(name)
+        except OSError: return None
+
+    def _public_ip(self):
+        import requests
+        try: return requests.get('http://ip-api.com/json', timeout=2).json()
+        except Exception: return None
+
+    def _bandwidth(self, server, duration, streams):
+        if not server: return None
+        from v18_bandwidth import measure
+        return measure(server, duration, streams)
+
+    def _network_report(self, dns_targets, http_targets, samples):
+        import v18_netprobe
+        return v18_netprobe.run(dns_targets=dns_targets or v18_netprobe.DNS_TARGETS,
+                                http_targets=http_targets or v18_netprobe.HTTP_TARGETS, samples=samples)
+
+
+class _PsutilMixin:
+    """psutil-backed answers shared by the Windows and Linux backends."""
+    def _boot_time(self):
+        import psutil
+        return psutil.boot_time()
+
+    def _cpu_percent(self, interval):
+        import psutil
+        return psutil.cpu_percent(interval=interval)
+
+    def _virtual_memory(self):
+        import psutil
+        vm = psutil.virtual_memory()
+        return Record(percent=vm.percent, total=vm.total)
+
+    def _listening_ports(self):
+        import psutil
+        return sorted({c.laddr.port for c in psutil.net_connections(kind='inet') if c.status == 'LISTEN'})
+
+    def _top_processes(self, interval, top_n):
+        from v18_procrank import top_processes
+        return top_processes(interval, top_n)
+
+    def _temp_size(self, limit):
+        from v18_dirsize import dir_size
+        temp_path = os.environ.get('TEMP') or os.environ.get('TMPDIR') or "/tmp"
+        if not os.path.isdir(temp_path): return Record(bytes=None, truncated=False, missing=temp_path)
+        res = dir_size(temp_path, limit=limit, cache=self.dirsize_cache)
+        return Record(bytes=res.bytes, truncated=res.truncated)
+
+
+class WindowsCollector(_PsutilMixin, Collector):
+    name = "windows"
+
+    def __init__(self):
+        super().__init__()
+        import winreg
+        self._winreg = winreg
+        self._local = threading.local()
+
+    def _conn(self, namespace):
+        # COM objects live in the thread (apartment) that made them, so each
+        # worker thread initialises COM and opens its own connections.
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            try:
+                import pythoncom
+                pythoncom.CoInitialize()
+            except Exception: pass
+            conns = self._local.conns = {}
+        if namespace not in conns:
+            import wmi
+            try: conns[namespace] = wmi.WMI(namespace=namespace)
+            except Exception: conns[namespace] = None
+        return conns[namespace]
+
+    def _wmi(self, cls, namespace, where):
+        conn = self._conn(namespace)
+        if conn is None: return None
+        rows = conn.query(f"SELECT * FROM {cls}" + (f" WHERE {where}" if where else ""))
+        return [Record({p: getattr(row, p, None) for p in row.properties}) for row in rows]
+
+    def _powershell(self, key):
+        batch = self._snapshot("powershell", "__batch__", self._powershell_batch)
+        return None if batch is None else batch.get(key)
+
+    def _powershell_batch(self):
+        keys = getattr(self, "powershell_keys", list(POWERSHELL_PROBES))
+        if self.fact_cache is not None:
+            keys = [k for k in keys if not self.fact_cache.fresh("powershell", k)]
+        lines = ["$ProgressPreference = 'SilentlyContinue'", "$r = @{}"]
+        for key in keys:
+            lines.append(f"try {{ $r['{key}'] = (& {{ {POWERSHELL_PROBES[key]} }} | Out-String).Trim() }} catch {{ $r['{key}'] = $null }}")
+        lines.append("$r | ConvertTo-Json -Compress")
+        encoded = base64.b64encode("\n".join(lines).encode("utf-16-le")).decode()
+        out = subprocess.check_output(["powershell", "-NoProfile", "-NonInteractive", "-EncodedCommand", encoded],
+                                      stderr=subprocess.DEVNULL).decode(errors="replace")
+        return json.loads(out)
+
+    def _command(self, key, *args):
+        cmd, merge = COMMANDS[key]
+        try:
+            return subprocess.check_output(cmd.format(*args), shell=True,
+                                           stderr=subprocess.STDOUT if merge else subprocess.DEVNULL).decode(errors="replace")
+        except subprocess.CalledProcessError: return None
+
+    def _reg_value(self, path, name):
+        try:
+            with self._winreg.OpenKey(self._winreg.HKEY_LOCAL_MACHINE, path) as key:
+                return self._winreg.QueryValueEx(key, name)[0]
+        except OSError: return None
+
+    def _reg_subkey_count(self, path):
+        try:
+            with self._winreg.OpenKey(self._winreg.HKEY_LOCAL_MACHINE, path) as key:
+                return self._winreg.QueryInfoKey(key)[0]
+        except OSError: return None
+
+    def _reg_key_exists(self, path):
+        try:
+            with self._winreg.OpenKey(self._winreg.HKEY_LOCAL_MACHINE, path): return True
+        except FileNotFoundError: return False
+        except OSError: return None  # access denied etc.: can't tell
+
+    def _event_source(self):
+        from v18_eventlog import WindowsEventSource
+        return WindowsEventSource()
+
+    def _minidump_count(self):
+        dump_path = os.path.expandvars(r"%SystemRoot%\Minidump")
+        return len(os.listdir(dump_path)) if os.path.exists(dump_path) else 0
+
+
+def _read(path, default=None):
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f: return f.read().strip()
+    except OSError: return default
+
+
+class LinuxCollector(_PsutilMixin, Collector):
+    """Answers the WMI questions from psutil, /proc and /sys so the diagnostic runs on Linux."""
+    name = "linux"
+
+    def _wmi(self, cls, namespace, where):
+        fetch = getattr(self, f"_linux_{cls}", None)
+        return fetch(where) if fetch else None
+
+    def _linux_Win32_OperatingSystem(self, where):
+        caption = f"{platform.system()} {platform.release()}"
+        for line in (_read("/etc/os-release", "") or "").splitlines():
+            if line.startswith("PRETTY_NAME="): caption = line.split("=", 1)[1].strip('"')
+        return [Record(Caption=caption, BuildNumber=platform.release())]
+
+    def _linux_Win32_ComputerSystem(self, where):
+        return [Record(Manufacturer=_read("/sys/class/dmi/id/sys_vendor", "Unknown"),
+                       Model=_read("/sys/class/dmi/id/product_name", "Unknown"),
+                       PartOfDomain=False, Domain="WORKGROUP")]
+
+    def _linux_Win32_BIOS(self, where):
+        return [Record(SerialNumber=_read("/sys/class/dmi/id/product_serial", "Unknown"))]
+
+    def _linux_Win32_Processor(self, where):
+        import psutil
+        name = platform.processor() or "Unknown"
+        for line in (_read("/proc/cpuinfo", "") or "").splitlines():
+            if line.startswith("model name"):
+                name = line.split(":", 1)[1]
+                break
+        return [Record(Name=name, NumberOfCores=psutil.cpu_count(logical=False), NumberOfLogicalProcessors=psutil.cpu_count())]
+
+    def _linux_Win32_VideoController(self, where):
+        gpus = []
+        for dev in sorted(glob.glob("/sys/class/drm/card[0-9]/device")):
+            driver = os.path.basename(os.path.realpath(os.path.join(dev, "driver"))) if os.path.exists(os.path.join(dev, "driver")) else "Unknown"
+            gpus.append(Record(Name=driver, AdapterRAM=None))
+        return gpus
+
+    def _linux_Win32_PhysicalMemory(self, where):
+        import psutil
+        # /proc doesn't expose DIMMs without root (dmidecode); report one logical bank
+        return [Record(Capacity=psutil.virtual_memory().total, Speed="?", Manufacturer="")]
+
+    def _linux_Win32_Battery(self, where):
+        import psutil
+        b = psutil.sensors_battery() if hasattr(psutil, "sensors_battery") else None
+        if b is None: return []
+        return [Record(EstimatedChargeRemaining=int(b.percent), BatteryStatus=2 if b.power_plugged else 1)]
+
+    def _linux_Win32_PnPEntity(self, where): return []
+    def _linux_Win32_Printer(self, where): return []
+
+    def _linux_Win32_Tpm(self, where):
+        return [Record(Name="tpm0")] if os.path.exists("/sys/class/tpm/tpm0") else []
+
+    def _linux_Win32_DiskDrive(self, where):
+        disks = []
+        for block in sorted(glob.glob("/sys/block/*")):
+            name = os.path.basename(block)
+            if name.startswith(("loop", "ram", "zram", "dm-")): continue
+            disks.append(Record(Caption=_read(os.path.join(block, "device/model"), name), Status="OK"))
+        return disks
+
+    def _linux_Win32_NetworkAdapterConfiguration(self, where):
+        import psutil
+        gateways = {}
+        for line in (_read("/proc/net/route", "") or "").splitlines()[1:]:
+            parts = line.split()
+            if len(parts) > 2 and parts[1] == "00000000":
+                gateways[parts[0]] = socket.inet_ntoa(bytes.fromhex(parts[2])[::-1])
+        adapters = []
+        for name, addrs in psutil.net_if_addrs().items():
+            ips = tuple(a.address for a in addrs if a.family == socket.AF_INET)
+            if not ips or name == "lo": continue
+            adapters.append(Record(Description=name, IPAddress=ips,
+                                   DefaultIPGateway=(gateways[name],) if name in gateways else None))
+        return adapters
+
+    def _powershell(self, key):
+        if key == "disk_media":
+            kinds = {_read(os.path.join(b, "queue/rotational")) for b in glob.glob("/sys/block/*")
+                     if not os.path.basename(b).startswith(("loop", "ram", "zram", "dm-"))}
+            return "\n".join(["HDD" if k == "1" else "SSD" for k in sorted(kinds - {None})])
+        return None
+
+    def _minidump_count(self):
+        return len(glob.glob("/var/crash/*"))
+
+
+class FixtureCollector(Collector):
+    """Replays a JSON fixture written by --record-fixture (or by hand). Nothing touches the OS."""
+    name = "fixture"
+
+    def __init__(self, data):
+        self.data = data
+        super().__init__()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f: return cls(json.load(f))
+
+    def _get(self, section, key):
+        value = self.data.get(section, {}).get(key)
+        if isinstance(value, list): return [Record(v) if isinstance(v, dict) else v for v in value]
+        if isinstance(value, dict): return Record(value)
+        return value
+
+    def hostname(self): return self.data.get("hostname", "fixture-host")
+    def _wmi(self, cls, namespace, where): return self._get("wmi", wmi_key(cls, namespace, where))
+    def _powershell(self, key): return self._get("powershell", key)
+    def _command(self, key, *args): return self._get("commands", " ".join((key,) + args))
+    def _reg_value(self, path, name): return self._get("registry", f"{path}|{name}")
+    def _reg_subkey_count(self, path): return self._get("registry_keys", path)
+    def _reg_key_exists(self, path): return self._get("registry_exists", path)
+    def _boot_time(self):
+        # Fixtures store uptime so replays don't drift as the fixture file ages
+        uptime = self._get("psutil", "uptime")
+        return time.time() - uptime if uptime is not None else self._get("psutil", "boot_time")
+    def _cpu_percent(self, interval): return self._get("psutil", f"cpu_percent:{interval}")
+    def _virtual_memory(self): return self._get("psutil", "virtual_memory")
+    def _listening_ports(self): return self._get("psutil", "listening_ports")
+    def _top_processes(self, interval, top_n):
+        top = self._get("psutil", "top_processes")
+        legacy = self._get("psutil", "processes")
+        if top is None and legacy is not None:
+            # Older fixtures: a bare [{"name", "cpu_percent"}] list
+            ranked = sorted(legacy, key=lambda p: p["cpu_percent"] or 0, reverse=True)[:top_n]
+            top = Record(cpu=[{"pid": None, "name": p["name"], "cpu_percent": p["cpu_percent"]} for p in ranked],
+                         rss=[], io=[], processes=len(legacy), interval=None)
+        return top
+    def _temp_size(self, limit): return self._get("files", "temp_size")
+    def _minidump_count(self): return self._get("files", "minidump_count")
+    def _event_source(self):
+        from v18_eventlog import FileEventSource
+        return FileEventSource(self.data["events"]) if "events" in self.data else None
+    def _event_counts(self):
+        if self.event_source or "events" in self.data: return super()._event_counts()
+        from v18_eventlog import counts_from_legacy
+        recorded = self._get("eventlog", "counts")
+        return recorded if recorded is not None else counts_from_legacy(self.data.get("powershell", {}))
+    def _resolve(self, name): return self._get("network", f"resolve:{name}")
+    def _public_ip(self): return self._get("network", "public_ip")
+    def _network_report(self, dns_targets, http_targets, samples): return self._get("network", "report")
+    def _bandwidth(self, server, duration, streams): return self._get("network", "bandwidth")
+
+
+def make_collector(backend="auto", fixture=None):
+    if backend == "fixture" or (backend == "auto" and fixture):
+        if not fixture: raise SystemExit("--backend fixture needs --fixture PATH")
+        return FixtureCollector.load(fixture)
+    if backend == "auto": backend = "windows" if sys.platform == "win32" else "linux"
+    if backend == "windows": return WindowsCollector()
+    if backend == "linux": return LinuxCollector()
+    raise SystemExit(f"Unknown backend: {backend}")
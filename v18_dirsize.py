@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import stat
+import threading
+
+# ==========================================
+# DIRECTORY SIZING ENGINE (Temp Files probe)
+# ==========================================
+# os.walk + os.path.getsize costs one extra stat() per file. os.scandir hands
+# back DirEntry objects whose stat() is already filled in from the directory
+# listing on Windows (FindFirstFile data), so a file costs no extra syscall.
+#
+# - subtrees are scanned on a thread pool (scandir releases the GIL)
+# - once `limit` bytes are counted the walk stops: we only need to know the
+#   1 GB warning threshold was crossed, not by how much
+# - DirSizeCache remembers each directory's direct file bytes + subdir names
+#   keyed by the directory's mtime; an unchanged directory is not listed again.
+#   A directory's mtime only moves when entries are added/removed/renamed, so
+#   a file growing in place is missed until the entry ages out (max_age).
+#   After a complete walk, entries under the root that the walk never reached
+#   (deleted directories) are pruned so the cache doesn't grow forever.
+
+
+class DirSizeResult:
+    def __init__(self):
+        self.bytes = 0
+        self.files = 0
+        self.dirs = 0
+        self.errors = 0
+        self.cached_dirs = 0
+        self.truncated = False  # stopped early at `limit`; bytes is a lower bound
+        self.pruned = 0  # stale cache entries dropped after the walk
+
+    def __repr__(self):
+        return (f"DirSizeResult(bytes={self.bytes}, files={self.files}, dirs={self.dirs}, "
+                f"cached_dirs={self.cached_dirs}, errors={self.errors}, truncated={self.truncated}, pruned={self.pruned})")
+
+
+class DirSizeCache:
+    def __init__(self, path=None, max_age=24 * 3600):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.entries = {}
+        self._seen = set()  # directories looked up or stored since load
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f: self.entries = json.load(f)
+            except (OSError, ValueError): self.entries = {}
+
+    def lookup(self, dirpath, mtime_ns):
+        with self._lock: self._seen.add(dirpath)
+        entry = self.entries.get(dirpath)
+        if entry and entry["mtime_ns"] == mtime_ns and time.time() - entry["scanned"] < self.max_age:
+            return entry
+        return None
+
+    def store(self, dirpath, mtime_ns, file_bytes, files, subdirs):
+        with self._lock:
+            self.entries[dirpath] = {"mtime_ns": mtime_ns, "scanned": time.time(),
+                                     "bytes": file_bytes, "files": files, "subdirs": subdirs}
+
+    def prune(self, root):
+        """Drop entries under `root` not seen since load; only valid after a walk that reached every directory."""
+        prefix = os.path.join(root, "")
+        with self._lock:
+            stale = [p for p in self.entries if (p == root or p.startswith(prefix)) and p not in self._seen]
+            for p in stale: del self.entries[p]
+        return len(stale)
+
+    def save(self):
+        if not self.path: return None
+        tmp = f"{self.path}.tmp"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f: json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+        return self.path
+
+
+def _scan_one(dirpath, cache):
+    """(direct file bytes, file count, [subdir paths], from_cache) for one directory."""
+    mtime_ns = None
+    if cache is not None:
+        try: mtime_ns = os.stat(dirpath).st_mtime_ns
+        except OSError: mtime_ns = None
+        entry = cache.lookup(dirpath, mtime_ns) if mtime_ns is not None else None
+        if entry:
+            return entry["bytes"], entry["files"], [os.path.join(dirpath, d) for d in entry["subdirs"]], True
+
+    file_bytes = files = 0
+    subdirs = []
+    with os.scandir(dirpath) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                file_bytes += st.st_size
+                files += 1
+    if cache is not None and mtime_ns is not None:
+        cache.store(dirpath, mtime_ns, file_bytes, files, subdirs)
+    return file_bytes, files, [os.path.join(dirpath, d) for d in subdirs], False
+
+
+def dir_size(root, limit=None, workers=8, cache=None):
+    """Total size of regular files under `root` (symlinks not followed). Stops early once `limit` bytes are seen."""
+    result = DirSizeResult()
+    lock = threading.Lock()
+
+    def scan(dirpath):
+        try: file_bytes, files, subdirs, cached = _scan_one(dirpath, cache)
+        except OSError:
+            with lock: result.errors += 1
+            return []
+        with lock:
+            result.bytes += file_bytes
+            result.files += files
+            result.dirs += 1
+            result.cached_dirs += cached
+            if limit is not None and result.bytes >= limit: result.truncated = True
+        return subdirs
+
+    if workers <= 1:
+        stack = [root]
+        while stack and not result.truncated:
+            stack.extend(scan(stack.pop()))
+    else:
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED  # only the software module gets here
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dirsize") as pool:
+            pending = {pool.submit(scan, root)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                if result.truncated:
+                    for fut in pending: fut.cancel()
+                    break
+                for fut in done:
+                    for sub in fut.result(): pending.add(pool.submit(scan, sub))
+    # A truncated walk skipped live directories, so only a full one may prune
+    if cache is not None and not result.truncated: result.pruned = cache.prune(root)
+    return result
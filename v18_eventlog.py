@@ -0,0 +1,204 @@
+import os
+import json
+import bisect
+import time
+import datetime
+import threading
+from abc import ABC, abstractmethod
+
+# ==========================================
+# INCREMENTAL EVENT LOG SCANNING FOR v18.py
+# ==========================================
+# Bad Sectors (disk Event 7) and Win Updates (WindowsUpdateClient Event 20)
+# used to re-read the newest 200 / 20 events through PowerShell on every run:
+# slow, and anything that scrolled past that window was never seen.
+#
+# Instead each log keeps a bookmark (last EventRecordID read). A run reads
+# only events newer than it, ONE pass per log with every rule for that log
+# evaluated against each event, and appends matches to per-rule hit lists
+# that are pruned to the rule's rolling window. The first run (or a cleared
+# log) reads the whole window once.
+#
+# Sources are pluggable:
+#   WindowsEventSource : win32evtlog (pywin32, already installed with wmi), in-process
+#   FileEventSource    : {"System": [{record_id, id, provider, time|ago, message}, ...]}
+#                        from a JSON file or a fixture; "ago" = seconds before now
+
+RULES = {
+    "bad_sectors": {"log": "System", "provider": "disk", "ids": [7], "window_days": 30},
+    "update_failures": {"log": "System", "provider": "Microsoft-Windows-WindowsUpdateClient", "ids": [20], "window_days": 30},
+}
+MAX_HITS = 1000  # per rule; the count is what matters, not every timestamp
+
+
+def matches(rule, event):
+    return event["id"] in rule["ids"] and (rule["provider"] is None or (event.get("provider") or "").lower() == rule["provider"].lower())
+
+
+def _parse_time(value):
+    if isinstance(value, (int, float)): return float(value)
+    # EvtRender gives 7 fractional digits + "Z"; fromisoformat wants at most 6
+    value = value.replace("Z", "+00:00")
+    if "." in value:
+        head, _, tail = value.partition(".")
+        frac = "".join(ch for ch in tail if ch.isdigit())
+        value = f"{head}.{frac[:6]}{tail[len(frac):]}"
+    ts = datetime.datetime.fromisoformat(value)
+    if ts.tzinfo is None: ts = ts.astimezone()
+    return ts.timestamp()
+
+
+# -------- sources --------
+class EventSource(ABC):
+    def latest_record_id(self, log):
+        """Newest EventRecordID in the log (None if unknown); lower than our bookmark means the log was cleared."""
+        return None
+
+    @abstractmethod
+    def read(self, log, after=None, since=None, ids=None):
+        """Events oldest first with record_id > `after` (or time >= `since` when there's no bookmark)."""
+
+
+class FileEventSource(EventSource):
+    def __init__(self, logs, now=None):
+        now = time.time() if now is None else now
+        self.logs = {}
+        for log, events in logs.items():
+            self.logs[log] = sorted(
+                ({**e, "time": now - e["ago"] if "ago" in e else _parse_time(e["time"])} for e in events),
+                key=lambda e: e["record_id"])
+        self._ids = {log: [e["record_id"] for e in events] for log, events in self.logs.items()}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f: return cls(json.load(f))
+
+    def latest_record_id(self, log):
+        events = self.logs.get(log)
+        return events[-1]["record_id"] if events else None
+
+    def read(self, log, after=None, since=None, ids=None):
+        events = self.logs.get(log, [])
+        # Seek past the bookmark like EventRecordID > n does in the service, instead of walking the whole log
+        start = bisect.bisect_right(self._ids[log], after) if after is not None else 0
+        for i in range(start, len(events)):
+            e = events[i]
+            if after is None and since is not None and e["time"] < since: continue
+            if ids and e["id"] not in ids: continue
+            yield e
+
+
+class WindowsEventSource(EventSource):
+    """Reads through the Windows Event Log API; the XPath filter does the id/bookmark work in the service."""
+    BATCH = 256
+
+    def __init__(self):
+        import win32evtlog
+        self.api = win32evtlog
+
+    def latest_record_id(self, log):
+        api = self.api
+        h = api.EvtQuery(log, api.EvtQueryChannelPath | api.EvtQueryReverseDirection, "*")
+        newest = api.EvtNext(h, 1)
+        return self._parse(api.EvtRender(newest[0], api.EvtRenderEventXml))["record_id"] if newest else None
+
+    def read(self, log, after=None, since=None, ids=None):
+        api = self.api
+        conds = []
+        if ids: conds.append("(" + " or ".join(f"EventID={i}" for i in ids) + ")")
+        if after is not None: conds.append(f"EventRecordID > {after}")
+        elif since is not None: conds.append(f"TimeCreated[timediff(@SystemTime) <= {int((time.time() - since) * 1000)}]")
+        query = f"*[System[{' and '.join(conds)}]]" if conds else "*"
+        h = api.EvtQuery(log, api.EvtQueryChannelPath | api.EvtQueryForwardDirection, query)
+        while True:
+            batch = api.EvtNext(h, self.BATCH)
+            if not batch: return
+            for handle in batch: yield self._parse(api.EvtRender(handle, api.EvtRenderEventXml))
+
+    @staticmethod
+    def _parse(text):
+        import xml.etree.ElementTree as ET
+        ns = {"e": "http://schemas.microsoft.com/win/2004/08/events/event"}
+        system = ET.fromstring(text).find("e:System", ns)
+        return {
+            "record_id": int(system.findtext("e:EventRecordID", namespaces=ns)),
+            "id": int(system.findtext("e:EventID", namespaces=ns)),
+            "provider": system.find("e:Provider", ns).get("Name"),
+            "time": _parse_time(system.find("e:TimeCreated", ns).get("SystemTime")),
+            "message": "",
+        }
+
+
+# -------- bookmarks --------
+class EventBookmarks:
+    """{host: {"logs": {log: {"record_id", "scanned"}}, "hits": {rule: [event times]}}} in a JSON file (path None = memory only)."""
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._all = {}
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f: self._all = json.load(f)
+            except (OSError, ValueError): self._all = {}
+
+    def state(self, host):
+        with self._lock:
+            return self._all.setdefault(host, {"logs": {}, "hits": {}})
+
+    def save(self):
+        if not self.path: return None
+        tmp = f"{self.path}.tmp"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._all, f, indent=1)
+        os.replace(tmp, self.path)
+        return self.path
+
+
+# -------- scanner --------
+def scan(source, bookmarks, host, rules=RULES, now=None):
+    """{rule: {"count", "new", "last", "window_days", "scanned"}} after reading only what's new in each log."""
+    now = time.time() if now is None else now
+    state = bookmarks.state(host)
+    by_log = {}
+    for name, rule in rules.items(): by_log.setdefault(rule["log"], []).append(name)
+    new = {name: 0 for name in rules}
+    scanned = {}
+
+    for log, names in by_log.items():
+        mark = state["logs"].get(log)
+        latest = source.latest_record_id(log)
+        if mark and latest is not None and latest < mark["record_id"]:
+            mark = None  # log cleared or wrapped: record ids started over
+        window = max(rules[n]["window_days"] for n in names) * 86400
+        after = mark["record_id"] if mark else None
+        last_id, count = after, 0
+        ids = sorted({i for n in names for i in rules[n]["ids"]})
+        for event in source.read(log, after=after, since=None if mark else now - window, ids=ids):
+            count += 1
+            last_id = event["record_id"] if last_id is None else max(last_id, event["record_id"])
+            for name in names:
+                if matches(rules[name], event):
+                    state["hits"].setdefault(name, []).append(event["time"])
+                    new[name] += 1
+        marks = [x for x in (last_id, latest) if x is not None]
+        if marks: state["logs"][log] = {"record_id": max(marks), "scanned": now}
+        scanned[log] = count
+
+    results = {}
+    for name, rule in rules.items():
+        cutoff = now - rule["window_days"] * 86400
+        hits = sorted(t for t in state["hits"].get(name, []) if t >= cutoff)[-MAX_HITS:]
+        state["hits"][name] = hits
+        results[name] = {"count": len(hits), "new": new[name], "last": hits[-1] if hits else None,
+                         "window_days": rule["window_days"], "scanned": scanned[rule["log"]]}
+    return results
+
+
+def counts_from_legacy(powershell):
+    """Fixtures recorded before event scanning stored the raw PowerShell output instead."""
+    if "bad_sectors" not in powershell and "update_failures" not in powershell: return None
+    def entry(n): return {"count": n, "new": n, "last": None, "window_days": None, "scanned": None}
+    failures = powershell.get("update_failures")
+    return {"bad_sectors": entry(1 if powershell.get("bad_sectors") else 0),
+            "update_failures": entry(int(failures) if failures and str(failures).isdigit() else 0)}
@@ -0,0 +1,73 @@
+import sys
+import json
+from abc import ABC, abstractmethod
+
+# ==========================================
+# STRUCTURED EVENT OUTPUT FOR v18.py
+# ==========================================
+# Every finding IT_Diagnostic_v18.emit() produces is also handed to a sink as
+# a plain dict:
+#   {"type": "finding", "ts": ISO-8601, "host", "module", "probe",
+#    "category", "status", "message", "detail", "fix", "duration_ms"}
+# plus one "run_start" and one "run_end" (with stats) event.
+#
+# ndjson : one line per event, flushed immediately (survives a crash mid-run)
+# json   : one document {"run": ..., "events": [...], "summary": ...} at close
+# text   : plain "HH:MM:SS | STATUS | Category | message" lines, no rich
+
+
+class EventSink(ABC):
+    def __init__(self, stream, owns_stream=False):
+        self.stream = stream
+        self.owns_stream = owns_stream
+
+    @abstractmethod
+    def write(self, event): ...
+
+    def close(self):
+        self.stream.flush()
+        if self.owns_stream: self.stream.close()
+
+
+class NdjsonSink(EventSink):
+    def write(self, event):
+        self.stream.write(json.dumps(event, default=str, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+class JsonSink(EventSink):
+    def __init__(self, stream, owns_stream=False):
+        super().__init__(stream, owns_stream)
+        self.doc = {"run": None, "events": [], "summary": None}
+
+    def write(self, event):
+        if event["type"] == "run_start": self.doc["run"] = event
+        elif event["type"] == "run_end": self.doc["summary"] = event
+        else: self.doc["events"].append(event)
+
+    def close(self):
+        json.dump(self.doc, self.stream, default=str, ensure_ascii=False, indent=1)
+        self.stream.write("\n")
+        super().close()
+
+
+class TextSink(EventSink):
+    def write(self, event):
+        if event["type"] == "finding":
+            self.stream.write(f"{event['ts'][11:19]} | {event['status']:<7} | {event['category']:18} | {event['message']}\n")
+            if event["detail"]: self.stream.write(f"{'':13}↳ {event['detail']}\n")
+        elif event["type"] == "run_end":
+            s = event["stats"]
+            self.stream.write(f"PASS: {s['PASS']}  WARN: {s['WARNING']}  FAIL: {s['FAIL']}  ({event['duration_ms']:.0f} ms)\n")
+            timed = sorted((p for p in event.get("probes") or [] if p["wall_ms"] is not None), key=lambda p: p["wall_ms"], reverse=True)
+            if timed: self.stream.write("Slowest: " + ", ".join(f"{p['probe']} {p['wall_ms']:.0f} ms ({p['outcome']})" for p in timed[:5]) + "\n")
+        self.stream.flush()
+
+
+SINKS = {"ndjson": NdjsonSink, "json": JsonSink, "text": TextSink}
+
+
+def open_sink(fmt, output=None):
+    """Sink for --format/--output; output None or '-' means stdout."""
+    if output in (None, "-"): return SINKS[fmt](sys.stdout)
+    return SINKS[fmt](open(output, "w", encoding="utf-8", buffering=1), owns_stream=True)
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import threading
+
+from v18_collectors import Record
+
+# ==========================================
+# PERSISTENT FACT CACHE FOR v18.py
+# ==========================================
+# Static facts (CPU model, GPU, RAM sticks, BIOS serial, disk media type,
+# domain membership) survive between runs in a JSON file keyed by hostname.
+# Each fact belongs to a class with its own TTL, and a changed boot time
+# throws away everything for that host (hardware swaps need a reboot).
+# Volatile answers (uptime, RAM %, CPU load, ports, event logs) never go here.
+
+DAY = 24 * 3600
+
+FACT_CLASSES = {
+    "hardware": 30 * DAY,   # CPU, GPU, RAM sticks
+    "firmware": 30 * DAY,   # BIOS serial
+    "storage": 7 * DAY,     # disk media type
+    "os": 1 * DAY,          # caption/build moves with feature updates
+    "domain": 1 * DAY,      # model + domain membership (Win32_ComputerSystem)
+}
+
+# (collector section, snapshot key) -> fact class
+STATIC_FACTS = {
+    ("wmi", "Win32_Processor"): "hardware",
+    ("wmi", "Win32_VideoController"): "hardware",
+    ("wmi", "Win32_PhysicalMemory"): "hardware",
+    ("wmi", "Win32_BIOS"): "firmware",
+    ("wmi", "Win32_OperatingSystem"): "os",
+    ("wmi", "Win32_ComputerSystem"): "domain",
+    ("powershell", "disk_media"): "storage",
+}
+
+# psutil.boot_time() is derived from uptime and wobbles by a second or two
+BOOT_TOLERANCE = 5.0
+
+
+def default_cache_path():
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, ".v18_fact_cache.json")
+
+
+def _revive(value):
+    if isinstance(value, list): return [Record(v) if isinstance(v, dict) else v for v in value]
+    if isinstance(value, dict): return Record(value)
+    return value
+
+
+class FactCache:
+    def __init__(self, path, hostname, boot_time=None, refresh=False):
+        self.path = path
+        self.hostname = hostname
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._all = self._load()
+        entry = self._all.get(hostname)
+        if refresh or entry is None or self._rebooted(entry, boot_time):
+            entry = {"facts": {}}
+        entry["boot_time"] = boot_time
+        self._all[hostname] = entry
+        self.facts = entry["facts"]
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f: return json.load(f)
+        except (OSError, ValueError): return {}
+
+    @staticmethod
+    def _rebooted(entry, boot_time):
+        old = entry.get("boot_time")
+        return boot_time is None or old is None or abs(old - boot_time) > BOOT_TOLERANCE
+
+    def covers(self, section, key):
+        return (section, key) in STATIC_FACTS
+
+    def fresh(self, section, key):
+        """True if get() would hit; doesn't touch the counters."""
+        if not self.covers(section, key): return False
+        with self._lock:
+            fact = self.facts.get(f"{section}:{key}")
+            return bool(fact) and time.time() - fact["stored"] < FACT_CLASSES[STATIC_FACTS[(section, key)]]
+
+    def get(self, section, key):
+        """(True, value) on a fresh hit, (False, None) otherwise. Counts hits/misses."""
+        fact_class = STATIC_FACTS[(section, key)]
+        with self._lock:
+            fact = self.facts.get(f"{section}:{key}")
+            if fact and time.time() - fact["stored"] < FACT_CLASSES[fact_class]:
+                self.hits += 1
+                return True, _revive(fact["value"])
+            self.misses += 1
+            return False, None
+
+    def put(self, section, key, value):
+        if value is None: return
+        with self._lock:
+            self.facts[f"{section}:{key}"] = {"class": STATIC_FACTS[(section, key)], "stored": time.time(), "value": value}
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._all, f, indent=1, default=str)
+        os.replace(tmp, self.path)
+        return self.path
@@ -0,0 +1,328 @@
+import sys
+import copy
+import json
+import time
+import random
+import asyncio
+import argparse
+import datetime
+import os
+import hmac
+import ipaddress
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+
+from v18_collectors import FixtureCollector
+from v18_history import HistoryStore, issue_text
+
+# ==========================================
+# FLEET MODE FOR v18.py
+# ==========================================
+# agent      : runs on each PC, listens on TCP, runs the diagnostic headless
+#              and answers with one JSON line (IT_Diagnostic_v18.result()).
+# controller : fans out to N hosts with bounded asyncio concurrency, prints
+#              each host as it answers and groups every issue across the
+#              fleet ("UAC Disabled on 37 hosts").
+# simulate   : same controller, but hosts are in-process loopback agents
+#              replaying the sample fixture with seeded faults.
+#
+# Wire format: controller sends {"modules": [...] | null, "token": "..."}\n,
+# agent replies with the result dict as one JSON line and closes.
+#
+# The agent hands out everything the diagnostic sees, so it binds to
+# 127.0.0.1 unless told otherwise, and won't listen beyond loopback without
+# a shared token (--token or V18_AGENT_TOKEN) that every request must carry.
+
+AGENT_PORT = 8765
+TOKEN_ENV = "V18_AGENT_TOKEN"
+SAMPLE_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "v18_sample_windows.json")
+
+console = Console()
+
+
+def diagnose_local(modules=None, collector=None, parallel=True):
+    """Run one headless diagnostic on this machine (or on `collector`) and return its result dict."""
+    import v18  # deferred: the controller and simulator never need the diagnostic itself
+    argv = ["--auto", "--no-cache"] if collector is not None else ["--auto"]
+    if parallel: argv.append("--parallel")
+    args = v18.parse_arguments(argv)
+    tool = v18.IT_Diagnostic_v18(args, collector=collector, console=Console(quiet=True))
+    if modules:
+        for k in tool.modules: tool.modules[k] = k in modules
+    start = time.perf_counter()
+    tool.execute()
+    if tool.fact_cache:
+        try:
+            tool.fact_cache.save()
+            tool.collector.dirsize_cache.save()
+            tool.collector.event_bookmarks.save()
+        except OSError: pass
+    result = tool.result()
+    result["duration"] = time.perf_counter() - start
+    return result
+
+
+# ==========================
+# AGENT
+# ==========================
+def _is_loopback(bind):
+    if bind == "localhost": return True
+    try: return ipaddress.ip_address(bind).is_loopback
+    except ValueError: return False
+
+
+async def serve_agent(bind="127.0.0.1", port=AGENT_PORT, fixture=None, token=None):
+    if not token and not _is_loopback(bind):
+        raise ValueError(f"refusing to serve diagnostics on {bind} without a token (--token or {TOKEN_ENV})")
+    busy = asyncio.Lock()  # one diagnostic at a time; concurrent requests queue up
+
+    async def handle(reader, writer):
+        try:
+            request = json.loads(await reader.readline() or b"{}")
+            if token and not hmac.compare_digest(str(request.get("token") or "").encode(), token.encode()):
+                writer.write(json.dumps({"error": "unauthorized"}).encode() + b"\n")
+                await writer.drain()
+                return
+            async with busy:
+                collector = FixtureCollector.load(fixture) if fixture else None
+                result = await asyncio.to_thread(diagnose_local, request.get("modules"), collector)
+            writer.write(json.dumps(result, default=str).encode() + b"\n")
+            await writer.drain()
+        except Exception as e:
+            writer.write(json.dumps({"error": f"{type(e).__name__}: {e}"}).encode() + b"\n")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, bind, port)
+    console.print(f"[bold green]Agent listening on {bind}:{port}[/]")
+    async with server: await server.serve_forever()
+
+
+# ==========================
+# TRANSPORTS
+# ==========================
+class TcpTransport:
+    def __init__(self, port=AGENT_PORT, timeout=180.0, connect_timeout=5.0, modules=None, token=None):
+        self.port = port
+        self.token = token
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.modules = modules
+
+    async def diagnose(self, host):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, self.port, limit=1 << 22), self.connect_timeout)
+        try:
+            writer.write(json.dumps({"modules": self.modules, "token": self.token}).encode() + b"\n")
+            await writer.drain()
+            line = await asyncio.wait_for(reader.readline(), self.timeout)
+        finally:
+            writer.close()
+        if not line: raise ConnectionError("agent closed without answering")
+        return json.loads(line)
+
+
+# fault name -> patch applied to a healthy fixture
+FAULTS = {
+    "uac_disabled": lambda d: d["registry"].update({r"SOFTWARE\Microsoft\Windows\CurrentVersion\Policies\System|EnableLUA": 0}),
+    "firewall_off": lambda d: d["commands"].update(firewall=d["commands"]["firewall"].replace("ON", "OFF", 1)),
+    "bitlocker_off": lambda d: d["powershell"].update(bitlocker="0"),
+    "hdd": lambda d: d["powershell"].update(disk_media="MediaType\n---------\nHDD"),
+    "bad_sectors": lambda d: d["events"]["System"].append(
+        {"record_id": 49001, "id": 7, "provider": "disk", "ago": 3600, "message": "The device, \\Device\\Harddisk0\\DR0, has a bad block."}),
+    "long_uptime": lambda d: d["psutil"].update(uptime=21 * 24 * 3600),
+    "rdp_open": lambda d: d["psutil"]["listening_ports"].append(3389),
+    "temp_bloat": lambda d: d["files"].update(temp_size=6 * 1024**3),
+    "ram_full": lambda d: d["psutil"]["virtual_memory"].update(percent=96.4),
+    "no_av": lambda d: d["wmi"].update({r"root\SecurityCenter2\AntivirusProduct": []}),
+    "bsod": lambda d: d["files"].update(minidump_count=3),
+    "reboot_pending": lambda d: d["registry_exists"].update({r"SOFTWARE\Microsoft\Windows\CurrentVersion\Component Based Servicing\RebootPending": True}),
+}
+
+
+def healthy_fixture(data):
+    d = copy.deepcopy(data)
+    d["psutil"].update(uptime=2 * 24 * 3600)
+    d["psutil"]["listening_ports"] = [p for p in d["psutil"]["listening_ports"] if p != 3389]
+    d["files"].update(temp_size=200 * 1024**2, minidump_count=0)
+    d["powershell"].update(bitlocker="1", disk_media="MediaType\n---------\nSSD")
+    d["events"] = {"System": [e for e in d["events"]["System"] if e["id"] not in (7, 20)]}
+    d["wmi"]["Win32_PnPEntity|ConfigManagerErrorCode != 0"] = []
+    d["wmi"]["Win32_Printer"] = [{"Name": "Microsoft Print to PDF", "Status": "OK"}]
+    d["commands"]["local_admins"] = "Administrator\n"
+    d["registry_keys"] = {k: 3 for k in d["registry_keys"]}
+    return d
+
+
+class LoopbackTransport:
+    """Stand-in for real agents: each host replays the sample fixture with seeded faults through the real checks."""
+    def __init__(self, fixture=SAMPLE_FIXTURE, fault_rate=0.15, latency=(0.05, 0.4), seed=0, modules=None):
+        with open(fixture, encoding="utf-8") as f: self.base = healthy_fixture(json.load(f))
+        self.fault_rate = fault_rate
+        self.latency = latency
+        self.seed = seed
+        self.modules = modules
+
+    def host_fixture(self, host):
+        rng = random.Random(f"{self.seed}:{host}")
+        d = copy.deepcopy(self.base)
+        d["hostname"] = host
+        for name, patch in FAULTS.items():
+            if rng.random() < self.fault_rate: patch(d)
+        return d, rng
+
+    async def diagnose(self, host):
+        data, rng = self.host_fixture(host)
+        await asyncio.sleep(rng.uniform(*self.latency))  # network + agent queueing
+        return await asyncio.to_thread(diagnose_local, self.modules, FixtureCollector(data), False)
+
+
+# ==========================
+# CONTROLLER
+# ==========================
+async def run_fleet(hosts, transport, concurrency=50, on_result=None):
+    """Diagnose every host with at most `concurrency` in flight; results are streamed to on_result as they land."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(host):
+        async with sem:
+            start = time.perf_counter()
+            try: result = await transport.diagnose(host)
+            except Exception as e: result = {"error": f"{type(e).__name__}: {e}"}
+            result["host"] = result.get("host") or host
+            result["elapsed"] = time.perf_counter() - start
+            return result
+
+    results = []
+    for fut in asyncio.as_completed([asyncio.create_task(one(h)) for h in hosts]):
+        result = await fut
+        results.append(result)
+        if on_result: on_result(result, len(results), len(hosts))
+    return results
+
+
+def issue_key(category, error):
+    return category, issue_text(error)
+
+
+def aggregate(results):
+    """[(category, error, fix, [hosts])] sorted by how many hosts share the issue."""
+    groups = {}
+    for r in results:
+        if r.get("error"):
+            groups.setdefault(("Fleet", "Agent unreachable"), {"fix": "Check agent / network.", "hosts": []})["hosts"].append(r["host"])
+            continue
+        for issue in r.get("issues", []):
+            g = groups.setdefault(issue_key(issue["category"], issue["error"]), {"fix": issue["fix"], "hosts": [], "errors": set()})
+            g["errors"].add(issue["error"])
+            if r["host"] not in g["hosts"]: g["hosts"].append(r["host"])
+    # Show the real message when every host said the same thing, the "#" pattern otherwise
+    rows = [(cat, next(iter(g["errors"])) if len(g.get("errors", ())) == 1 else err, g["fix"], sorted(g["hosts"]))
+            for (cat, err), g in groups.items()]
+    return sorted(rows, key=lambda row: (-len(row[3]), row[0], row[1]))
+
+
+def print_result(result, done, total):
+    if result.get("error"):
+        console.print(f"[{done:>4}/{total}] [red]✖ {result['host']:<20}[/] {result['error']}")
+        return
+    s = result["stats"]
+    console.print(f"[{done:>4}/{total}] [green]✔[/] {result['host']:<20} "
+                  f"[green]PASS {s['PASS']:>2}[/]  [yellow]WARN {s['WARNING']:>2}[/]  [red]FAIL {s['FAIL']:>2}[/]  "
+                  f"[dim]{result['elapsed']:.2f}s[/]")
+
+
+def render_fleet(results, elapsed):
+    rows = aggregate(results)
+    ok = sum(1 for r in results if not r.get("error"))
+    console.print(Panel(f"[bold]{len(results)} hosts[/] | [green]{ok} answered[/] | [red]{len(results) - ok} unreachable[/] | "
+                        f"{elapsed:.1f}s wall", border_style="grey50"))
+    table = Table(title="FLEET ISSUES", show_header=True, header_style="bold red", expand=True)
+    table.add_column("Category", style="cyan")
+    table.add_column("Error", style="white")
+    table.add_column("Hosts", justify="right", style="bold")
+    table.add_column("Examples", style="dim")
+    table.add_column("Recommended Fix", style="yellow")
+    for cat, err, fix, hosts in rows:
+        examples = ", ".join(hosts[:3]) + (" ..." if len(hosts) > 3 else "")
+        table.add_row(cat, err, str(len(hosts)), examples, fix)
+    console.print(table)
+    return rows
+
+
+def save_fleet_report(results, rows, filename="FLEET_REPORT.txt"):
+    date_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("IT FLEET DIAGNOSTIC REPORT\n")
+        f.write(f"Hosts: {len(results)} | {date_str}\n")
+        f.write("=" * 60 + "\n\n")
+        for idx, (cat, err, fix, hosts) in enumerate(rows, 1):
+            f.write(f"{idx}. {cat} - {err} on {len(hosts)} hosts\n")
+            f.write(f"       FIX:   {fix}\n")
+            f.write(f"       HOSTS: {', '.join(hosts)}\n")
+            f.write("-" * 60 + "\n")
+    return filename
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="IT Diagnostic v18 - fleet mode")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    agent = sub.add_parser("agent", help="Serve diagnostics for this machine")
+    agent.add_argument("--bind", default="127.0.0.1", help="Address to listen on (default loopback; anything else needs a token)")
+    agent.add_argument("--port", type=int, default=AGENT_PORT)
+    agent.add_argument("--fixture", help="Answer from a fixture instead of this machine")
+    for name, help_text in (("controller", "Diagnose real agents"), ("simulate", "Diagnose N simulated loopback hosts")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--concurrency", type=int, default=50, help="Max hosts in flight (default 50)")
+        p.add_argument("--modules", help="Comma-separated modules (default: all)")
+        p.add_argument("--json", metavar="PATH", help="Also dump every host result as JSON")
+        p.add_argument("--quiet", action="store_true", help="Don't stream per-host lines")
+        p.add_argument("--history", metavar="PATH", help="Append every host's run to this history database (see v18_history.py)")
+    ctl = sub.choices["controller"]
+    ctl.add_argument("hosts", nargs="*", help="Hostnames / IPs")
+    ctl.add_argument("--hosts-file", help="One host per line")
+    ctl.add_argument("--port", type=int, default=AGENT_PORT)
+    ctl.add_argument("--timeout", type=float, default=180.0, help="Seconds to wait for one agent")
+    for p in (agent, ctl):
+        p.add_argument("--token", default=os.environ.get(TOKEN_ENV), help=f"Shared secret agents require (default: ${TOKEN_ENV})")
+    sim = sub.choices["simulate"]
+    sim.add_argument("--hosts", type=int, default=200, help="How many simulated hosts")
+    sim.add_argument("--fault-rate", type=float, default=0.15, help="Chance of each fault per host")
+    sim.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    if args.mode == "agent":
+        try: asyncio.run(serve_agent(args.bind, args.port, args.fixture, args.token))
+        except ValueError as e: sys.exit(str(e))
+        return
+
+    modules = args.modules.split(",") if args.modules else None
+    if args.mode == "controller":
+        hosts = list(args.hosts)
+        if args.hosts_file:
+            with open(args.hosts_file, encoding="utf-8") as f:
+                hosts += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        transport = TcpTransport(args.port, args.timeout, modules=modules, token=args.token)
+    else:
+        hosts = [f"SIM-{i:04d}" for i in range(1, args.hosts + 1)]
+        transport = LoopbackTransport(fault_rate=args.fault_rate, seed=args.seed, modules=modules)
+    if not hosts: sys.exit("No hosts given.")
+
+    start = time.perf_counter()
+    results = asyncio.run(run_fleet(hosts, transport, args.concurrency, None if args.quiet else print_result))
+    rows = render_fleet(results, time.perf_counter() - start)
+    console.print(f"\n[bold green]Report Saved:[/bold green] {save_fleet_report(results, rows)}")
+    if args.history:
+        store = HistoryStore(args.history)
+        for r in results:
+            if not r.get("error"): store.record_result(r, backend="fleet")
+        store.close()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(results, f, indent=1, default=str)
+
+
+if __name__ == "__main__":
+    main()
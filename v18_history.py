@@ -0,0 +1,219 @@
+import os
+import re
+import sys
+import time
+import sqlite3
+import argparse
+import datetime
+
+# ==========================================
+# RUN HISTORY FOR v18.py (SQLite)
+# ==========================================
+# FIX_SHEET_<host>.txt only ever holds the latest run. Every run (local or
+# collected by fleet mode) is also appended here, one transaction per run,
+# so "when did this disk start failing" and "which hosts regressed this
+# week" are queries instead of guesswork.
+#
+# Same trick as test_speed_diff_by_B-Tree.py: the questions we ask are range
+# scans, so the indexes match them column-for-column:
+#   idx_findings_host_cat_ts : one host's history of one check
+#   idx_findings_status_ts   : every FAIL/WARNING in a time window
+# Timestamps are REAL unix seconds so ranges compare as numbers.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    host TEXT NOT NULL,
+    ts REAL NOT NULL,
+    duration_ms REAL,
+    backend TEXT,
+    modules TEXT,
+    pass INTEGER, warning INTEGER, fail INTEGER, info INTEGER
+);
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    host TEXT NOT NULL,
+    ts REAL NOT NULL,
+    module TEXT,
+    category TEXT NOT NULL,
+    status TEXT NOT NULL,
+    issue TEXT,
+    message TEXT,
+    detail TEXT,
+    fix TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_host_ts ON runs(host, ts);
+CREATE INDEX IF NOT EXISTS idx_findings_host_cat_ts ON findings(host, category, ts);
+CREATE INDEX IF NOT EXISTS idx_findings_status_ts ON findings(status, ts);
+"""
+
+ISSUE_STATUSES = ("FAIL", "WARNING")
+
+
+def default_history_path():
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, ".v18_history.db")
+
+
+def issue_text(message):
+    # "Uptime: 21 Days" and "Uptime: 30 Days" are the same problem
+    return re.sub(r"\d+(\.\d+)?", "#", message or "")
+
+
+def _epoch(ts):
+    if isinstance(ts, (int, float)): return float(ts)
+    if isinstance(ts, datetime.datetime): return ts.timestamp()
+    return datetime.datetime.fromisoformat(ts).timestamp()
+
+
+class HistoryStore:
+    def __init__(self, path=None):
+        self.path = path or default_history_path()
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # readers (the query CLI) don't block a run's write
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self): self.conn.close()
+
+    def record_run(self, host, findings, stats, ts=None, duration_ms=None, backend=None, modules=None):
+        """Append one run and all its findings (the event dicts IT_Diagnostic_v18.emit builds) in one transaction."""
+        ts = _epoch(ts) if ts is not None else time.time()
+        with self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (host, ts, duration_ms, backend, modules, pass, warning, fail, info) VALUES (?,?,?,?,?,?,?,?,?)",
+                (host, ts, duration_ms, backend, ",".join(modules or []),
+                 stats.get("PASS", 0), stats.get("WARNING", 0), stats.get("FAIL", 0), stats.get("INFO", 0))).lastrowid
+            self.conn.executemany(
+                "INSERT INTO findings (run_id, host, ts, module, category, status, issue, message, detail, fix) VALUES (?,?,?,?,?,?,?,?,?,?)",
+                [(run_id, host, _epoch(f["ts"]) if f.get("ts") else ts, f.get("module"), f["category"], f["status"],
+                  issue_text(f["message"]) if f["status"] in ISSUE_STATUSES else None,
+                  f["message"], f.get("detail") or "", f.get("fix") or "") for f in findings])
+        return run_id
+
+    def record_result(self, result, backend=None):
+        """Store an IT_Diagnostic_v18.result() dict (what fleet mode collects)."""
+        findings = result.get("findings") or []
+        ts = findings[0]["ts"] if findings else None
+        return self.record_run(result["host"], findings, result.get("stats") or {}, ts=ts,
+                               duration_ms=round(result["duration"] * 1000, 1) if result.get("duration") else None,
+                               backend=backend, modules=sorted({f["module"] for f in findings if f.get("module")}))
+
+    # -------- queries --------
+    def trend(self, host, category, since):
+        """[(day, status, count, last message)] for one host's check; range scan on idx_findings_host_cat_ts."""
+        return self.conn.execute(
+            "SELECT date(ts, 'unixepoch', 'localtime') AS day, status, COUNT(*), MAX(message) FROM findings "
+            "WHERE host = ? AND category = ? AND ts >= ? GROUP BY day, status ORDER BY day, status",
+            (host, category, since)).fetchall()
+
+    def issue_spans(self, since, host=None, status=None):
+        """[(host, category, issue, first_seen, last_seen, times in window)] for FAIL/WARNING seen since `since`.
+
+        The window is a range scan on idx_findings_status_ts (or host_cat_ts with
+        --host); first_seen is all-time, one seek per issue on idx_findings_host_cat_ts.
+        """
+        statuses = (status,) if status else ISSUE_STATUSES
+        marks = ",".join("?" * len(statuses))
+        where, params = f"status IN ({marks}) AND ts >= ?", statuses + (since,)
+        if host: where, params = "host = ? AND " + where, (host,) + params
+        return self.conn.execute(
+            f"SELECT host, category, issue, "
+            f"  (SELECT MIN(f.ts) FROM findings f WHERE f.host = w.host AND f.category = w.category "
+            f"   AND f.issue = w.issue AND f.status IN ({marks})), last, times "
+            f"FROM (SELECT host, category, issue, MAX(ts) AS last, COUNT(*) AS times FROM findings "
+            f"      WHERE {where} GROUP BY host, category, issue) w ORDER BY last DESC",
+            statuses + params).fetchall()
+
+    def fleet_counts(self, since):
+        """[(category, issue, status, hosts, findings)] across every host; range scan on idx_findings_status_ts."""
+        marks = ",".join("?" * len(ISSUE_STATUSES))
+        return self.conn.execute(
+            f"SELECT category, issue, status, COUNT(DISTINCT host), COUNT(*) FROM findings "
+            f"WHERE status IN ({marks}) AND ts >= ? GROUP BY category, issue, status ORDER BY COUNT(DISTINCT host) DESC",
+            ISSUE_STATUSES + (since,)).fetchall()
+
+    def regressions(self, since):
+        """[(host, category, issue, first_seen)]: issues whose first ever sighting on that host is after `since`."""
+        new = [(h, c, i, first) for h, c, i, first, _, _ in self.issue_spans(since) if first >= since]
+        return sorted(new, key=lambda r: r[3], reverse=True)
+
+    def runs(self, host=None, limit=20):
+        if host:
+            return self.conn.execute("SELECT host, ts, pass, warning, fail, duration_ms FROM runs WHERE host = ? ORDER BY ts DESC LIMIT ?",
+                                     (host, limit)).fetchall()
+        return self.conn.execute("SELECT host, ts, pass, warning, fail, duration_ms FROM runs ORDER BY ts DESC LIMIT ?", (limit,)).fetchall()
+
+
+# ==========================
+# QUERY CLI
+# ==========================
+def _when(ts): return datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M")
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="IT Diagnostic v18 - run history")
+    parser.add_argument("--db", default=default_history_path(), help="History database (default: next to the fact cache)")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    p = sub.add_parser("runs", help="Latest runs")
+    p.add_argument("--host")
+    p.add_argument("--limit", type=int, default=20)
+    p = sub.add_parser("trend", help="Day-by-day status of one check on one host")
+    p.add_argument("host")
+    p.add_argument("category", help='Finding category, e.g. "SMART Status"')
+    p.add_argument("--days", type=float, default=30)
+    p = sub.add_parser("issues", help="First/last seen of every issue")
+    p.add_argument("--host")
+    p.add_argument("--status", choices=ISSUE_STATUSES)
+    p.add_argument("--days", type=float, default=30)
+    p = sub.add_parser("fleet", help="Issue counts across all hosts")
+    p.add_argument("--days", type=float, default=7)
+    p = sub.add_parser("regressed", help="Issues that first appeared on a host in the window")
+    p.add_argument("--days", type=float, default=7)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    if not os.path.exists(args.db): sys.exit(f"No history at {args.db} yet; run v18.py first.")
+    from rich.console import Console
+    from rich.table import Table
+    console = Console()
+    store = HistoryStore(args.db)
+    since = time.time() - getattr(args, "days", 0) * 86400
+    start = time.perf_counter()
+
+    if args.mode == "runs":
+        table = Table(title="RUNS", header_style="bold cyan", expand=True)
+        for col in ("Host", "When", "PASS", "WARN", "FAIL", "Took"): table.add_column(col)
+        for host, ts, ok, warn, fail, dur in store.runs(args.host, args.limit):
+            table.add_row(host, _when(ts), str(ok), str(warn), str(fail), f"{dur / 1000:.1f}s" if dur else "")
+    elif args.mode == "trend":
+        table = Table(title=f"{args.category} on {args.host} (last {args.days:g} days)", header_style="bold cyan", expand=True)
+        for col in ("Day", "Status", "Count", "Message"): table.add_column(col)
+        for day, status, count, message in store.trend(args.host, args.category, since):
+            table.add_row(day, status, str(count), message)
+    elif args.mode == "issues":
+        table = Table(title=f"ISSUES (last {args.days:g} days)", header_style="bold red", expand=True)
+        for col in ("Host", "Category", "Issue", "First Seen", "Last Seen", "Times"): table.add_column(col)
+        for host, category, issue, first, last, count in store.issue_spans(since, args.host, args.status):
+            table.add_row(host, category, issue, _when(first), _when(last), str(count))
+    elif args.mode == "fleet":
+        table = Table(title=f"FLEET (last {args.days:g} days)", header_style="bold red", expand=True)
+        for col in ("Category", "Issue", "Status", "Hosts", "Findings"): table.add_column(col)
+        for category, issue, status, hosts, count in store.fleet_counts(since):
+            table.add_row(category, issue, status, str(hosts), str(count))
+    else:
+        table = Table(title=f"REGRESSED (new in the last {args.days:g} days)", header_style="bold red", expand=True)
+        for col in ("Host", "Category", "Issue", "First Seen"): table.add_column(col)
+        for host, category, issue, first in store.regressions(since):
+            table.add_row(host, category, issue, _when(first))
+
+    console.print(table)
+    console.print(f"[dim]{table.row_count} rows in {(time.perf_counter() - start) * 1000:.0f} ms[/dim]")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import json
+import time
+import math
+import random
+import socket
+import struct
+import asyncio
+from urllib.parse import urlsplit
+
+# ==========================================
+# ASYNC NETWORK PROBE ENGINE (check_network)
+# ==========================================
+# One event loop does every network measurement of a run at once:
+#   - each DNS target is resolved `samples` times, all targets concurrently
+#     (system resolver via getaddrinfo, or straight UDP queries to a given
+#     nameserver, which also lets a local stand-in server answer); the first
+#     answer usually misses the resolver cache, so like HTTP it's reported
+#     as cold_ms and kept out of the distribution
+#   - each HTTP endpoint is fetched `samples` times over a keep-alive
+#     connection from HttpPool, so only the first ("cold") sample pays for
+#     TCP/TLS setup and the rest measure request latency
+#   - the public IP lookup goes through the same pool
+# The result is plain data (per-target latency distributions in ms) which the
+# collector snapshots once per run, so every probe that asks reuses it.
+
+DNS_TARGETS = ["google.com", "cloudflare.com", "microsoft.com"]
+HTTP_TARGETS = [
+    "http://www.google.com/generate_204",
+    "http://cp.cloudflare.com/",
+    "http://www.msftconnecttest.com/connecttest.txt",
+]
+PUBLIC_IP_URL = "http://ip-api.com/json"
+
+
+def distribution(samples, digits=1, percentiles=(50, 95)):
+    """{"p50", "p95", "max"} (one "pN" per entry of `percentiles`), nearest-rank, or None for no samples.
+
+    Shared by v18_watch, tcp_loadgen and queue_simulation; digits=None leaves the values unrounded.
+    """
+    vals = sorted(samples)
+    if not vals: return None
+    n = len(vals)
+    rnd = (lambda v: v) if digits is None else (lambda v: round(v, digits))
+    # p * n / 100, not p / 100 * n: one rounding step (p99.9 of 1000 samples is rank 999, not 1000)
+    out = {f"p{p:g}": rnd(vals[min(n - 1, max(0, math.ceil(p * n / 100) - 1))]) for p in percentiles}
+    out["max"] = rnd(vals[-1])
+    return out
+
+
+# -------- DNS --------
+def dns_query(name, qid):
+    """A minimal recursive A query."""
+    labels = b"".join(bytes([len(p)]) + p for p in name.rstrip(".").encode("idna").split(b"."))
+    return struct.pack("!HHHHHH", qid, 0x0100, 1, 0, 0, 0) + labels + b"\0" + struct.pack("!HH", 1, 1)
+
+
+def _skip_name(packet, pos):
+    while True:
+        length = packet[pos]
+        if length & 0xC0 == 0xC0: return pos + 2  # compression pointer ends the name
+        if length == 0: return pos + 1
+        pos += 1 + length
+
+
+def dns_answer(packet):
+    """(qid, first A record as a dotted quad or None)."""
+    qid, flags, qdcount, ancount = struct.unpack_from("!HHHH", packet)
+    if flags & 0x000F: return qid, None  # NXDOMAIN / SERVFAIL / ...
+    pos = 12
+    for _ in range(qdcount): pos = _skip_name(packet, pos) + 4
+    for _ in range(ancount):
+        pos = _skip_name(packet, pos)
+        rtype, _, _, rdlength = struct.unpack_from("!HHIH", packet, pos)
+        pos += 10
+        if rtype == 1 and rdlength == 4: return qid, socket.inet_ntoa(packet[pos:pos + 4])
+        pos += rdlength
+    return qid, None
+
+
+class DnsClient(asyncio.DatagramProtocol):
+    """One UDP socket to `nameserver`; concurrent queries are matched back by query id."""
+    def __init__(self):
+        self.transport = None
+        self.pending = {}
+
+    @classmethod
+    async def open(cls, nameserver):
+        _, client = await asyncio.get_running_loop().create_datagram_endpoint(cls, remote_addr=nameserver)
+        return client
+
+    def connection_made(self, transport): self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try: qid, address = dns_answer(data)
+        except (struct.error, IndexError): return
+        fut = self.pending.pop(qid, None)
+        if fut is not None and not fut.done(): fut.set_result(address)
+
+    async def resolve(self, name):
+        qid = random.randrange(1 << 16)
+        while qid in self.pending: qid = random.randrange(1 << 16)
+        fut = self.pending[qid] = asyncio.get_running_loop().create_future()
+        self.transport.sendto(dns_query(name, qid))
+        try: return await fut
+        finally: self.pending.pop(qid, None)
+
+    def close(self):
+        if self.transport: self.transport.close()
+
+
+async def _system_resolve(name):
+    infos = await asyncio.get_running_loop().getaddrinfo(name, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+    return infos[0][4][0] if infos else None
+
+
+async def time_dns(name, samples, timeout, client=None):
+    resolve = client.resolve if client else _system_resolve
+    address, times, errors, cold = None, [], 0, None
+    for _ in range(samples):
+        start = time.perf_counter()
+        try: got = await asyncio.wait_for(resolve(name), timeout)
+        except asyncio.TimeoutError:
+            errors += 1
+            break  # a dead resolver doesn't need `samples` timeouts to prove it
+        except OSError: got = None
+        if got is None:
+            errors += 1
+            continue
+        ms = (time.perf_counter() - start) * 1000
+        if address is None: cold = round(ms, 1)
+        else: times.append(ms)
+        address = got
+    return {"address": address, "samples": len(times) + (cold is not None), "errors": errors,
+            "cold_ms": cold, "latency_ms": distribution(times)}
+
+
+# -------- HTTP --------
+class HttpPool:
+    """Keep-alive HTTP/1.1 connections per (scheme, host, port), shared by every request in a run."""
+    def __init__(self, timeout=3.0):
+        self.timeout = timeout
+        self.idle = {}
+        self.connects = 0
+        self.requests = 0
+
+    async def _connect(self, scheme, host, port):
+        self.connects += 1
+        ctx = None
+        if scheme == "https":
+            import ssl
+            ctx = ssl.create_default_context()
+        return await asyncio.wait_for(asyncio.open_connection(host, port, ssl=ctx), self.timeout)
+
+    async def get(self, url):
+        """(status, body bytes, reused connection?)"""
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        idle = self.idle.setdefault(key, [])
+        reused = bool(idle)
+        reader, writer = idle.pop() if idle else await self._connect(*key)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nConnection: keep-alive\r\n"
+                     f"User-Agent: IT-Diagnostic-v18\r\nAccept: */*\r\n\r\n".encode("ascii"))
+        self.requests += 1
+        try:
+            status, body, keep = await asyncio.wait_for(self._read_response(reader), self.timeout)
+        except BaseException:
+            writer.close()
+            raise
+        if keep: idle.append((reader, writer))
+        else: writer.close()
+        return status, body, reused
+
+    async def _read_response(self, reader):
+        status_line = await reader.readline()
+        if not status_line: raise ConnectionResetError("server closed the connection")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""): break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        keep = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                body += await reader.readexactly(size)
+                await reader.readline()
+            return status, bytes(body), keep
+        if "content-length" in headers:
+            return status, await reader.readexactly(int(headers["content-length"])), keep
+        if status in (204, 304) or 100 <= status < 200: return status, b"", keep
+        return status, await reader.read(), False  # delimited by close
+
+    def close(self):
+        for conns in self.idle.values():
+            for _, writer in conns: writer.close()
+        self.idle.clear()
+
+
+async def time_http(pool, url, samples):
+    times, errors, status, cold = [], 0, None, None
+    for _ in range(samples):
+        start = time.perf_counter()
+        try: status, _, reused = await pool.get(url)
+        except asyncio.TimeoutError:
+            errors += 1
+            break
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            errors += 1
+            continue
+        ms = (time.perf_counter() - start) * 1000
+        if reused: times.append(ms)
+        else: cold = round(ms, 1)
+    return {"status": status, "samples": len(times) + (cold is not None), "errors": errors,
+            "cold_ms": cold, "latency_ms": distribution(times)}
+
+
+async def fetch_public_ip(pool, url=PUBLIC_IP_URL):
+    try:
+        status, body, _ = await pool.get(url)
+        return json.loads(body) if status == 200 else None
+    except (OSError, ValueError, IndexError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return None
+
+
+# -------- engine --------
+async def probe_network(dns_targets=DNS_TARGETS, http_targets=HTTP_TARGETS, samples=5, timeout=3.0,
+                        nameserver=None, public_ip_url=PUBLIC_IP_URL):
+    start = time.perf_counter()
+    pool = HttpPool(timeout)
+    client = await DnsClient.open(nameserver) if nameserver else None
+    try:
+        dns, http, public_ip = await asyncio.gather(
+            asyncio.gather(*(time_dns(name, samples, timeout, client) for name in dns_targets)),
+            asyncio.gather(*(time_http(pool, url, samples) for url in http_targets)),
+            fetch_public_ip(pool, public_ip_url) if public_ip_url else asyncio.sleep(0))
+    finally:
+        pool.close()
+        if client: client.close()
+    return {"dns": dict(zip(dns_targets, dns)), "http": dict(zip(http_targets, http)), "public_ip": public_ip,
+            "connections": pool.connects, "requests": pool.requests,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def run(**kwargs):
+    """Blocking entry point; called from probe worker threads, which have no event loop."""
+    return asyncio.run(probe_network(**kwargs))
@@ -0,0 +1,61 @@
+import time
+import heapq
+
+# ==========================================
+# PROCESS RANKING ("Top Hog")
+# ==========================================
+# psutil's per-process cpu_percent() is 0.0 on the first call, so sorting one
+# process_iter() snapshot by it ranks nothing. Instead take two snapshots
+# `interval` apart, diff cumulative CPU time and I/O bytes per process, and
+# pick the top N by CPU, RSS and I/O with heapq.nlargest (O(n log N), no full
+# sort). Processes are keyed by (pid, create_time) so a recycled PID isn't
+# diffed against a dead process; anything that exits between the snapshots
+# is simply dropped.
+
+ATTRS = ['pid', 'name', 'create_time', 'cpu_times', 'memory_info', 'io_counters']
+
+
+def snapshot(psutil):
+    """{(pid, create_time): (name, cpu_seconds, rss, io_bytes or None)}"""
+    procs = {}
+    for p in psutil.process_iter(ATTRS, ad_value=None):
+        info = p.info
+        cpu = info['cpu_times']
+        if cpu is None or info['create_time'] is None: continue  # vanished / denied mid-iteration
+        io = info['io_counters']
+        io_bytes = (io.read_bytes + io.write_bytes) if io is not None else None
+        rss = info['memory_info'].rss if info['memory_info'] is not None else 0
+        procs[(info['pid'], info['create_time'])] = (info['name'] or f"pid {info['pid']}", cpu.user + cpu.system, rss, io_bytes)
+    return procs
+
+
+def rank(before, after, elapsed, top_n=5):
+    """Top-N lists from two snapshots: {"cpu": [...], "rss": [...], "io": [...], "processes": n}."""
+    cpu, io = [], []
+    for key, (name, cpu_s, rss, io_b) in after.items():
+        prev = before.get(key)
+        if prev is None: continue  # started between samples: no baseline
+        cpu.append((max(0.0, cpu_s - prev[1]) / elapsed * 100, key[0], name))
+        if io_b is not None and prev[3] is not None:
+            io.append((max(0, io_b - prev[3]) / elapsed, key[0], name))
+    rss = ((v[2], key[0], v[0]) for key, v in after.items())
+    return {
+        "cpu": [{"pid": pid, "name": name, "cpu_percent": round(v, 1)} for v, pid, name in heapq.nlargest(top_n, cpu)],
+        "rss": [{"pid": pid, "name": name, "rss_mb": round(v / 1024**2, 1)} for v, pid, name in heapq.nlargest(top_n, rss)],
+        "io": [{"pid": pid, "name": name, "io_mb_s": round(v / 1024**2, 2)} for v, pid, name in heapq.nlargest(top_n, io)],
+        "processes": len(after),
+        "interval": round(elapsed, 3),
+    }
+
+
+def top_processes(interval=1.0, top_n=5, psutil=None):
+    if psutil is None: import psutil
+    # Walking thousands of processes takes a while; measure between snapshot midpoints
+    t0 = time.monotonic()
+    before = snapshot(psutil)
+    t1 = time.monotonic()
+    time.sleep(interval)
+    t2 = time.monotonic()
+    after = snapshot(psutil)
+    t3 = time.monotonic()
+    return rank(before, after, max((t2 + t3) / 2 - (t0 + t1) / 2, 1e-6), top_n)
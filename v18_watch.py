@@ -0,0 +1,133 @@
+import time
+from array import array
+
+from v18_netprobe import distribution
+
+# ==========================================
+# WATCH MODE FOR v18.py (--watch)
+# ==========================================
+# One psutil sample per tick goes into fixed-size array('d') ring buffers, so
+# memory stays constant however long the daemon runs. Every tick the window
+# is summarised (p50/p95/max) and the same thresholds check_performance /
+# probe_ram use are applied; a finding is emitted only when a metric's status
+# changes.
+#
+#   FAIL    : p95 over the limit (sustained)
+#   WARNING : max over the limit but p95 within it (a spike)
+#   PASS    : otherwise
+# "Over" is the one-shot probe's own comparison, so a reading flags the same
+# way in both modes: probe_cpu_load fails at >= 90, probe_ram only at > 90.
+
+
+class RingBuffer:
+    """Fixed-capacity float ring buffer backed by array('d')."""
+    def __init__(self, capacity):
+        if capacity < 1: raise ValueError("RingBuffer capacity must be at least 1")
+        self.capacity = capacity
+        self.data = array('d', bytes(8 * capacity))
+        self.count = 0
+        self.head = 0  # next write position
+
+    def append(self, value):
+        self.data[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity: self.count += 1
+
+    def __len__(self): return self.count
+
+    def summary(self): return distribution(self.data[:self.count], digits=None)
+
+
+# metric -> (finding category, over(value) or None for INFO-only, unit, fix)
+METRICS = {
+    "cpu": ("CPU Load", lambda v: v >= 90.0, "%", "Sustained CPU load; check Top Hog."),
+    "memory": ("RAM Usage", lambda v: v > 90.0, "%", "Close memory-heavy apps or add RAM."),
+    "disk_io": ("Disk I/O", None, " MB/s", None),
+    "net_io": ("Network I/O", None, " MB/s", None),
+}
+
+
+def classify(summary, over):
+    if over is None: return "INFO"
+    if over(summary["p95"]): return "FAIL"
+    if over(summary["max"]): return "WARNING"
+    return "PASS"
+
+
+class Sampler:
+    """Reads CPU %, memory %, disk and network throughput from psutil without blocking."""
+    def __init__(self):
+        import psutil
+        self.psutil = psutil
+        psutil.cpu_percent(interval=None)  # prime: the first call always returns 0.0
+        self.last = time.monotonic()
+        self.last_disk = self._disk_bytes()
+        self.last_net = self._net_bytes()
+
+    def _disk_bytes(self):
+        io = self.psutil.disk_io_counters()
+        return (io.read_bytes + io.write_bytes) if io else 0
+
+    def _net_bytes(self):
+        io = self.psutil.net_io_counters()
+        return (io.bytes_sent + io.bytes_recv) if io else 0
+
+    def sample(self):
+        now = time.monotonic()
+        elapsed = max(now - self.last, 1e-6)
+        disk, net = self._disk_bytes(), self._net_bytes()
+        out = {
+            "cpu": self.psutil.cpu_percent(interval=None),
+            "memory": self.psutil.virtual_memory().percent,
+            "disk_io": (disk - self.last_disk) / elapsed / 1024**2,
+            "net_io": (net - self.last_net) / elapsed / 1024**2,
+        }
+        self.last, self.last_disk, self.last_net = now, disk, net
+        return out
+
+
+class Watcher:
+    def __init__(self, emit, interval=1.0, window=60, min_samples=5, sampler=None):
+        """emit(category, message, status, detail, fix) is called on every state change."""
+        self.emit = emit
+        self.interval = interval
+        self.min_samples = min_samples
+        self.sampler = sampler or Sampler()
+        self.buffers = {m: RingBuffer(window) for m in METRICS}
+        self.states = {}
+        self.ticks = 0
+
+    def tick(self):
+        for metric, value in self.sampler.sample().items():
+            self.buffers[metric].append(value)
+        self.ticks += 1
+        if self.ticks >= self.min_samples: self.evaluate()
+
+    def evaluate(self):
+        for metric, (category, over, unit, fix) in METRICS.items():
+            buf = self.buffers[metric]
+            summary = buf.summary()
+            if summary is None: continue
+            status = classify(summary, over)
+            if over is None:
+                # INFO metrics have no state; report once, when the first window fills
+                if metric in self.states: continue
+            elif self.states.get(metric) == status: continue
+            self.states[metric] = status
+            message = (f"p50 {summary['p50']:.1f}{unit} / p95 {summary['p95']:.1f}{unit} / max {summary['max']:.1f}{unit}")
+            detail = f"window {len(buf) * self.interval:.0f}s ({len(buf)} samples)"
+            self.emit(category, message, status, detail, fix if status in ("FAIL", "WARNING") else None)
+
+    def run(self, duration=None):
+        """Sample every `interval` seconds until `duration` elapses (None = forever) or Ctrl+C."""
+        start = next_tick = time.monotonic()
+        try:
+            while duration is None or time.monotonic() - start < duration:
+                self.tick()
+                next_tick += self.interval
+                delay = next_tick - time.monotonic()
+                if delay > 0: time.sleep(delay)
+                else: next_tick = time.monotonic()  # fell behind; don't burst to catch up
+        except KeyboardInterrupt:
+            pass
+        return self.ticks